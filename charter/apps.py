@@ -0,0 +1,13 @@
+"""This module contains the configuration of the charter app."""
+
+from django.apps import AppConfig
+
+
+class CharterConfig(AppConfig):
+    """Configuration of the charter app."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "charter"
+
+    def ready(self):
+        import charter.signals
@@ -0,0 +1,131 @@
+"""This module assembles the full citizen charter of an organization in memory."""
+
+from collections import defaultdict
+
+from employee.models import Employee
+from organization.models import Department, Designation, Organization
+from service.models import SampleDocments, ServiceDetail
+
+DEFAULT_PROFILE_PICTURE = "/static/images/default_profile_picture.jpg"
+
+
+def _file_url(file):
+    return file.url if file else None
+
+
+def _serialize_employee(employee):
+    return {
+        "id": employee.id,
+        "name": employee.name,
+        "description": employee.description,
+        "email": employee.email,
+        "contact_no": employee.contact_no,
+        "profile_picture": _file_url(employee.profile_picture) or DEFAULT_PROFILE_PICTURE,
+        "is_available": employee.is_available,
+    }
+
+
+def build_charter(organization_id):
+    """
+    Build the charter of an organization as plain, JSON serializable data.
+
+    The whole tree (departments, priority ordered designations, employees, services and
+    their sample documents) is fetched with a fixed number of queries, one per table, and
+    stitched together in memory. Returns ``None`` if the organization does not exist.
+    """
+    organization = Organization.objects.filter(pk=organization_id, is_active=True).first()
+    if organization is None:
+        return None
+
+    departments = list(
+        Department.objects.filter(organization=organization, is_active=True).order_by("pk")
+    )
+    designations = Designation.objects.filter(
+        organization=organization, department__is_active=True
+    ).order_by("priority", "pk")
+    employees = Employee.objects.filter(organization=organization).order_by("pk")
+    service_details = (
+        ServiceDetail.objects.filter(
+            organization=organization, is_active=True, service__is_active=True
+        )
+        .select_related("service")
+        .order_by("service__name")
+    )
+    detail_ids = [detail.pk for detail in service_details]
+    documents = SampleDocments.objects.filter(
+        service_detail__in=detail_ids, is_active=True
+    ).order_by("pk")
+    responsible = ServiceDetail.responsible_employees.through.objects.filter(
+        servicedetail_id__in=detail_ids
+    ).values_list("servicedetail_id", "employee_id")
+
+    employees_by_id = {employee.id: _serialize_employee(employee) for employee in employees}
+    employees_by_designation = defaultdict(list)
+    for employee in employees:
+        employees_by_designation[employee.designation_id].append(employees_by_id[employee.id])
+
+    designations_by_department = defaultdict(list)
+    for designation in designations:
+        designations_by_department[designation.department_id].append(
+            {
+                "id": designation.id,
+                "title": designation.title,
+                "description": designation.description,
+                "priority": designation.priority,
+                "allow_multiple_employees": designation.allow_multiple_employees,
+                "employees": employees_by_designation[designation.id],
+            }
+        )
+
+    documents_by_detail = defaultdict(list)
+    for document in documents:
+        documents_by_detail[document.service_detail_id].append(
+            {"id": document.id, "name": document.name, "url": _file_url(document.file)}
+        )
+
+    responsible_by_detail = defaultdict(list)
+    for detail_id, employee_id in responsible:
+        if employee_id in employees_by_id:
+            responsible_by_detail[detail_id].append(employees_by_id[employee_id])
+
+    return {
+        "organization": {
+            "id": organization.id,
+            "name": organization.name,
+            "tag_line": organization.tag_line,
+            "description": organization.description,
+            "province": organization.province,
+            "district": organization.district,
+            "municipality": organization.municipality,
+            "ward_no": organization.ward_no,
+            "contact_no": organization.contact_no,
+            "website": organization.website,
+            "logo": _file_url(organization.logo),
+        },
+        "departments": [
+            {
+                "id": department.id,
+                "name": department.name,
+                "description": department.description,
+                "contact_no": department.contact_no,
+                "email": department.email,
+                "designations": designations_by_department[department.id],
+            }
+            for department in departments
+        ],
+        "services": [
+            {
+                "id": detail.id,
+                "service_id": detail.service_id,
+                "name": detail.service.name,
+                "description": detail.service.description,
+                "required_documents": detail.required_documents,
+                "process_flow": detail.process_flow,
+                "fees": detail.fees,
+                "timeline": detail.timeline,
+                "responsible_employees": responsible_by_detail[detail.id],
+                "sample_documents": documents_by_detail[detail.id],
+            }
+            for detail in service_details
+        ],
+    }
@@ -0,0 +1,148 @@
+"""Benchmark the single charter query against the chained per-level GraphQL calls."""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import Client, override_settings
+
+from charter.builder import build_charter
+from charter.snapshots import get_charter_json, rebuild_snapshot
+from employee.models import Employee
+from organization.models import Department, Designation, Organization
+from root.benchmark import benchmark_database, measure
+
+User = get_user_model()
+
+CHARTER_QUERY = """
+query ($id: Int!) {
+    charter(organizationId: $id) {
+        organization { name }
+        departments { name designations { title employees { name contactNo } } }
+        services { name fees }
+    }
+}
+"""
+
+
+class Command(BaseCommand):
+    help = "Compare the charter query with the multi-call flow used by kiosk clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=10)
+        parser.add_argument("--designations", type=int, default=8)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            organization = self._seed(options["departments"], options["designations"])
+            client = Client()
+            calls = {}
+
+            def post(flow, query, **variables):
+                calls[flow] = calls.get(flow, 0) + 1
+                response = client.post(
+                    "/",
+                    json.dumps({"query": query, "variables": variables}),
+                    content_type="application/json",
+                )
+                return response.json()["data"]
+
+            def charter():
+                post("charter", CHARTER_QUERY, id=organization.id)
+
+            def chained():
+                post(
+                    "chained",
+                    "query ($id: Int) { getOrganizationsById(organizationId: $id) { name } }",
+                    id=organization.id,
+                )
+                departments = post(
+                    "chained",
+                    "query ($id: Int!) { getDepartmentsByOrganization(organizationId: $id) "
+                    "{ id name } }",
+                    id=organization.id,
+                )["getDepartmentsByOrganization"]
+                for department in departments:
+                    designations = post(
+                        "chained",
+                        "query ($id: Int!) { getDesignationsByDepartment(departmentId: $id) "
+                        "{ id title } }",
+                        id=department["id"],
+                    )["getDesignationsByDepartment"]
+                    for designation in designations:
+                        post(
+                            "chained",
+                            "query ($id: Int) { employees(designationId: $id) "
+                            "{ edges { node { name contactNo } } } }",
+                            id=designation["id"],
+                        )
+
+            uncached = {"BACKEND": ""}
+            cached = {"BACKEND": "root.response_cache.LRUBackend"}
+            for name, flow, cache in (
+                ("charter", charter, uncached),
+                ("chained", chained, uncached),
+                ("cached", charter, cached),
+            ):
+                with override_settings(GRAPHQL_RESPONSE_CACHE=cache):
+                    flow()
+                    calls.clear()
+                    result = measure(flow, repeat=options["repeat"])
+                self.stdout.write(
+                    f"{name:>8}: {sum(calls.values()) // (options['repeat'] + 1)} HTTP calls, "
+                    f"{result['queries']} SQL queries, median {result['median_ms']:.1f} ms, "
+                    f"p99 {result['p99_ms']:.1f} ms"
+                )
+
+    def _seed(self, department_count, designation_count):
+        organization = Organization.objects.create(
+            user=User.objects.create_user(username="benchmark"),
+            name="Benchmark Municipality",
+            description="Benchmark organization",
+            province="Bagmati",
+            district="Kathmandu",
+            municipality="Kathmandu",
+            ward_no="1",
+            contact_no="01-0000000",
+            website="https://example.com",
+        )
+        departments = Department.objects.bulk_create(
+            Department(
+                organization=organization,
+                name=f"Department {index}",
+                description="Benchmark department",
+                contact_no="01-0000000",
+                email=f"department{index}@example.com",
+            )
+            for index in range(department_count)
+        )
+        designations = Designation.objects.bulk_create(
+            Designation(
+                organization=organization,
+                department=department,
+                title=f"Designation {index}",
+                description="Benchmark designation",
+                priority=index,
+            )
+            for department in departments
+            for index in range(designation_count)
+        )
+        Employee.objects.bulk_create(
+            Employee(
+                designation=designation,
+                organization=organization,
+                department_id=designation.department_id,
+                name=f"Employee {designation.pk}",
+                description="Benchmark employee",
+                contact_no="9800000000",
+            )
+            for designation in designations
+        )
+        # The bulk inserts send no signals, so the snapshot still holds the empty organization.
+        rebuild_snapshot(organization.id)
+        live = json.dumps(build_charter(organization.id), cls=DjangoJSONEncoder)
+        if json.loads(get_charter_json(organization.id)) != json.loads(live):
+            raise CommandError("The charter snapshot differs from the charter built live.")
+        return organization
@@ -0,0 +1,23 @@
+"""Rebuild the precomputed charter snapshots."""
+
+from django.core.management.base import BaseCommand
+
+from charter.snapshots import rebuild_snapshot
+from organization.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Rebuild the charter snapshot of every (or the given) organization."
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization_ids", nargs="*", type=int)
+
+    def handle(self, *args, **options):
+        organization_ids = options["organization_ids"] or list(
+            Organization.objects.values_list("pk", flat=True)
+        )
+        for organization_id in organization_ids:
+            rebuild_snapshot(organization_id)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {len(organization_ids)} charter snapshot(s).")
+        )
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organization', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharterSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.BinaryField()),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='charter_snapshot', to='organization.organization')),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+"""This file contains the models for the charter app."""
+
+from django.db import models
+
+
+class CharterSnapshot(models.Model):
+    """
+    CharterSnapshot stores the precomputed charter of an organization as compressed JSON.
+    """
+
+    organization = models.OneToOneField(
+        "organization.Organization", on_delete=models.CASCADE, related_name="charter_snapshot"
+    )
+    payload = models.BinaryField()
+    version = models.PositiveIntegerField(default=1)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Charter snapshot of organization {self.organization_id} (v{self.version})"
@@ -0,0 +1,37 @@
+"""This module contains the schema for the charter app."""
+
+from typing import Optional
+
+import strawberry
+from strawberry.utils.inspect import in_async_context
+
+from .snapshots import aget_charter, get_charter
+from .types import CharterType
+
+
+@strawberry.type
+class Query:
+    """Query type for the Charter app."""
+
+    @strawberry.field
+    def charter(self, organization_id: int) -> Optional[CharterType]:
+        """
+        Fetches the full charter of an organization in a single round trip, served from its
+        precomputed snapshot.
+        """
+        if in_async_context():
+            return _acharter(organization_id)
+        data = get_charter(organization_id)
+        if data is None:
+            return None
+        return CharterType.from_data(data)
+
+
+async def _acharter(organization_id):
+    data = await aget_charter(organization_id)
+    if data is None:
+        return None
+    return CharterType.from_data(data)
+
+
+schema = strawberry.Schema(query=Query)
@@ -0,0 +1,92 @@
+# charter/signals.py
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from employee.models import Employee
+from organization.models import Department, Designation, Organization
+from organization.signals import organizations_changed
+from service.models import SampleDocments, Service, ServiceDetail
+
+from .snapshots import schedule_rebuild
+
+# Lookup from each model that feeds the charter to the organization(s) it belongs to.
+ORGANIZATION_LOOKUPS = {
+    Organization: "pk",
+    Department: "organization_id",
+    Designation: "organization_id",
+    Employee: "organization_id",
+    Service: "service_details__organization_id",
+    ServiceDetail: "organization_id",
+    SampleDocments: "service_detail__organization_id",
+}
+
+
+def affected_organizations(model, pks):
+    """Return the ids of the organizations whose charter includes the given rows."""
+    return set(
+        model._default_manager.filter(pk__in=pks).values_list(
+            ORGANIZATION_LOOKUPS[model], flat=True
+        )
+    )
+
+
+def organizations_of(sender, instance, stored=False):
+    """
+    Return the ids of the organizations whose charter includes the instance, as saved in the
+    database when ``stored`` is set. Rows holding the organization column directly are read
+    off the instance; only the other lookups run a query.
+    """
+    lookup = ORGANIZATION_LOOKUPS[sender]
+    if lookup == "pk":
+        return {instance.pk}
+    if "__" in lookup:
+        return affected_organizations(sender, [instance.pk])
+    organization_id = instance.stored_value(lookup) if stored else getattr(instance, lookup)
+    return {organization_id} if organization_id is not None else set()
+
+
+def remember_organizations_before_save(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk:
+        instance._charter_organizations = organizations_of(sender, instance, stored=True)
+
+
+def remember_organizations_before_delete(sender, instance, **kwargs):
+    instance._charter_organizations = organizations_of(sender, instance, stored=True)
+
+
+def rebuild_charter_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_charter_organizations", set())
+    schedule_rebuild(previous | organizations_of(sender, instance))
+
+
+def rebuild_charter_on_delete(sender, instance, **kwargs):
+    schedule_rebuild(getattr(instance, "_charter_organizations", set()))
+
+
+for model in ORGANIZATION_LOOKUPS:
+    pre_save.connect(remember_organizations_before_save, sender=model)
+    pre_delete.connect(remember_organizations_before_delete, sender=model)
+    post_save.connect(rebuild_charter_on_save, sender=model)
+    post_delete.connect(rebuild_charter_on_delete, sender=model)
+
+
+@receiver(organizations_changed)
+def rebuild_charter_on_bulk_change(sender, organization_ids, **kwargs):
+    schedule_rebuild(organization_ids)
+
+
+@receiver(m2m_changed, sender=ServiceDetail.responsible_employees.through)
+def rebuild_charter_on_responsible_employees_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_rebuild([instance.organization_id])
+    elif pk_set:
+        schedule_rebuild(affected_organizations(ServiceDetail, pk_set))
+    else:
+        schedule_rebuild(affected_organizations(Employee, [instance.pk]))
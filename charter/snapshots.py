@@ -0,0 +1,118 @@
+"""This module stores and serves the precomputed charter snapshots."""
+
+import json
+import threading
+import zlib
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+
+from .builder import build_charter
+from .models import CharterSnapshot
+
+_pending = threading.local()
+
+
+def encode_charter(data):
+    """Serialize charter data into the compact blob stored in the snapshot."""
+    document = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return zlib.compress(document.encode())
+
+
+def rebuild_snapshot(organization_id):
+    """
+    Rebuild the snapshot of an organization, removing it if the organization is gone or
+    inactive.
+    """
+    data = build_charter(organization_id)
+    if data is None:
+        CharterSnapshot.objects.filter(organization_id=organization_id).delete()
+        return None
+
+    payload = encode_charter(data)
+    CharterSnapshot.objects.update_or_create(
+        organization_id=organization_id,
+        defaults={"payload": payload, "version": F("version") + 1},
+        create_defaults={"payload": payload},
+    )
+    return data
+
+
+def get_charter_json(organization_id):
+    """
+    Return the charter of an organization as JSON bytes, read straight from its snapshot.
+
+    A missing snapshot is built on the fly without being stored: snapshots are only written
+    when the charter changes or by ``rebuild_charter_snapshots``.
+    """
+    payload = _payload_queryset(organization_id).first()
+    if payload is not None:
+        return zlib.decompress(payload)
+    return _build_charter_json(organization_id)
+
+
+async def aget_charter_json(organization_id):
+    """Async version of ``get_charter_json`` reading the snapshot with the async ORM."""
+    payload = await _payload_queryset(organization_id).afirst()
+    if payload is not None:
+        return zlib.decompress(payload)
+    return await sync_to_async(_build_charter_json)(organization_id)
+
+
+def get_charter(organization_id):
+    """Return the charter of an organization as plain data, read from its snapshot."""
+    document = get_charter_json(organization_id)
+    if document is None:
+        return None
+    return json.loads(document)
+
+
+async def aget_charter(organization_id):
+    """Async version of ``get_charter``."""
+    document = await aget_charter_json(organization_id)
+    if document is None:
+        return None
+    return json.loads(document)
+
+
+def _payload_queryset(organization_id):
+    return CharterSnapshot.objects.filter(organization_id=organization_id).values_list(
+        "payload", flat=True
+    )
+
+
+def _build_charter_json(organization_id):
+    data = build_charter(organization_id)
+    if data is None:
+        return None
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+
+
+def schedule_rebuild(organization_ids):
+    """
+    Rebuild the snapshots of the organizations once the current transaction commits.
+
+    An organization touched many times in one transaction is rebuilt only once.
+    """
+    pending = _pending_ids()
+    for organization_id in organization_ids:
+        if organization_id is None:
+            continue
+        pending.add(organization_id)
+        transaction.on_commit(partial(_rebuild_pending, organization_id), robust=True)
+
+
+def _pending_ids():
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    return _pending.ids
+
+
+def _rebuild_pending(organization_id):
+    pending = _pending_ids()
+    if organization_id in pending:
+        pending.discard(organization_id)
+        rebuild_snapshot(organization_id)
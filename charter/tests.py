@@ -0,0 +1,234 @@
+"""Tests for the Charter app."""
+
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+
+from employee.models import Employee
+from organization.models import Department, Designation
+from root.schema import schema
+from root.testing import (
+    GraphQLTestCase,
+    create_department,
+    create_designation,
+    create_employee,
+    create_organization,
+)
+from service.models import SampleDocments, Service, ServiceDetail
+
+from .models import CharterSnapshot
+
+fake = Faker()
+
+CHARTER_QUERY = """
+    query ($organizationId: Int!) {
+        charter(organizationId: $organizationId) {
+            organization { name }
+            departments {
+                name
+                designations { title priority employees { name profilePicture } }
+            }
+            services {
+                name
+                fees
+                responsibleEmployees { name }
+                sampleDocuments { name url }
+            }
+        }
+    }
+"""
+
+
+class CharterTestCase(GraphQLTestCase):
+    """Shared fixtures for the charter tests."""
+
+    def setUp(self):
+        """Set up an organization with a small charter."""
+        self.organization = create_organization()
+        self.service = Service.objects.create(name=fake.unique.bs())
+
+    def _add_department(self, designation_count, is_active=True):
+        department = create_department(self.organization, is_active=is_active)
+        for priority in reversed(range(designation_count)):
+            create_employee(create_designation(department, priority=priority))
+        return department
+
+    def _charter(self):
+        data, queries = self.execute_data(CHARTER_QUERY, organizationId=self.organization.id)
+        return data["charter"], len(queries)
+
+
+class CharterQueryTest(CharterTestCase):
+    """Test the single round trip charter query."""
+
+    def test_charter_contains_the_full_tree(self):
+        """Test that the charter nests designations, employees and services correctly."""
+        self._add_department(3)
+        self._add_department(2, is_active=False)
+        detail = ServiceDetail.objects.create(
+            organization=self.organization,
+            service=self.service,
+            required_documents="Citizenship",
+            process_flow="Apply",
+            timeline="1 day",
+        )
+        detail.responsible_employees.add(Employee.objects.first())
+        SampleDocments.objects.create(
+            service_detail=detail, name="Application Form", file="sample_documents/form.pdf"
+        )
+
+        charter, _ = self._charter()
+
+        self.assertEqual(charter["organization"]["name"], self.organization.name)
+        self.assertEqual(len(charter["departments"]), 1)
+        designations = charter["departments"][0]["designations"]
+        self.assertEqual([item["priority"] for item in designations], [0, 1, 2])
+        self.assertTrue(all(len(item["employees"]) == 1 for item in designations))
+        service = charter["services"][0]
+        self.assertEqual(service["name"], self.service.name)
+        self.assertEqual(len(service["responsibleEmployees"]), 1)
+        self.assertEqual(service["sampleDocuments"][0]["name"], "Application Form")
+        self.assertTrue(service["sampleDocuments"][0]["url"].endswith("form.pdf"))
+
+    def test_charter_query_count_is_constant(self):
+        """Test that the charter costs the same number of queries for any tree size."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_department(1)
+            ServiceDetail.objects.create(
+                organization=self.organization,
+                service=self.service,
+                required_documents="Citizenship",
+                process_flow="Apply",
+                timeline="1 day",
+            )
+        _, small_count = self._charter()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                self._add_department(6)
+        charter, large_count = self._charter()
+
+        self.assertEqual(len(charter["departments"]), 6)
+        self.assertEqual(small_count, large_count)
+
+    def test_charter_of_unknown_organization_is_null(self):
+        """Test that an unknown organization id resolves to null."""
+        data, _ = self.execute_data(CHARTER_QUERY, organizationId=0)
+
+        self.assertIsNone(data["charter"])
+
+    def test_charter_on_the_event_loop_matches_sync(self):
+        """Test that the async charter resolver serves the same snapshot."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_department(2)
+        expected, _ = self._charter()
+
+        result = async_to_sync(schema.execute)(
+            CHARTER_QUERY, variable_values={"organizationId": self.organization.id}
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["charter"], expected)
+
+
+class CharterSnapshotTest(CharterTestCase):
+    """Test the precomputed charter snapshots and the REST endpoint serving them."""
+
+    def _snapshot(self):
+        return CharterSnapshot.objects.get(organization=self.organization)
+
+    def test_snapshot_is_rebuilt_on_commit(self):
+        """Test that every change to the charter tree rebuilds the snapshot once."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            department = self._add_department(2)
+
+        self.assertTrue(callbacks)
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.version, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            department.name = "Renamed Department"
+            department.save()
+
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.version, 2)
+        charter, _ = self._charter()
+        self.assertEqual(charter["departments"][0]["name"], "Renamed Department")
+
+    def test_snapshot_read_costs_a_single_query(self):
+        """Test that a charter read from its snapshot costs exactly one query."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                self._add_department(4)
+
+        charter, query_count = self._charter()
+
+        self.assertEqual(len(charter["departments"]), 3)
+        self.assertEqual(query_count, 1)
+
+    def test_snapshot_follows_moved_and_deleted_employees(self):
+        """Test that moving an employee rebuilds both organizations and deletes drop it."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_department(1)
+        employee = Employee.objects.get()
+        other = create_organization()
+        other_designation = Designation.objects.create(
+            organization=other,
+            department=Department.objects.create(organization=other, name="Other"),
+            title="Officer",
+            priority=0,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.designation = other_designation
+            employee.save()
+
+        charter, _ = self._charter()
+        self.assertEqual(charter["departments"][0]["designations"][0]["employees"], [])
+        other_charter = self.client.get(f"/charter/{other.id}/").json()
+        employees = other_charter["departments"][0]["designations"][0]["employees"]
+        self.assertEqual([item["name"] for item in employees], [employee.name])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+
+        other_charter = self.client.get(f"/charter/{other.id}/").json()
+        self.assertEqual(other_charter["departments"][0]["designations"][0]["employees"], [])
+
+    def test_missing_snapshot_is_served_without_being_stored(self):
+        """Test that reading a charter without a snapshot builds it but never writes it."""
+        self._add_department(2)
+        CharterSnapshot.objects.all().delete()
+
+        response = self.client.get(f"/charter/{self.organization.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["departments"]), 1)
+        self.assertFalse(CharterSnapshot.objects.exists())
+
+    def test_rebuilding_an_existing_snapshot_bumps_its_version(self):
+        """Test that rebuilding updates the stored snapshot in place."""
+        self._add_department(1)
+        for _ in range(2):
+            call_command("rebuild_charter_snapshots", self.organization.id, stdout=StringIO())
+
+        self.assertEqual(CharterSnapshot.objects.count(), 1)
+        self.assertEqual(self._snapshot().version, 2)
+
+    def test_rest_endpoint_serves_the_snapshot(self):
+        """Test that the REST endpoint returns the stored JSON and 404s for unknown ids."""
+        self._add_department(2)
+        call_command("rebuild_charter_snapshots", self.organization.id, stdout=StringIO())
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/charter/{self.organization.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(len(response.json()["departments"]), 1)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.client.get("/charter/0/").status_code, 404)
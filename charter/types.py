@@ -0,0 +1,161 @@
+"""This module contains the types for the charter app."""
+
+from typing import List, Optional
+
+import strawberry
+
+
+@strawberry.type
+class CharterEmployeeType:
+    """
+    CharterEmployeeType represents an employee listed in a charter.
+    """
+
+    id: int
+    name: str
+    description: str
+    email: Optional[str]
+    contact_no: str
+    profile_picture: str
+    is_available: bool
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(**data)
+
+
+@strawberry.type
+class CharterDesignationType:
+    """
+    CharterDesignationType represents a designation and the employees holding it.
+    """
+
+    id: int
+    title: str
+    description: str
+    priority: int
+    allow_multiple_employees: bool
+    employees: List[CharterEmployeeType]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(
+            **{
+                **data,
+                "employees": [CharterEmployeeType.from_data(item) for item in data["employees"]],
+            }
+        )
+
+
+@strawberry.type
+class CharterDepartmentType:
+    """
+    CharterDepartmentType represents a department with its priority ordered designations.
+    """
+
+    id: int
+    name: str
+    description: str
+    contact_no: str
+    email: str
+    designations: List[CharterDesignationType]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(
+            **{
+                **data,
+                "designations": [
+                    CharterDesignationType.from_data(item) for item in data["designations"]
+                ],
+            }
+        )
+
+
+@strawberry.type
+class CharterDocumentType:
+    """
+    CharterDocumentType represents a sample document of a service.
+    """
+
+    id: int
+    name: str
+    url: Optional[str]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(**data)
+
+
+@strawberry.type
+class CharterServiceType:
+    """
+    CharterServiceType represents a service as offered by the organization.
+    """
+
+    id: int
+    service_id: int
+    name: str
+    description: str
+    required_documents: str
+    process_flow: str
+    fees: str
+    timeline: str
+    responsible_employees: List[CharterEmployeeType]
+    sample_documents: List[CharterDocumentType]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(
+            **{
+                **data,
+                "responsible_employees": [
+                    CharterEmployeeType.from_data(item) for item in data["responsible_employees"]
+                ],
+                "sample_documents": [
+                    CharterDocumentType.from_data(item) for item in data["sample_documents"]
+                ],
+            }
+        )
+
+
+@strawberry.type
+class CharterOrganizationType:
+    """
+    CharterOrganizationType represents the organization a charter belongs to.
+    """
+
+    id: int
+    name: str
+    tag_line: str
+    description: str
+    province: str
+    district: str
+    municipality: str
+    ward_no: str
+    contact_no: str
+    website: str
+    logo: Optional[str]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(**data)
+
+
+@strawberry.type
+class CharterType:
+    """
+    CharterType represents the full citizen charter of an organization.
+    """
+
+    organization: CharterOrganizationType
+    departments: List[CharterDepartmentType]
+    services: List[CharterServiceType]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(
+            organization=CharterOrganizationType.from_data(data["organization"]),
+            departments=[CharterDepartmentType.from_data(item) for item in data["departments"]],
+            services=[CharterServiceType.from_data(item) for item in data["services"]],
+        )
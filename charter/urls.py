@@ -0,0 +1,9 @@
+"""This file contains the URL patterns for the charter app."""
+
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("<int:organization_id>/", views.charter_detail, name="charter-detail"),
+]
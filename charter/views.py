@@ -0,0 +1,16 @@
+"""This file contains the views for the charter app."""
+
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from .snapshots import get_charter_json
+
+
+@require_http_methods(["GET"])
+def charter_detail(request, organization_id):
+    """This function returns the charter of the organization from its snapshot."""
+
+    document = get_charter_json(organization_id)
+    if document is None:
+        return JsonResponse({"error": "Organization not found."}, status=404)
+    return HttpResponse(document, content_type="application/json")
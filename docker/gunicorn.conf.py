@@ -0,0 +1,25 @@
+"""Gunicorn settings of the production server, tuned through environment variables."""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# "asgi" serves root.asgi with uvicorn workers, each handling many concurrent requests on
+# its event loop; "wsgi" serves root.wsgi with one request per sync worker at a time.
+server_mode = os.getenv("SERVER_MODE", "wsgi").lower()
+if server_mode == "asgi":
+    wsgi_app = "root.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+else:
+    wsgi_app = "root.wsgi:application"
+    worker_class = "sync"
+    workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers now and then so a leak in one of them cannot grow unbounded.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
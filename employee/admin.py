@@ -1,8 +1,14 @@
 """Registering the model with the Django admin site."""
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 
-from .forms import EmployeeForm
+from media.admin import image_download_status
+
+from .forms import EmployeeForm, EmployeeImportForm
+from .importing import import_employees, read_employee_rows
 from .models import Employee
 
 
@@ -13,6 +19,7 @@ class EmployeeAdmin(admin.ModelAdmin):
     """
 
     form = EmployeeForm
+    change_list_template = "admin/employee/employee/change_list.html"
 
     list_display = (
         "name",
@@ -25,8 +32,8 @@ class EmployeeAdmin(admin.ModelAdmin):
     )
 
     list_filter = (
-        "designation__department__organization",
-        "designation__department",
+        "organization",
+        "department",
         "designation",
         "is_available",
     )
@@ -35,8 +42,51 @@ class EmployeeAdmin(admin.ModelAdmin):
         "name",
         "email",
         "designation__name",
-        "designation__department__name",
-        "designation__department__organization__name",
+        "department__name",
+        "organization__name",
     )
 
-    list_select_related = ("designation__department__organization",)
+    list_select_related = ("organization", "department", "designation")
+
+    readonly_fields = (image_download_status("profile_picture", "Profile picture download"),)
+
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_employees_view),
+                name="employee_employee_import",
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_employees_view(self, request):
+        """
+        Import the employees of an uploaded CSV or XLSX roster, like the ``import_employees``
+        command, and list the rows that were skipped.
+        """
+        if not self.has_add_permission(request):
+            return redirect("admin:employee_employee_changelist")
+        form = EmployeeImportForm(request.POST or None, request.FILES or None)
+        result = None
+        if form.is_valid():
+            file = form.cleaned_data["file"]
+            result = import_employees(read_employee_rows(file, file.name))
+            self.message_user(
+                request,
+                f"{result['created']} employee(s) imported, {result['failed']} row(s) skipped.",
+                messages.WARNING if result["failed"] else messages.SUCCESS,
+            )
+            if not result["failed"]:
+                return redirect("admin:employee_employee_changelist")
+        return TemplateResponse(
+            request,
+            "admin/employee/employee/import_employees.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Import employees",
+                "opts": self.model._meta,
+                "form": form,
+                "result": result,
+            },
+        )
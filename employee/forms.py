@@ -2,7 +2,7 @@
 
 from django import forms
 
-from root.utils import download_image_from_url
+from media.downloads import enqueue_image_download
 
 from .models import Department, Designation, Employee, Organization
 
@@ -33,7 +33,9 @@ class EmployeeForm(forms.ModelForm):
             }
         ),
     )
-    profile_picture_url = forms.URLField(required=False)
+    profile_picture_url = forms.URLField(
+        required=False, help_text="The picture is downloaded in the background after saving."
+    )
 
     def __init__(self, *args, **kwargs):
         """
@@ -110,11 +112,36 @@ class EmployeeForm(forms.ModelForm):
 
     def save(self, commit=True):
         instance = super().save(commit=False)
-        profile_picture_url = self.cleaned_data.get("profile_picture_url")
-        if profile_picture_url:
-            filename = f"{instance.name}.jpg"
-            image_file = download_image_from_url(profile_picture_url, filename)
-            instance.profile_picture.save(filename, image_file, save=False)
         if commit:
             instance.save()
+            self._save_m2m()
         return instance
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        # Queued once the employee is saved, so the request doesn't wait for the download.
+        profile_picture_url = self.cleaned_data.get("profile_picture_url")
+        if profile_picture_url:
+            enqueue_image_download(
+                self.instance,
+                "profile_picture",
+                profile_picture_url,
+                f"{self.instance.name}.jpg",
+            )
+
+
+class EmployeeImportForm(forms.Form):
+    """
+    EmployeeImportForm takes the CSV or XLSX roster of employees imported from the admin.
+    """
+
+    file = forms.FileField(
+        help_text="A .csv or .xlsx file with a header row and the organization, department, "
+        "designation, name, description, email, contact_no and is_available of each employee."
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        if not file.name.lower().endswith((".csv", ".xlsx")):
+            raise forms.ValidationError("Upload a .csv or .xlsx file.")
+        return file
@@ -0,0 +1,188 @@
+"""This module contains the bulk import of employees from CSV and XLSX rosters."""
+
+import csv
+import io
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from organization.models import Designation, Organization
+from organization.signals import organizations_changed
+
+from .models import Employee
+
+# Columns of a roster. The designation is found by the names of its organization and
+# department and its title, compared case-insensitively.
+EMPLOYEE_COLUMNS = (
+    "organization",
+    "department",
+    "designation",
+    "name",
+    "description",
+    "email",
+    "contact_no",
+    "is_available",
+)
+FALSE_VALUES = {"0", "false", "no", "n"}
+
+
+def read_employee_rows(file, name):
+    """
+    Yield the rows of a ``.csv`` or ``.xlsx`` roster as dictionaries, one at a time, so
+    large files are never loaded whole.
+    """
+    suffix = Path(name).suffix.lower()
+    if suffix == ".csv":
+        if isinstance(file, io.TextIOBase):
+            yield from csv.DictReader(file)
+        else:
+            yield from csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig"))
+    elif suffix == ".xlsx":
+        yield from _read_xlsx_rows(file)
+    else:
+        raise ValidationError(f"Unsupported file type '{suffix}', use a .csv or .xlsx file.")
+
+
+def _read_xlsx_rows(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or "").strip() for cell in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+class DesignationIndex:
+    """
+    In-memory index of every designation by organization name, department name and title,
+    loaded with two queries, together with the single-employee designations already held.
+    """
+
+    def __init__(self):
+        self._designations = {}
+        for designation in Designation.objects.values(
+            "pk",
+            "title",
+            "allow_multiple_employees",
+            "organization_id",
+            "organization__name",
+            "department_id",
+            "department__name",
+        ):
+            key = (
+                _key(designation["organization__name"]),
+                _key(designation["department__name"]),
+                _key(designation["title"]),
+            )
+            self._designations.setdefault(key, []).append(designation)
+        self.occupied = set(
+            Employee.objects.filter(designation__allow_multiple_employees=False)
+            .values_list("designation_id", flat=True)
+            .distinct()
+        )
+
+    def find(self, organization, department, title):
+        """Return the designation of the row, raising ``ValidationError`` if there isn't one."""
+        matches = self._designations.get((_key(organization), _key(department), _key(title)))
+        if not matches:
+            raise ValidationError(
+                f"No designation '{title}' in department '{department}' of '{organization}'."
+            )
+        if len(matches) > 1:
+            raise ValidationError(
+                f"Designation '{title}' in department '{department}' of '{organization}' "
+                "is ambiguous."
+            )
+        return matches[0]
+
+
+def import_employees(rows, chunk_size=500, progress=None):
+    """
+    Create the employees of the rows with ``bulk_create``, in one transaction per chunk.
+
+    Rows are validated against a ``DesignationIndex`` instead of per row queries: the
+    designation must exist, a single-employee designation must be free, and emails must
+    be unique among existing employees (one query per chunk) and within the file. Invalid
+    rows are reported and skipped; the other rows of their chunk are still created.
+
+    ``progress`` is called after each chunk with the number of rows read, the number of
+    employees created and the ``(row number, message)`` errors so far.
+    """
+    index = DesignationIndex()
+    emails = set()
+    created = 0
+    errors = []
+    rows = iter(rows)
+    number = 0
+    while chunk := list(islice(rows, chunk_size)):
+        employees = []
+        existing_emails = _existing_emails(chunk)
+        for row in chunk:
+            number += 1
+            try:
+                employees.append(_build_employee(row, index, emails, existing_emails))
+            except ValidationError as error:
+                errors.extend((number, message) for message in error.messages)
+        with transaction.atomic():
+            Employee.objects.bulk_create(employees)
+            organizations_changed.send(
+                sender=Organization,
+                organization_ids={employee.organization_id for employee in employees},
+            )
+        created += len(employees)
+        if progress is not None:
+            progress(number, created, errors)
+    return {"created": created, "failed": len({number for number, _ in errors}), "errors": errors}
+
+
+def _build_employee(row, index, emails, existing_emails):
+    values = {column: str(row.get(column) or "").strip() for column in EMPLOYEE_COLUMNS}
+    designation = index.find(values["organization"], values["department"], values["designation"])
+    employee = Employee(
+        designation_id=designation["pk"],
+        organization_id=designation["organization_id"],
+        department_id=designation["department_id"],
+        name=values["name"],
+        description=values["description"],
+        email=values["email"] or None,
+        contact_no=values["contact_no"],
+        is_available=values["is_available"].lower() not in FALSE_VALUES,
+    )
+    # The relations come from the index and the uniqueness checks are made in bulk.
+    try:
+        employee.clean_fields(exclude=["designation", "organization", "department"])
+    except ValidationError as error:
+        raise ValidationError(
+            [
+                f"{field}: {message}"
+                for field, messages in error.message_dict.items()
+                for message in messages
+            ]
+        )
+    if employee.email is not None:
+        if employee.email in existing_emails or employee.email in emails:
+            raise ValidationError(f"email: An employee with email '{employee.email}' exists.")
+        emails.add(employee.email)
+    if not designation["allow_multiple_employees"]:
+        if designation["pk"] in index.occupied:
+            raise ValidationError(
+                f"The employee has already been assigned to the {designation['title']} role."
+            )
+        index.occupied.add(designation["pk"])
+    return employee
+
+
+def _existing_emails(chunk):
+    emails = {str(row.get("email") or "").strip() for row in chunk} - {""}
+    return set(Employee.objects.filter(email__in=emails).values_list("email", flat=True))
+
+
+def _key(name):
+    return str(name or "").strip().casefold()
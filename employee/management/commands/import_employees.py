@@ -0,0 +1,41 @@
+"""Import employees in bulk from a CSV or XLSX roster."""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.importing import import_employees, read_employee_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the employees listed in a CSV or XLSX file. Each row is matched to a "
+        "designation by organization name, department name and title. Invalid rows are "
+        "reported and skipped without stopping the import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="A .csv or .xlsx file with a header row.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=500, help="Employees written per transaction."
+        )
+
+    def handle(self, *args, **options):
+        def progress(read, created, errors):
+            self.stdout.write(f"{read} rows: {created} created, {len(errors)} error(s)")
+
+        try:
+            with open(options["path"], "rb") as file:
+                result = import_employees(
+                    read_employee_rows(file, options["path"]), options["chunk_size"], progress
+                )
+        except OSError as error:
+            raise CommandError(f"Could not read {options['path']}: {error}")
+        except ValidationError as error:
+            raise CommandError("\n".join(error.messages))
+        for number, message in result["errors"]:
+            self.stderr.write(f"Row {number}: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} employee(s), skipped {result['failed']} row(s)."
+            )
+        )
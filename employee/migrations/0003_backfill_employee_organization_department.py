@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization_and_department(apps, schema_editor):
+    """Copy the organization and department of every designation onto its employees."""
+    Designation = apps.get_model("organization", "Designation")
+    Employee = apps.get_model("employee", "Employee")
+    designation = Designation.objects.filter(pk=OuterRef("designation_id"))
+    Employee.objects.update(
+        organization_id=Subquery(designation.values("organization_id")[:1]),
+        department_id=Subquery(designation.values("department_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_employee_organization_department'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_organization_and_department, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0003_backfill_employee_organization_department'),
+        ('organization', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='department',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='organization.department'),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='organization.organization'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_alter_employee_organization_department'),
+        ('organization', '0002_alter_designation_department_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='designation',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='organization.designation'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['designation', 'is_available'], name='employee_desig_available_idx'),
+        ),
+    ]
@@ -1,54 +1,86 @@
+from functools import partial
+
 from django.core.exceptions import ValidationError
-from django.core.files.storage import default_storage
-from django.db import models
+from django.db import models, transaction
 
+from media.storage import content_addressed_storage, replace_file
 from organization.models import Department, Designation, Organization
+from root.tracking import TrackedFieldsMixin
 from root.utils import UploadToPathAndRename
 
 
-class Employee(models.Model):
-    designation = models.ForeignKey(Designation, on_delete=models.CASCADE)
+class Employee(TrackedFieldsMixin, models.Model):
+    """
+    Employee holding a designation of an organization.
+
+    Saving an employee loaded from the database runs the UPDATE plus at most one query to
+    load its designation. Moving it to a single-employee designation adds the occupancy
+    check, and changing its email adds the uniqueness check.
+    """
+
+    tracked_fields = ("designation", "organization", "email", "profile_picture")
+
+    # Indexed by the (designation, is_available) index below.
+    designation = models.ForeignKey(Designation, on_delete=models.CASCADE, db_index=False)
+    # Copied from the designation on save, so employees can be scoped with an index.
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
     description = models.TextField(blank=False)
     email = models.EmailField(unique=True, blank=True, null=True)
     contact_no = models.CharField(max_length=15)
     profile_picture = models.ImageField(
-        upload_to=UploadToPathAndRename("profile_pictures"), blank=True, null=True
+        upload_to=UploadToPathAndRename("profile_pictures"),
+        storage=content_addressed_storage,
+        blank=True,
+        null=True,
+        db_index=True,
     )
     is_available = models.BooleanField(default=True)
 
-    @property
-    def organization(self):
-        """Return the organization this employee belongs to via designation."""
-        try:
-            return self.designation.department.organization if self.designation else None
-        except (AttributeError, models.ObjectDoesNotExist):
-            return None
-
-    @property
-    def department(self):
-        """Return the department this employee belongs to via designation."""
-        try:
-            return self.designation.department if self.designation else None
-        except (AttributeError, models.ObjectDoesNotExist):
-            return None
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["designation", "is_available"], name="employee_desig_available_idx"
+            ),
+        ]
 
     def clean(self):
-        self.validate_designation()
+        # An employee staying on its designation already holds it.
+        if self.has_changed("designation"):
+            self.validate_designation()
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        try:
-            old_employee = Employee.objects.get(pk=self.pk)
-            if (
-                old_employee.profile_picture
-                and old_employee.profile_picture != self.profile_picture
-                and default_storage.exists(old_employee.profile_picture.name)
-            ):
-                default_storage.delete(old_employee.profile_picture.name)
-        except Employee.DoesNotExist:
-            pass
+        self.sync_with_designation()
+        self.full_clean(exclude=self.constraint_checked_fields())
+        old_picture = self.stored_value("profile_picture")
+        picture_changed = self.has_changed("profile_picture")
         super().save(*args, **kwargs)
+        if picture_changed:
+            # Released once committed, when no other row shares the replaced file.
+            transaction.on_commit(partial(replace_file, old_picture, self.profile_picture.name))
+
+    def constraint_checked_fields(self):
+        """
+        Return the fields whose validation queries ``save`` leaves to the database constraints.
+
+        The designation has just been loaded, and the organization and department are copied
+        from it, so the foreign keys need no existence queries. An unchanged email was unique
+        when it was stored and stays backed by the unique constraint.
+        """
+        fields = []
+        if self.designation_id is not None:
+            fields += ["designation", "organization", "department"]
+        if not self.has_changed("email"):
+            fields.append("email")
+        return fields
+
+    def sync_with_designation(self):
+        """Copy the organization and department of the designation onto the employee."""
+        if self.designation_id is None:
+            return
+        self.organization_id = self.designation.organization_id
+        self.department_id = self.designation.department_id
 
     def validate_designation(self):
         if not self.designation.allow_multiple_employees and (
@@ -1,8 +1,12 @@
 """This module contains the schema for the employee app."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 import strawberry
+from strawberry import relay
+from strawberry.types import Info
+
+from root.pagination import KeysetConnection, cap_list
 
 from .models import Employee
 from .types import EmployeeType
@@ -13,12 +17,23 @@ class Query:
     """Query type for the Organization app."""
 
     @strawberry.field
-    def get_employees_by_id(self, employee_id: Optional[int] = None) -> List[EmployeeType]:
+    def get_employees_by_id(
+        self, info: Info, employee_id: Optional[int] = None
+    ) -> List[EmployeeType]:
         """
-        Fetches all the organizations.
+        Fetches all the employees, at most GRAPHQL_MAX_LIST_SIZE of them.
         """
         if employee_id:
             return Employee.objects.filter(id=employee_id)
+        return cap_list(Employee.objects.all(), info)
+
+    @relay.connection(KeysetConnection[EmployeeType])
+    def employees(self, designation_id: Optional[int] = None) -> Iterable[Employee]:
+        """
+        Paginates through all the employees, optionally of a single designation.
+        """
+        if designation_id:
+            return Employee.objects.filter(designation_id=designation_id)
         return Employee.objects.all()
 
     @strawberry.field
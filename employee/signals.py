@@ -1,13 +1,45 @@
 # employee/signals.py
 
-from django.core.files.storage import default_storage
-from django.db.models.signals import pre_delete
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from media.storage import release_file
+from organization.models import Designation
+from root.response_cache import invalidate_organizations
+
 from .models import Employee
 
 
-@receiver(pre_delete, sender=Employee)
+@receiver(post_save, sender=Designation)
+def move_employees_with_designation(sender, instance, raw=False, **kwargs):
+    """Keep the organization and department of the employees in line with their designation."""
+    if raw or not (instance.has_changed("organization") or instance.has_changed("department")):
+        return
+    Employee.objects.filter(designation=instance).exclude(
+        organization_id=instance.organization_id, department_id=instance.department_id
+    ).update(organization_id=instance.organization_id, department_id=instance.department_id)
+
+
+@receiver(post_delete, sender=Employee)
 def delete_profile_picture_with_employee(sender, instance, **kwargs):
-    if instance.profile_picture and default_storage.exists(instance.profile_picture.name):
-        default_storage.delete(instance.profile_picture.name)
+    if instance.profile_picture:
+        # Counted once committed, so a rolled back delete keeps the file.
+        transaction.on_commit(partial(release_file, instance.profile_picture.name))
+
+
+@receiver(pre_save, sender=Employee)
+def remember_previous_organization(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._previous_organization_id = instance.stored_value("organization")
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_responses_of_employee(sender, instance, **kwargs):
+    invalidate_organizations(
+        instance.organization_id,
+        getattr(instance, "_previous_organization_id", None),
+    )
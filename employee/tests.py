@@ -1,14 +1,33 @@
 """Tests for the Employee app."""
 
+import csv
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
 from faker import Faker
+from openpyxl import Workbook
 
 from employee.forms import EmployeeForm
+from employee.importing import import_employees
 from employee.models import Employee
 from organization.choices import PROVINCE_CHOICES
 from organization.models import Department, Designation, Organization
+from root.testing import (
+    GraphQLTestCase,
+    create_department,
+    create_designation,
+    create_employee,
+    create_organization,
+)
 
 User = get_user_model()
 fake = Faker()
@@ -86,29 +105,29 @@ class EmployeeModelTest(TestCase):
         self.assertEqual(employee.department.id, self.department.id)
         self.assertEqual(employee.department.name, self.department.name)
 
-    def test_organization_property_returns_none_when_designation_is_none(self):
-        """Test that organization property returns None when designation is None."""
-        employee = Employee.objects.create(
-            designation=self.designation_single,
-            name=fake.name(),
-            description=fake.text(max_nb_chars=100),
-            contact_no=fake.phone_number()[:15],
-        )
+    def test_scope_follows_a_new_designation(self):
+        """Test that saving an employee with another designation moves its scope along."""
+        other_department = create_department(self.organization)
+        other_designation = create_designation(other_department)
+        employee = create_employee(self.designation_single)
 
-        employee.designation = None
-        self.assertIsNone(employee.organization)
+        employee.designation = other_designation
+        employee.save()
 
-    def test_department_property_returns_none_when_designation_is_none(self):
-        """Test that department property returns None when designation is None."""
-        employee = Employee.objects.create(
-            designation=self.designation_single,
-            name=fake.name(),
-            description=fake.text(max_nb_chars=100),
-            contact_no=fake.phone_number()[:15],
-        )
+        employee.refresh_from_db()
+        self.assertEqual(employee.department, other_department)
+        self.assertEqual(employee.organization, self.organization)
+
+    def test_scope_follows_a_moved_designation(self):
+        """Test that moving a designation to another department moves its employees."""
+        other_department = create_department(self.organization)
+        employee = create_employee(self.designation_multiple)
+
+        self.designation_multiple.department = other_department
+        self.designation_multiple.save()
 
-        employee.designation = None
-        self.assertIsNone(employee.department)
+        employee.refresh_from_db()
+        self.assertEqual(employee.department, other_department)
 
     def test_validate_designation_allows_multiple_employees(self):
         """
@@ -260,7 +279,7 @@ class EmployeeModelTest(TestCase):
 
     def test_properties_work_with_select_related(self):
         """
-        Test that organization and department properties work efficiently with select_related.
+        Test that organization and department relations work efficiently with select_related.
         """
         employee = Employee.objects.create(
             designation=self.designation_multiple,
@@ -269,9 +288,9 @@ class EmployeeModelTest(TestCase):
             contact_no=fake.phone_number()[:15],
         )
 
-        employee_with_related = Employee.objects.select_related(
-            "designation__department__organization"
-        ).get(pk=employee.pk)
+        employee_with_related = Employee.objects.select_related("organization", "department").get(
+            pk=employee.pk
+        )
 
         self.assertEqual(employee_with_related.organization, self.organization)
         self.assertEqual(employee_with_related.department, self.department)
@@ -288,6 +307,74 @@ class EmployeeModelTest(TestCase):
 
         self.assertEqual(str(employee), employee_name)
 
+    def _stored_employee(self, **fields):
+        employee = Employee.objects.create(
+            designation=self.designation_multiple,
+            name=fake.name(),
+            description=fake.text(max_nb_chars=100),
+            contact_no=fake.phone_number()[:15],
+            email=fake.email(),
+            **fields,
+        )
+        return Employee.objects.select_related("designation").get(pk=employee.pk)
+
+    def test_saving_a_loaded_employee_runs_only_the_update(self):
+        """Test the save budget of an employee loaded with its designation: the UPDATE alone."""
+        employee = self._stored_employee()
+        employee.name = fake.name()
+
+        with self.assertNumQueries(1):
+            employee.save()
+
+    def test_saving_without_the_designation_loads_it_once(self):
+        """Test that an employee loaded without its designation costs one more query."""
+        employee = Employee.objects.get(pk=self._stored_employee().pk)
+        employee.name = fake.name()
+
+        with self.assertNumQueries(2):
+            employee.save()
+
+    def test_changed_designation_and_email_are_validated(self):
+        """Test that a new email and a single-employee designation are checked before saving."""
+        employee = self._stored_employee()
+        other = self._stored_employee()
+        employee.email = other.email
+
+        with self.assertNumQueries(1), self.assertRaises(ValidationError):
+            employee.save()
+
+        employee.email = fake.email()
+        employee.designation = self.designation_single
+        with self.assertNumQueries(3):
+            employee.save()
+
+        other.designation = self.designation_single
+        with self.assertNumQueries(1), self.assertRaises(ValidationError):
+            other.save()
+
+    def test_replaced_profile_picture_is_released_without_a_query(self):
+        """Test that the stored picture is compared without fetching the row again."""
+        employee = self._stored_employee(profile_picture="profile_pictures/old.png")
+        employee.profile_picture = "profile_pictures/new.png"
+
+        with (
+            mock.patch("employee.models.replace_file") as replace_file,
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertNumQueries(1),
+        ):
+            employee.save()
+
+        replace_file.assert_called_once_with(
+            "profile_pictures/old.png", "profile_pictures/new.png"
+        )
+        employee.name = fake.name()
+        with (
+            mock.patch("employee.models.replace_file") as replace_file,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            employee.save()
+        replace_file.assert_not_called()
+
 
 class EmployeeFormValidationTest(TestCase):
     """Test form validation for organization-department-designation consistency."""
@@ -541,3 +628,259 @@ class EmployeeFormValidationTest(TestCase):
         self.assertIn(self.desig1_dept2_org1.title, error_message)
         self.assertIn(self.dept2_org1.name, error_message)
         self.assertIn(self.dept1_org1.name, error_message)
+
+
+class EmployeeGraphQLDataLoaderTest(GraphQLTestCase):
+    """Test batched loading of the employee relations in the GraphQL schema."""
+
+    query = """
+        query {
+            getEmployeesById {
+                name
+                organization { name }
+                department { name }
+                designation { title department { name } }
+            }
+        }
+    """
+
+    def setUp(self):
+        """Set up test data."""
+        self.organization = create_organization()
+        self.department = create_department(self.organization)
+
+    def _create_employees(self, count):
+        for _ in range(count):
+            designation = create_designation(
+                self.department, priority=fake.random_int(min=1, max=10)
+            )
+            create_employee(designation)
+
+    def test_employee_relations_query_count_is_constant(self):
+        """Test that the employee relations cost the same number of queries for any row count."""
+        self._create_employees(2)
+        _, small_queries = self.execute_data(self.query)
+
+        self._create_employees(20)
+        data, large_queries = self.execute_data(self.query)
+
+        employees = data["getEmployeesById"]
+        self.assertEqual(len(employees), 22)
+        self.assertEqual(len(small_queries), len(large_queries))
+        for employee in employees:
+            self.assertEqual(employee["organization"]["name"], self.organization.name)
+            self.assertEqual(employee["department"]["name"], self.department.name)
+
+    def test_nested_query_is_optimized_into_a_single_select(self):
+        """Test that the optimizer joins the nested relations and loads only selected columns."""
+        self._create_employees(10)
+        query = """
+            query {
+                getEmployeesById {
+                    name
+                    designation {
+                        title
+                        department { name organization { name user { username } } }
+                    }
+                }
+            }
+        """
+
+        data, queries = self.execute_data(query)
+
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]["sql"]
+        self.assertIn('"auth_user"."username"', sql)
+        self.assertNotIn('"employee_employee"."description"', sql)
+        self.assertNotIn('"organization_organization"."description"', sql)
+        self.assertNotIn('"auth_user"."password"', sql)
+        employee = data["getEmployeesById"][0]
+        self.assertEqual(
+            employee["designation"]["department"]["organization"]["user"]["username"],
+            self.organization.user.username,
+        )
+
+
+class EmployeeScopedLookupTest(GraphQLTestCase):
+    """Test the organization and department scoped employee lookups."""
+
+    def setUp(self):
+        """Set up two organizations with two departments of employees each."""
+        self.departments = []
+        for _ in range(2):
+            organization = create_organization()
+            for _ in range(2):
+                department = create_department(organization)
+                designation = create_designation(department, allow_multiple_employees=True)
+                for _ in range(3):
+                    create_employee(designation)
+                self.departments.append(department)
+
+    def test_lookups_use_indexes(self):
+        """Test that the scoped lookups are index range scans."""
+        plans = {
+            "employee_employee_organization_id": Employee.objects.filter(organization_id=1),
+            "employee_employee_department_id": Employee.objects.filter(department_id=1),
+            "employee_desig_available_idx": Employee.objects.filter(
+                designation_id=1, is_available=True
+            ),
+        }
+
+        for index, queryset in plans.items():
+            with self.subTest(index=index):
+                self.assertIn(f"USING INDEX {index}", queryset.explain())
+
+    def test_employees_by_organization(self):
+        """Test that the organization lookup filters on the indexed organization column."""
+        organization = self.departments[0].organization
+
+        data, queries = self.execute_data(
+            "query ($id: Int!) { getEmployeesByOrganization(organizationId: $id) "
+            "{ name organization { name } } }",
+            id=organization.id,
+        )
+
+        employees = data["getEmployeesByOrganization"]
+        self.assertEqual(len(employees), 6)
+        names = {item["organization"]["name"] for item in employees}
+        self.assertEqual(names, {organization.name})
+        self.assertIn('"employee_employee"."organization_id" =', queries[0]["sql"])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"organization_designation"', queries[0]["sql"])
+
+    def test_employees_by_department(self):
+        """Test that the department lookup filters on the indexed department column."""
+        department = self.departments[1]
+
+        data, queries = self.execute_data(
+            "query ($id: Int!) { getEmployeesByDepartment(departmentId: $id) "
+            "{ name department { name } } }",
+            id=department.id,
+        )
+
+        employees = data["getEmployeesByDepartment"]
+        self.assertEqual(len(employees), 3)
+        names = {item["department"]["name"] for item in employees}
+        self.assertEqual(names, {department.name})
+        self.assertIn('"employee_employee"."department_id" =', queries[0]["sql"])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"organization_designation"', queries[0]["sql"])
+
+
+class EmployeeImportTests(TestCase):
+    """Test cases for importing employees in bulk from a roster."""
+
+    def setUp(self):
+        """Set up an organization with a single-employee and a multi-employee designation."""
+        self.organization = create_organization(name="Ward Office")
+        self.department = create_department(self.organization, name="Administration")
+        self.chief = create_designation(self.department, title="Chief", priority=1)
+        self.clerk = create_designation(
+            self.department, title="Clerk", priority=2, allow_multiple_employees=True
+        )
+
+    def _row(self, designation="Clerk", **fields):
+        return {
+            "organization": "ward office",
+            "department": "Administration",
+            "designation": designation,
+            "name": fake.name(),
+            "description": fake.text(max_nb_chars=50),
+            "email": fake.unique.email(),
+            "contact_no": "9800000000",
+            "is_available": "yes",
+            **fields,
+        }
+
+    def test_rows_are_created_in_chunks_with_a_constant_number_of_queries(self):
+        """Test that the queries of an import grow with its chunks, not with its rows."""
+        rows = [self._row() for _ in range(40)]
+
+        # Index and occupancy, then per chunk the email check and the bulk insert in a
+        # savepoint.
+        with self.assertNumQueries(2 + 2 * 4):
+            result = import_employees(rows, chunk_size=20)
+
+        self.assertEqual(result, {"created": 40, "failed": 0, "errors": []})
+        employee = Employee.objects.get(email=rows[0]["email"])
+        self.assertEqual(employee.designation, self.clerk)
+        self.assertEqual(employee.organization, self.organization)
+        self.assertEqual(employee.department, self.department)
+
+    def test_invalid_rows_are_reported_without_aborting_the_import(self):
+        """Test that bad rows are skipped with their row number and the others created."""
+        taken = Employee.objects.create(
+            designation=self.clerk,
+            name=fake.name(),
+            description=fake.text(max_nb_chars=50),
+            email=fake.unique.email(),
+            contact_no="9800000000",
+        )
+        rows = [
+            self._row(),
+            self._row(designation="Janitor"),
+            self._row(email=taken.email),
+            self._row(designation="Chief"),
+            self._row(designation="Chief"),
+            self._row(email="not-an-email"),
+            self._row(is_available="no"),
+        ]
+
+        result = import_employees(rows, chunk_size=3)
+
+        self.assertEqual(result["created"], 3)
+        self.assertEqual(result["failed"], 4)
+        self.assertEqual([number for number, _ in result["errors"]], [2, 3, 5, 6])
+        self.assertIn("Janitor", result["errors"][0][1])
+        self.assertIn("already been assigned to the Chief role", result["errors"][2][1])
+        self.assertTrue(result["errors"][3][1].startswith("email: "))
+        self.assertFalse(Employee.objects.get(email=rows[6]["email"]).is_available)
+        self.assertEqual(Employee.objects.filter(designation=self.chief).count(), 1)
+
+    def test_command_imports_an_xlsx_roster(self):
+        """Test that the command reads an XLSX roster and reports the skipped rows."""
+        rows = [self._row(), self._row(department="Accounts")]
+        workbook = Workbook()
+        workbook.active.append(list(rows[0]))
+        for row in rows:
+            workbook.active.append(list(row.values()))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "employees.xlsx"
+        workbook.save(path)
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        call_command("import_employees", str(path), stdout=stdout, stderr=stderr)
+
+        self.assertTrue(Employee.objects.filter(email=rows[0]["email"]).exists())
+        self.assertIn("Imported 1 employee(s), skipped 1 row(s).", stdout.getvalue())
+        self.assertIn("Row 2: No designation 'Clerk' in department 'Accounts'", stderr.getvalue())
+
+    def test_admin_imports_an_uploaded_csv(self):
+        """Test that the admin import view creates the employees of an uploaded CSV."""
+        # Render the admin without the collected static files manifest.
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }
+        self.enterContext(override_settings(STORAGES=storages))
+
+        rows = [self._row(), self._row()]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="unused-password")
+        )
+        changelist = reverse("admin:employee_employee_changelist")
+        url = reverse("admin:employee_employee_import")
+
+        self.assertContains(self.client.get(changelist), url)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(
+            url, {"file": SimpleUploadedFile("employees.csv", buffer.getvalue().encode())}
+        )
+
+        self.assertRedirects(response, changelist)
+        self.assertEqual(Employee.objects.filter(designation=self.clerk).count(), 2)
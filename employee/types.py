@@ -1,8 +1,15 @@
 """This module contains the types for the employee app."""
 
+from typing import Optional
+
 import strawberry
+import strawberry.django
+import strawberry_django
 
+from media.types import ImageFormat, ImageSize
+from media.variants import variant_url
 from organization.types import DepartmentType, DesignationType, OrganizationType
+from root.loaders import LoaderField
 
 from .models import Employee
 
@@ -19,17 +26,21 @@ class EmployeeType:
     contact_no: str
     profile_picture: str
     description: str
-    organization: OrganizationType
-    department: DepartmentType
-    designation: DesignationType
+    designation: DesignationType = strawberry_django.field(field_cls=LoaderField)
+    organization: OrganizationType = strawberry_django.field(field_cls=LoaderField)
+    department: DepartmentType = strawberry_django.field(field_cls=LoaderField)
 
-    @strawberry.field
-    def profile_picture(self, info) -> str:
+    @strawberry_django.field(only=["profile_picture"])
+    def profile_picture(
+        self, info, size: Optional[ImageSize] = None, format: ImageFormat = ImageFormat.WEBP
+    ) -> str:
         """
-        Returns the profile picture URL. If the employee does not have a profile picture,
-        returns a URL to the default profile picture.
+        Returns the profile picture URL, or the URL of its resized variant when a size is
+        given. If the employee does not have a profile picture, returns a URL to the default
+        profile picture.
         """
-        if self.profile_picture:
-            return self.profile_picture.url
-        else:
+        if not self.profile_picture:
             return "/static/images/default_profile_picture.jpg"
+        if size is None:
+            return self.profile_picture.url
+        return variant_url(self.profile_picture, size.value, format.value)
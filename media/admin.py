@@ -0,0 +1,45 @@
+"""Registering the model with the Django admin site."""
+
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .downloads import queued_image_download
+from .models import ImageDownload
+
+
+@admin.register(ImageDownload)
+class ImageDownloadAdmin(admin.ModelAdmin):
+    """
+    ImageDownloadAdmin lists the queued image downloads, with their errors, and retries
+    the failed ones.
+    """
+
+    list_display = ("target", "field_name", "url", "status", "attempts", "available_at")
+    list_filter = ("status", "content_type")
+    readonly_fields = ("last_error",)
+    actions = ["retry"]
+
+    @admin.action(description="Retry the selected downloads")
+    def retry(self, request, queryset):
+        count = queryset.filter(status=ImageDownload.Status.FAILED).update(
+            status=ImageDownload.Status.PENDING, attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f"{count} download(s) queued again.", messages.SUCCESS)
+
+
+def image_download_status(field_name, description):
+    """
+    Return an admin display of the queued download of the image field, to add to the
+    ``readonly_fields`` of the admin of its model.
+    """
+
+    @admin.display(description=description)
+    def status(obj):
+        job = queued_image_download(obj, field_name)
+        if job is None:
+            return "-"
+        if job.status == ImageDownload.Status.FAILED:
+            return f"Failed after {job.attempts} attempt(s): {job.last_error}"
+        return f"Pending download from {job.url}"
+
+    return status
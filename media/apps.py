@@ -0,0 +1,10 @@
+"""This module contains the configuration of the media app."""
+
+from django.apps import AppConfig
+
+
+class MediaConfig(AppConfig):
+    """Configuration of the media app."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "media"
@@ -0,0 +1,141 @@
+"""This module contains the database backed queue of remote image downloads."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from root.utils import download_image_from_url
+
+from .models import ImageDownload
+from .storage import release_file
+
+
+def enqueue_image_download(instance, field_name, url, filename):
+    """
+    Queue the download of the image at ``url`` into ``field_name`` of the saved ``instance``,
+    replacing any download still queued for the same field.
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    with transaction.atomic():
+        ImageDownload.objects.filter(
+            content_type=content_type, object_id=instance.pk, field_name=field_name
+        ).delete()
+        return ImageDownload.objects.create(
+            content_type=content_type,
+            object_id=instance.pk,
+            field_name=field_name,
+            url=url,
+            filename=filename,
+        )
+
+
+def queued_image_download(instance, field_name):
+    """Return the pending, running or failed download of ``field_name`` of ``instance``."""
+    if instance.pk is None:
+        return None
+    return ImageDownload.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+    ).first()
+
+
+def retry_delay(attempts):
+    """Return how long to wait before the next try, doubling with every failed attempt."""
+    return timedelta(
+        seconds=min(
+            settings.IMAGE_DOWNLOAD_RETRY_DELAY * 2 ** (attempts - 1),
+            settings.IMAGE_DOWNLOAD_MAX_RETRY_DELAY,
+        )
+    )
+
+
+def claim_image_downloads(limit):
+    """
+    Claim up to ``limit`` due downloads for this worker and return them.
+
+    A job is claimed with an UPDATE conditioned on the state it was read in, so two workers
+    never run the same job, and leased until ``IMAGE_DOWNLOAD_LEASE`` seconds from now.
+    """
+    now = timezone.now()
+    due = (
+        ImageDownload.objects.filter(available_at__lte=now)
+        .exclude(status=ImageDownload.Status.FAILED)
+        .order_by("available_at")[:limit]
+    )
+    lease = {
+        "status": ImageDownload.Status.RUNNING,
+        "available_at": now + timedelta(seconds=settings.IMAGE_DOWNLOAD_LEASE),
+    }
+    claimed = []
+    for job in due:
+        fields = {**lease, "attempts": job.attempts + 1}
+        if ImageDownload.objects.filter(
+            pk=job.pk, status=job.status, available_at=job.available_at
+        ).update(**fields):
+            for name, value in fields.items():
+                setattr(job, name, value)
+            claimed.append(job)
+    return claimed
+
+
+def run_image_download(job):
+    """
+    Download the image of a claimed job and store it on its target.
+
+    Return True once the image is stored, or the job was superseded or its target deleted,
+    and False when it failed and was rescheduled or given up.
+    """
+    try:
+        image_file = download_image_from_url(job.url, job.filename)
+    except ValidationError as error:
+        _reschedule(job, "\n".join(error.messages))
+        return False
+    except OSError as error:
+        _reschedule(job, f"Unable to convert the image: {error}")
+        return False
+    model = job.content_type.model_class()
+    field = None
+    try:
+        with transaction.atomic():
+            # Deleting the job commits the claim: a superseded job is already gone.
+            deleted, _ = ImageDownload.objects.filter(
+                pk=job.pk, status=ImageDownload.Status.RUNNING
+            ).delete()
+            target = model._default_manager.filter(pk=job.object_id).first()
+            if not deleted or target is None:
+                return True
+            field = getattr(target, job.field_name)
+            field.save(job.filename, image_file, save=False)
+            target.save(update_fields=[job.field_name])
+    except (ValidationError, OSError) as error:
+        # Deleted unless another row stores the same bytes.
+        release_file(field.name if field else None)
+        if isinstance(error, ValidationError):
+            _reschedule(job, "\n".join(error.messages))
+        else:
+            _reschedule(job, f"Unable to store the image: {error}")
+        return False
+    return True
+
+
+def process_image_downloads(limit=10):
+    """Claim and run up to ``limit`` due downloads, returning the numbers done and failed."""
+    counts = {"done": 0, "failed": 0}
+    for job in claim_image_downloads(limit):
+        counts["done" if run_image_download(job) else "failed"] += 1
+    return counts
+
+
+def _reschedule(job, message):
+    fields = {"last_error": message}
+    if job.attempts >= settings.IMAGE_DOWNLOAD_MAX_ATTEMPTS:
+        fields["status"] = ImageDownload.Status.FAILED
+    else:
+        fields["status"] = ImageDownload.Status.PENDING
+        fields["available_at"] = timezone.now() + retry_delay(job.attempts)
+    ImageDownload.objects.filter(pk=job.pk, status=ImageDownload.Status.RUNNING).update(**fields)
@@ -0,0 +1,122 @@
+"""Benchmark the peak memory of downloading large images with the old and streaming fetchers."""
+
+import functools
+import http.server
+import multiprocessing
+import resource
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from root.utils import download_image_from_url
+
+
+def legacy_download_image_from_url(url, filename):
+    """The fetcher replaced by the streaming one, kept as the baseline."""
+    import requests
+    from django.core.files import File
+    from PIL import Image
+
+    response = requests.get(url, timeout=10)
+    image = Image.open(BytesIO(response.content))
+    image_io = BytesIO()
+    image.convert("RGB").save(image_io, format="JPEG")
+    return File(image_io, name=filename)
+
+
+class Command(BaseCommand):
+    help = "Compare the peak RSS of fetching large images with the old and streaming fetchers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--width", type=int, default=6000)
+        parser.add_argument("--height", type=int, default=4000)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            names = self._write_images(Path(directory), options["width"], options["height"])
+            handler = functools.partial(QuietHandler, directory=directory)
+            with QuietServer(("127.0.0.1", 0), handler) as server:
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+                for name, description in names.items():
+                    for label, fetcher in (
+                        ("old", legacy_download_image_from_url),
+                        ("streaming", download_image_from_url),
+                    ):
+                        peak_kb, elapsed_ms, outcome = measure_peak_rss(fetcher, base_url + name)
+                        self.stdout.write(
+                            f"{label:>9} {description:<28}: peak RSS +{peak_kb / 1024:.1f} MB, "
+                            f"{elapsed_ms:.0f} ms, {outcome}"
+                        )
+                server.shutdown()
+
+    def _write_images(self, directory, width, height):
+        """Write the benchmark inputs and return their names with a description."""
+        from PIL import Image
+
+        gradient = Image.linear_gradient("L").resize((width, height))
+        photo = Image.merge("RGB", (gradient, gradient.transpose(Image.FLIP_LEFT_RIGHT), gradient))
+        photo.save(directory / "photo.jpg", quality=90)
+        photo.putalpha(gradient)
+        photo.save(directory / "transparent.png")
+        del photo, gradient
+        # Two copies of the photo's bytes and then padding, which JPEG decoders ignore.
+        padded = (directory / "photo.jpg").read_bytes()
+        (directory / "padded.jpg").write_bytes(padded + bytes(64 * 1024 * 1024))
+        # 144 megapixels, under the limit where Pillow refuses an image rather than warning,
+        # compressed to a few hundred kilobytes.
+        Image.new("1", (12000, 12000)).save(directory / "bomb.png")
+        return {
+            "photo.jpg": f"{width}x{height} JPEG",
+            "transparent.png": f"{width}x{height} RGBA PNG",
+            "padded.jpg": "JPEG padded to 64 MB",
+            "bomb.png": "12000x12000 1-bit PNG",
+        }
+
+
+class QuietServer(http.server.ThreadingHTTPServer):
+    """Server that ignores the clients hanging up on a response, as the capped fetcher does."""
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that doesn't log every request."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure_peak_rss(fetcher, url):
+    """
+    Run the fetcher in a forked process and return how far its peak RSS rose above the RSS
+    it started with, in KiB, together with the wall time and the outcome.
+    """
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_fetch, args=(fetcher, url, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _fetch(fetcher, url, queue):
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    try:
+        image_file = fetcher(url, "image.jpg")
+        outcome = f"{image_file.size} bytes stored"
+    except ValidationError as error:
+        outcome = f"rejected: {error.messages[0]}"
+    except Exception as error:
+        outcome = f"failed: {error!r}"[:120]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((peak - baseline, elapsed_ms, outcome))
@@ -0,0 +1,47 @@
+"""Generate the resized variants of the stored logos and profile pictures."""
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from media.storage import content_addressed_storage
+from media.variants import VARIANT_FIELDS, generate_variants, variant_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the thumb, medium and full variants of every stored organization logo and "
+        "employee profile picture that is missing some, or of all of them with --force."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Regenerate variants that already exist."
+        )
+
+    def handle(self, *args, **options):
+        uploads = content_addressed_storage()
+        for app_label, model_name, field_name in VARIANT_FIELDS:
+            model = apps.get_model(app_label, model_name)
+            names = (
+                model._default_manager.exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .values_list(field_name, flat=True)
+                .distinct()
+            )
+            counts = {"generated": 0, "up to date": 0, "failed": 0}
+            for name in names.iterator():
+                if not options["force"] and all(map(uploads.exists, variant_names(name))):
+                    counts["up to date"] += 1
+                    continue
+                try:
+                    generate_variants(name)
+                except (ValidationError, OSError) as error:
+                    counts["failed"] += 1
+                    self.stderr.write(f"{name}: {error}")
+                    continue
+                counts["generated"] += 1
+            self.stdout.write(
+                f"{model._meta.verbose_name} {field_name}: "
+                + ", ".join(f"{count} {label}" for label, count in counts.items())
+            )
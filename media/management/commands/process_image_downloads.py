@@ -0,0 +1,44 @@
+"""Run the queued downloads of remote images."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from media.downloads import process_image_downloads
+
+
+class Command(BaseCommand):
+    help = (
+        "Download the images queued by the admin forms and store them on their organizations "
+        "and employees, retrying failed downloads with exponential backoff. Runs until "
+        "interrupted, or until no download is due with --once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once no queued download is due."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10, help="Downloads claimed at a time."
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait for new downloads when none is due.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                counts = process_image_downloads(options["batch_size"])
+                if counts["done"] or counts["failed"]:
+                    self.stdout.write(
+                        f"{counts['done']} download(s) done, {counts['failed']} failed"
+                    )
+                    continue
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
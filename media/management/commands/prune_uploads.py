@@ -0,0 +1,29 @@
+"""Delete the uploaded files no row references anymore."""
+
+import os
+
+from django.core.management.base import BaseCommand
+
+from media.storage import content_addressed_storage, is_content_addressed, release_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the uploaded files, and their variants, that no row references and that were "
+        "last saved more than MEDIA_RELEASE_GRACE_PERIOD seconds ago."
+    )
+
+    def handle(self, *args, **options):
+        deleted = sum(map(release_file, _uploaded_files(content_addressed_storage())))
+        self.stdout.write(f"{deleted} unreferenced file(s) deleted")
+
+
+def _uploaded_files(storage, directory=""):
+    directories, files = storage.listdir(directory)
+    for name in directories:
+        # Variants are deleted with their original.
+        if directory or name != "variants":
+            yield from _uploaded_files(storage, os.path.join(directory, name))
+    for name in files:
+        if is_content_addressed(name):
+            yield os.path.join(directory, name)
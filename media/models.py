@@ -0,0 +1,51 @@
+"""This file contains the models for the media app."""
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class ImageDownload(models.Model):
+    """
+    ImageDownload is a queued download of a remote image into an image field, run by the
+    ``process_image_downloads`` worker instead of the request that asked for it.
+
+    A job is removed once its image is stored. ``available_at`` is when a pending job may
+    be tried next, or when the lease of a running one expires, so a job left running by a
+    worker that died is picked up again.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        FAILED = "failed", "Failed"
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey("content_type", "object_id")
+    field_name = models.CharField(max_length=100)
+    url = models.URLField(max_length=2000)
+    filename = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at"],
+                condition=~Q(status="failed"),
+                name="media_download_due_idx",
+            ),
+            models.Index(
+                fields=["content_type", "object_id", "field_name"],
+                name="media_download_target_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.field_name} of {self.content_type.model} {self.object_id} from {self.url}"
@@ -0,0 +1,126 @@
+"""This module contains the content-addressed storage of uploaded files."""
+
+import hashlib
+import os
+import re
+from contextlib import suppress
+from datetime import timedelta
+from functools import cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import models
+from django.utils import timezone
+
+from .variants import delete_variants, generate_variants, variant_name
+
+# Basename of a content-addressed file: the SHA-256 of its bytes and its extension.
+CONTENT_ADDRESSED_NAME = re.compile(r"(?:^|/)[0-9a-f]{64}(?:\.[0-9a-z]+)?$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names every file after the SHA-256 of its content, in the
+    directory and with the extension of the name it is saved under.
+
+    Identical files are stored once and a stored file never changes, so every row uploading
+    the same bytes shares it and it can be cached forever.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        name = os.path.join(directory, digest.hexdigest() + extension)
+        try:
+            # Reusing a stored file marks it as recently saved, so a concurrent release_file
+            # leaves it to the row about to reference it.
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return self.save_derived(name, content, max_length=max_length)
+        return name
+
+    def save_derived(self, name, content, max_length=None):
+        """
+        Store ``content`` under ``name`` as is, for files named after a content-addressed
+        file, such as its variants, and keep the existing file of that name if there is one.
+        """
+        stored = super().save(name, content, max_length=max_length)
+        # Another process stored a file of that name meanwhile; keep a single copy.
+        if stored != name:
+            self.delete(stored)
+        return name
+
+
+def content_addressed_storage():
+    """Return the storage of the uploaded files, as the ``storage`` of their file fields."""
+    return storages["uploads"]
+
+
+def is_content_addressed(name):
+    """Return whether the stored file ``name`` is named after its content."""
+    return bool(CONTENT_ADDRESSED_NAME.search(name))
+
+
+@cache
+def content_addressed_fields():
+    """Return every file field stored in the content-addressed storage, as (model, name)."""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def reference_count(name):
+    """Return the number of rows referencing the stored file ``name``, with one query per field."""
+    return sum(
+        model._default_manager.filter(**{field_name: name}).count()
+        for model, field_name in content_addressed_fields()
+    )
+
+
+def release_file(name):
+    """
+    Delete the stored file ``name`` and its variants once no row references it, returning
+    whether it was deleted.
+
+    A file saved within the last ``MEDIA_RELEASE_GRACE_PERIOD`` seconds is kept, as the row
+    saving it may not be committed yet; ``prune_uploads`` deletes it later if it is still
+    unreferenced.
+    """
+    if not name or reference_count(name):
+        return False
+    storage = content_addressed_storage()
+    grace_period = timedelta(seconds=settings.MEDIA_RELEASE_GRACE_PERIOD)
+    try:
+        if storage.get_modified_time(name) > timezone.now() - grace_period:
+            return False
+    except FileNotFoundError:
+        pass
+    storage.delete(name)
+    delete_variants(name)
+    return True
+
+
+def replace_file(old_name, new_name):
+    """
+    Release a replaced file and generate the variants of its replacement, unless they exist
+    already because another row stores the same bytes.
+    """
+    release_file(old_name)
+    if new_name and not content_addressed_storage().exists(variant_name(new_name, "full")):
+        # Served as the original until the variants are backfilled.
+        with suppress(ValidationError, OSError):
+            generate_variants(new_name)
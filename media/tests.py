@@ -0,0 +1,568 @@
+"""Tests for the Media app."""
+
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+from PIL import Image, ImageFile
+
+from employee.models import Employee
+from media.downloads import (
+    claim_image_downloads,
+    enqueue_image_download,
+    process_image_downloads,
+    run_image_download,
+)
+from media.models import ImageDownload
+from media.storage import content_addressed_storage, is_content_addressed, reference_count
+from media.variants import variant_name, variant_names
+from organization.forms import OrganizationForm
+from root.schema import schema
+from root.testing import (
+    create_department,
+    create_designation,
+    create_employee,
+    create_organization,
+)
+from root.utils import download_image_from_url
+
+User = get_user_model()
+fake = Faker()
+
+
+class MediaTestCase(TestCase):
+    """
+    Base test case storing media in a temporary directory, with an organization, where
+    unreferenced files are released without a grace period.
+    """
+
+    def setUp(self):
+        """Set up an organization and a media root that is cleaned up after each test."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(
+            override_settings(MEDIA_ROOT=directory.name, MEDIA_RELEASE_GRACE_PERIOD=0)
+        )
+        self.organization = create_organization(name="Ward Office")
+
+    def _upload(self, size=(2000, 1000), name="logo.png"):
+        buffer = BytesIO()
+        Image.new("RGBA", size, (0, 128, 0, 255)).save(buffer, format="PNG")
+        return SimpleUploadedFile(name, buffer.getvalue())
+
+    def _designation(self):
+        return create_designation(create_department(self.organization))
+
+
+class ImageDownloadQueueTests(MediaTestCase):
+    """Test cases for the background downloads of images given by URL."""
+
+    def _image_file(self):
+        buffer = BytesIO()
+        Image.new("RGB", (4, 4), "red").save(buffer, format="JPEG")
+        return File(buffer, name="logo.jpg")
+
+    def _download(self, **kwargs):
+        return mock.patch("media.downloads.download_image_from_url", **kwargs)
+
+    def test_form_saves_without_downloading_and_queues_the_logo(self):
+        """Test that the organization form queues the logo instead of downloading it."""
+        data = {
+            field: getattr(self.organization, field)
+            for field in OrganizationForm.Meta.fields
+            if field not in ("logo", "logo_url", "organization_template")
+        }
+        data["user"] = self.organization.user_id
+        form = OrganizationForm(
+            {**data, "logo_url": "https://example.com/logo.png"}, instance=self.organization
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+
+        with self._download() as download:
+            organization = form.save(commit=False)
+            organization.save()
+            form.save_m2m()
+
+        download.assert_not_called()
+        job = ImageDownload.objects.get()
+        self.assertEqual(job.target, self.organization)
+        self.assertEqual((job.field_name, job.status), ("logo", ImageDownload.Status.PENDING))
+        self.assertEqual(job.url, "https://example.com/logo.png")
+
+    def test_worker_stores_the_image_and_removes_the_job(self):
+        """Test that a processed download is stored on its target and leaves the queue."""
+        enqueue_image_download(self.organization, "logo", "https://example.com/a.png", "a.jpg")
+
+        with self._download(return_value=self._image_file()):
+            counts = process_image_downloads()
+
+        self.assertEqual(counts, {"done": 1, "failed": 0})
+        self.assertFalse(ImageDownload.objects.exists())
+        self.organization.refresh_from_db()
+        self.assertTrue(self.organization.logo.name.startswith("logos/"))
+
+    def test_failed_downloads_are_retried_with_backoff_then_given_up(self):
+        """Test that failures are rescheduled with a doubling delay up to the last attempt."""
+        job = enqueue_image_download(
+            self.organization, "logo", "https://example.com/a.png", "a.jpg"
+        )
+        error = ValidationError("Unable to download image")
+        delays = []
+        with (
+            override_settings(IMAGE_DOWNLOAD_MAX_ATTEMPTS=3, IMAGE_DOWNLOAD_RETRY_DELAY=30),
+            self._download(side_effect=error),
+        ):
+            for _ in range(3):
+                started = timezone.now()
+                self.assertEqual(process_image_downloads(), {"done": 0, "failed": 1})
+                job.refresh_from_db()
+                delays.append(round((job.available_at - started).total_seconds() / 30))
+                # Not due until the delay has passed.
+                self.assertEqual(process_image_downloads(), {"done": 0, "failed": 0})
+                ImageDownload.objects.filter(pk=job.pk).update(
+                    available_at=job.available_at - timedelta(hours=2)
+                )
+
+        job.refresh_from_db()
+        self.assertEqual(delays[:2], [1, 2])
+        self.assertEqual((job.status, job.attempts), (ImageDownload.Status.FAILED, 3))
+        self.assertEqual(job.last_error, "Unable to download image")
+
+    def test_expired_lease_and_superseded_jobs(self):
+        """Test that a stale running job is claimed again and a replaced one is dropped."""
+        job = enqueue_image_download(
+            self.organization, "logo", "https://example.com/a.png", "a.jpg"
+        )
+        [claimed] = claim_image_downloads(10)
+        self.assertEqual(claim_image_downloads(10), [])
+        ImageDownload.objects.filter(pk=job.pk).update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+        [claimed] = claim_image_downloads(10)
+        self.assertEqual(claimed.attempts, 2)
+
+        newer = enqueue_image_download(
+            self.organization, "logo", "https://example.com/b.png", "b.jpg"
+        )
+        with self._download(return_value=self._image_file()):
+            self.assertTrue(run_image_download(claimed))
+
+        self.organization.refresh_from_db()
+        self.assertFalse(self.organization.logo)
+        self.assertQuerySetEqual(ImageDownload.objects.all(), [newer])
+
+    def test_command_runs_due_downloads_once(self):
+        """Test that the worker command with --once exits after the due downloads."""
+        enqueue_image_download(self.organization, "logo", "https://example.com/a.png", "a.jpg")
+        stdout = io.StringIO()
+
+        with self._download(return_value=self._image_file()):
+            call_command("process_image_downloads", "--once", stdout=stdout)
+
+        self.assertIn("1 download(s) done, 0 failed", stdout.getvalue())
+        self.assertFalse(ImageDownload.objects.exists())
+
+    def test_admin_shows_the_pending_download(self):
+        """Test that the organization change page shows its queued logo download."""
+        # Render the admin without the collected static files manifest.
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }
+        self.enterContext(override_settings(STORAGES=storages))
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="unused-password")
+        )
+        enqueue_image_download(self.organization, "logo", "https://example.com/a.png", "a.jpg")
+
+        response = self.client.get(
+            reverse("admin:organization_organization_change", args=[self.organization.pk])
+        )
+
+        self.assertContains(response, "Pending download from https://example.com/a.png")
+
+
+class ImageFetcherTests(TestCase):
+    """Test cases for the streaming, size-capped image fetcher."""
+
+    def _encode(self, image, format):
+        buffer = BytesIO()
+        image.save(buffer, format=format)
+        return buffer.getvalue()
+
+    def _fetch(self, body, headers=None, **settings):
+        response = mock.MagicMock(status_code=200, headers=headers or {})
+        response.__enter__.return_value = response
+        response.iter_content.side_effect = lambda chunk_size: (
+            body[start : start + chunk_size] for start in range(0, len(body), chunk_size)
+        )
+        with override_settings(**settings), mock.patch("requests.get", return_value=response):
+            return download_image_from_url("https://example.com/image", "image.jpg")
+
+    def _open(self, image_file):
+        return Image.open(image_file)
+
+    def test_large_jpeg_is_decoded_at_a_reduced_scale(self):
+        """Test that a photo is shrunk to fit the maximum dimension, keeping its ratio."""
+        body = self._encode(Image.new("RGB", (4000, 3000), "navy"), "JPEG")
+
+        image = self._open(self._fetch(body, IMAGE_MAX_DIMENSION=500))
+
+        self.assertEqual((image.format, image.size), ("JPEG", (500, 375)))
+
+    def test_transparent_images_are_composited_onto_white(self):
+        """Test that RGBA and palette transparency become white rather than black."""
+        rgba = Image.new("RGBA", (3000, 100), (255, 0, 0, 0))
+        rgba.paste((255, 0, 0, 255), (0, 0, 1500, 100))
+        palette = Image.new("P", (40, 40), 1)
+        palette.putpalette([0, 0, 0, 0, 0, 255])
+        palette.info["transparency"] = 1
+
+        image = self._open(self._fetch(self._encode(rgba, "PNG"), IMAGE_MAX_DIMENSION=300))
+        self.assertEqual(image.size, (300, 10))
+        red, transparent = image.getpixel((50, 5)), image.getpixel((250, 5))
+        self.assertGreater(red[0], 240)
+        self.assertLess(red[1], 15)
+        self.assertTrue(all(channel > 240 for channel in transparent))
+
+        image = self._open(self._fetch(self._encode(palette, "PNG")))
+        self.assertEqual(image.mode, "RGB")
+        self.assertTrue(all(channel > 240 for channel in image.getpixel((20, 20))))
+
+    def test_responses_over_the_byte_cap_are_rejected(self):
+        """Test that a body is rejected from its length header or once it streams too far."""
+        for headers in ({"Content-Length": "2048"}, {}):
+            with (
+                self.subTest(headers=headers),
+                self.assertRaisesMessage(ValidationError, "larger than 1024 bytes"),
+            ):
+                self._fetch(bytes(2048), headers, IMAGE_DOWNLOAD_MAX_BYTES=1024)
+
+    def test_images_over_the_pixel_cap_are_rejected_before_decoding(self):
+        """Test that a highly compressible image of too many pixels is never decoded."""
+        body = self._encode(Image.new("1", (3000, 3000)), "PNG")
+
+        with (
+            mock.patch.object(ImageFile.ImageFile, "load") as load,
+            self.assertRaisesMessage(ValidationError, "3000x3000 pixels"),
+        ):
+            self._fetch(body, IMAGE_MAX_PIXELS=1_000_000)
+        load.assert_not_called()
+
+    def test_undecodable_bodies_are_rejected(self):
+        """Test that a body that isn't an image raises a validation error."""
+        with self.assertRaisesMessage(ValidationError, "trying to open the image"):
+            self._fetch(b"<html>not an image</html>")
+
+
+class ImageVariantTests(MediaTestCase):
+    """Test cases for the resized variants of logos and profile pictures."""
+
+    def _size(self, name):
+        with default_storage.open(name) as file, Image.open(file) as image:
+            return image.format, image.size
+
+    def test_variants_are_generated_on_upload_and_replaced_with_the_logo(self):
+        """Test that saving a logo stores its variants, and replacing it deletes the old ones."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.logo = self._upload()
+            self.organization.save()
+        old_logo = self.organization.logo.name
+
+        self.assertEqual(self._size(variant_name(old_logo, "thumb")), ("WEBP", (96, 48)))
+        self.assertEqual(
+            self._size(variant_name(old_logo, "medium", "jpeg")), ("JPEG", (320, 160))
+        )
+        self.assertEqual(self._size(variant_name(old_logo, "full")), ("WEBP", (1024, 512)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.logo = self._upload(size=(1000, 1000), name="other.png")
+            self.organization.save()
+
+        self.assertFalse(any(map(default_storage.exists, variant_names(old_logo))))
+        self.assertTrue(
+            all(map(default_storage.exists, variant_names(self.organization.logo.name)))
+        )
+
+    def test_graphql_returns_variant_urls_generated_on_first_request(self):
+        """Test that a size argument returns a variant URL, generating the variant if needed."""
+        self.organization.logo = self._upload()
+        self.organization.save()
+        create_employee(self._designation())
+        logo = self.organization.logo.name
+        self.assertFalse(default_storage.exists(variant_name(logo, "thumb")))
+
+        result = schema.execute_sync(
+            """
+            query {
+              getOrganizationsById { logo original: logo thumb: logo(size: THUMB, format: JPEG) }
+              getEmployeesById { profilePicture(size: THUMB) }
+            }
+            """
+        )
+
+        self.assertIsNone(result.errors)
+        [organization] = result.data["getOrganizationsById"]
+        self.assertEqual(organization["original"], f"/media/{logo}")
+        self.assertEqual(organization["thumb"], f"/media/{variant_name(logo, 'thumb', 'jpeg')}")
+        self.assertTrue(default_storage.exists(variant_name(logo, "thumb")))
+        self.assertEqual(
+            result.data["getEmployeesById"],
+            [{"profilePicture": "/static/images/default_profile_picture.jpg"}],
+        )
+
+    def test_backfill_generates_missing_variants_and_reports_failures(self):
+        """Test that the backfill command generates missing variants and skips existing ones."""
+        self.organization.logo = self._upload()
+        self.organization.save()
+        employee = Employee(
+            designation=self._designation(),
+            name=fake.name(),
+            description=fake.text(max_nb_chars=50),
+            contact_no="9800000000",
+        )
+        employee.profile_picture.save("broken.jpg", ContentFile(b"not an image"))
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        call_command("generate_image_variants", stdout=stdout, stderr=stderr)
+        call_command("generate_image_variants", stdout=stdout, stderr=stderr)
+
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            [
+                "organization logo: 1 generated, 0 up to date, 0 failed",
+                "employee profile_picture: 0 generated, 0 up to date, 1 failed",
+                "organization logo: 0 generated, 1 up to date, 0 failed",
+                "employee profile_picture: 0 generated, 0 up to date, 1 failed",
+            ],
+        )
+        self.assertIn(employee.profile_picture.name, stderr.getvalue())
+
+
+class ContentAddressedStorageTests(MediaTestCase):
+    """Test cases for the storage of uploads by content, shared between rows."""
+
+    def test_identical_uploads_are_stored_once_and_different_ones_apart(self):
+        """Test that files are named by their content rather than their upload name."""
+        first = create_organization(logo=self._upload(name="logo.png"))
+        second = create_organization(logo=self._upload(name="LOGO-copy.PNG"))
+        third = create_organization(logo=self._upload(size=(10, 10), name="logo.png"))
+
+        self.assertEqual(first.logo.name, second.logo.name)
+        self.assertNotEqual(first.logo.name, third.logo.name)
+        self.assertTrue(is_content_addressed(first.logo.name))
+        self.assertTrue(first.logo.name.endswith(".png"))
+        self.assertEqual(len(os.listdir(os.path.join(settings.MEDIA_ROOT, "logos"))), 2)
+
+    def test_shared_file_is_deleted_with_the_last_row_referencing_it(self):
+        """Test that deleting a row keeps a file another row still references."""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = create_organization(logo=self._upload())
+            second = create_organization(logo=self._upload(name="copy.png"))
+        logo = first.logo.name
+        self.assertEqual(reference_count(logo), 2)
+        self.assertTrue(all(map(default_storage.exists, variant_names(logo))))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertTrue(default_storage.exists(logo))
+        self.assertTrue(all(map(default_storage.exists, variant_names(logo))))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertFalse(default_storage.exists(logo))
+        self.assertFalse(any(map(default_storage.exists, variant_names(logo))))
+
+        employee = create_employee(self._designation(), profile_picture=self._upload())
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+        self.assertFalse(default_storage.exists(employee.profile_picture.name))
+
+    def test_replacing_a_shared_file_keeps_it_for_the_other_rows(self):
+        """Test that replacing a file releases it only when no other row references it."""
+        first = create_organization(logo=self._upload())
+        second = create_organization(logo=self._upload())
+        logo = first.logo.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.logo = self._upload(size=(10, 10))
+            first.save()
+        self.assertTrue(default_storage.exists(logo))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.logo = None
+            second.save()
+        self.assertFalse(default_storage.exists(logo))
+
+    def test_rolled_back_delete_keeps_the_file(self):
+        """Test that a file is only released once the delete is committed."""
+        organization = create_organization(logo=self._upload())
+
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertRaises(RuntimeError),
+            transaction.atomic(),
+        ):
+            organization.delete()
+            raise RuntimeError
+
+        self.assertTrue(default_storage.exists(organization.logo.name))
+
+    def _age(self, name, seconds=120):
+        modified = time.time() - seconds
+        os.utime(content_addressed_storage().path(name), (modified, modified))
+
+    @override_settings(MEDIA_RELEASE_GRACE_PERIOD=60)
+    def test_recently_saved_file_is_kept_until_pruned(self):
+        """Test that an unreferenced file saved within the grace period is left to pruning."""
+        with self.captureOnCommitCallbacks(execute=True):
+            organization = create_organization(logo=self._upload())
+        logo = organization.logo.name
+        with self.captureOnCommitCallbacks(execute=True):
+            organization.delete()
+        self.assertTrue(default_storage.exists(logo))
+
+        stdout = io.StringIO()
+        call_command("prune_uploads", stdout=stdout)
+        self._age(logo)
+        call_command("prune_uploads", stdout=stdout)
+
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            ["0 unreferenced file(s) deleted", "1 unreferenced file(s) deleted"],
+        )
+        self.assertFalse(default_storage.exists(logo))
+        self.assertFalse(any(map(default_storage.exists, variant_names(logo))))
+
+    @override_settings(MEDIA_RELEASE_GRACE_PERIOD=60)
+    def test_reused_file_is_kept_for_the_row_saving_it(self):
+        """Test that saving identical bytes again keeps the file from a concurrent release."""
+        organization = create_organization(logo=self._upload())
+        logo = organization.logo.name
+        self._age(logo)
+
+        # Another row saves the same bytes before its transaction is committed.
+        self.assertEqual(content_addressed_storage().save("logos/copy.png", self._upload()), logo)
+        with self.captureOnCommitCallbacks(execute=True):
+            organization.delete()
+
+        self.assertTrue(default_storage.exists(logo))
+
+
+class MediaServingTests(MediaTestCase):
+    """Test cases for the view serving the stored media files."""
+
+    def setUp(self):
+        """Store a sample document under its content hash and a file under a plain name."""
+        super().setUp()
+        self.content = bytes(range(256)) * 4
+        self.name = content_addressed_storage().save(
+            "sample_documents/form.pdf", ContentFile(self.content)
+        )
+        self.plain_name = default_storage.save("variants/form/thumb.webp", ContentFile(b"webp"))
+
+    def _get(self, name, **headers):
+        response = self.client.get(f"/media/{name}", headers=headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_content_addressed_file_is_cached_forever(self):
+        """Test that a file named after its content is served with an immutable cache policy."""
+        response, body = self._get(self.name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["ETag"], f'"{self.name[17:-4]}"')
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+
+        response, body = self._get(self.plain_name)
+        self.assertEqual(body, b"webp")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_conditional_requests_are_answered_with_not_modified(self):
+        """Test that a matching ETag or an unchanged date returns a 304 without the file."""
+        response, _ = self._get(self.plain_name)
+
+        for headers in (
+            {"If-None-Match": response["ETag"]},
+            {"If-Modified-Since": response["Last-Modified"]},
+        ):
+            with self.subTest(headers=headers):
+                not_modified, body = self._get(self.plain_name, **headers)
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(body, b"")
+                self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_byte_ranges_are_served_partially(self):
+        """Test that a single range is answered with only its bytes."""
+        for header, first, last in (
+            ("bytes=2-5", 2, 5),
+            ("bytes=1000-", 1000, 1023),
+            ("bytes=-4", 1020, 1023),
+            ("bytes=1020-5000", 1020, 1023),
+        ):
+            with self.subTest(header=header):
+                response, body = self._get(self.name, Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(body, self.content[first : last + 1])
+                self.assertEqual(response["Content-Length"], str(last - first + 1))
+                self.assertEqual(response["Content-Range"], f"bytes {first}-{last}/1024")
+
+        response, _ = self._get(self.name, Range="bytes=2000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+        for headers in (
+            {"Range": "bytes=0-1,4-5"},
+            {"Range": "bytes=5-2"},
+            {"Range": "bytes=2-5", "If-Range": '"stale"'},
+        ):
+            with self.subTest(headers=headers):
+                response, body = self._get(self.name, **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(body, self.content)
+
+    def test_transfer_is_offloaded_to_the_reverse_proxy(self):
+        """Test that a configured sendfile header hands the file to the proxy."""
+        with override_settings(MEDIA_SENDFILE_HEADER="X-Accel-Redirect"):
+            response, body = self._get(self.name)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.name}")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(body, b"")
+
+        with override_settings(MEDIA_SENDFILE_HEADER="X-Sendfile"):
+            response, body = self._get(self.plain_name)
+        self.assertEqual(
+            response["X-Sendfile"], os.path.join(settings.MEDIA_ROOT, self.plain_name)
+        )
+        self.assertEqual(body, b"")
+
+    def test_missing_and_outside_files_are_not_found(self):
+        """Test that only existing files inside the media root are served."""
+        for name in ("sample_documents/missing.pdf", "sample_documents", "%2e%2e/manage.py"):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(f"/media/{name}").status_code, 404)
+        self.assertEqual(self.client.post(f"/media/{self.name}").status_code, 405)
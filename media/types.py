@@ -0,0 +1,22 @@
+"""This module contains the types for the media app."""
+
+from enum import Enum
+
+import strawberry
+
+
+@strawberry.enum
+class ImageSize(Enum):
+    """Resized variant of an image: 96, 320 or 1024 pixels on its longest side."""
+
+    THUMB = "thumb"
+    MEDIUM = "medium"
+    FULL = "full"
+
+
+@strawberry.enum
+class ImageFormat(Enum):
+    """Encoding of an image variant."""
+
+    WEBP = "webp"
+    JPEG = "jpeg"
@@ -0,0 +1,80 @@
+"""This module contains the resized variants of the stored logos and profile pictures."""
+
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+
+from root.utils import decode_image
+
+from . import storage
+
+# Largest width and height of each variant, which keeps the aspect ratio of its image.
+VARIANT_SIZES = {"thumb": 96, "medium": 320, "full": 1024}
+# Pillow format of each variant format, with its file extension.
+VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+# Image fields whose files get variants, as (app label, model, field name).
+VARIANT_FIELDS = (
+    ("organization", "Organization", "logo"),
+    ("employee", "Employee", "profile_picture"),
+)
+
+
+def variant_name(name, size, format="webp"):
+    """Return the storage name of a variant of the stored image ``name``."""
+    return f"variants/{os.path.splitext(name)[0]}/{size}.{format}"
+
+
+def variant_names(name):
+    """Return the storage names of every variant of the stored image ``name``."""
+    return [
+        variant_name(name, size, format) for size in VARIANT_SIZES for format in VARIANT_FORMATS
+    ]
+
+
+def generate_variants(name):
+    """
+    Store every variant of the stored image ``name``, replacing existing ones, and raise
+    ``ValidationError`` when the image can't be decoded.
+
+    The image is decoded once, at the largest variant size, and shrunk from one size to
+    the next.
+    """
+    uploads = storage.content_addressed_storage()
+    with uploads.open(name, "rb") as file:
+        image = decode_image(file, max(VARIANT_SIZES.values()), settings.IMAGE_MAX_PIXELS)
+    for size, dimension in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((dimension, dimension))
+        for format, pillow_format in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, format=pillow_format, quality=80)
+            variant = variant_name(name, size, format)
+            uploads.delete(variant)
+            uploads.save_derived(variant, ContentFile(buffer.getvalue()))
+
+
+def delete_variants(name):
+    """Delete the variants of the stored image ``name``."""
+    uploads = storage.content_addressed_storage()
+    for variant in variant_names(name):
+        uploads.delete(variant)
+
+
+def variant_url(file, size, format="webp"):
+    """
+    Return the URL of a variant of an image field file, generating the variants on first
+    request. Falls back to the original when they can't be generated, and returns ``None``
+    for an empty file.
+    """
+    if not file:
+        return None
+    uploads = storage.content_addressed_storage()
+    name = variant_name(file.name, size, format)
+    if not uploads.exists(name):
+        try:
+            generate_variants(file.name)
+        except (ValidationError, OSError):
+            return file.url
+    return uploads.url(name)
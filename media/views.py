@@ -0,0 +1,162 @@
+"""This module contains the view serving the stored media files."""
+
+import mimetypes
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_addressed
+
+# A single byte range: "bytes=first-last", "bytes=first-" or the suffix "bytes=-length".
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Stored files named after their content never change.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve the media file at ``path``, with validators for conditional requests and cache
+    headers, handing the transfer to the reverse proxy when ``MEDIA_SENDFILE_HEADER`` is set.
+
+    Without a proxy, a single byte range is answered with a 206 that only reads the range.
+    """
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+        stat = full_path.stat()
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("Media file not found.")
+    if not full_path.is_file():
+        raise Http404("Media file not found.")
+    etag = media_etag(path, stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if settings.MEDIA_SENDFILE_HEADER:
+            response = _offloaded_response(path, full_path)
+        else:
+            response = _file_response(request, full_path, stat.st_size, etag, last_modified)
+        if response.status_code == 416:
+            return response
+    response.headers.setdefault("ETag", etag)
+    response.headers.setdefault("Last-Modified", http_date(last_modified))
+    if is_content_addressed(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def media_etag(path, stat):
+    """Return the strong ETag of a stored file: its content hash, or its mtime and size."""
+    if is_content_addressed(path):
+        return f'"{os.path.splitext(os.path.basename(path))[0]}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def byte_range(header, size):
+    """
+    Return the ``(first, last)`` bytes of a single range ``Range`` header, ``None`` to serve
+    the whole file, or raise ``ValueError`` when the range can't be satisfied.
+
+    Several ranges are answered with the whole file, as RFC 9110 allows.
+    """
+    match = BYTE_RANGE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        first, last = max(size - int(last), 0), size - 1
+    elif last and int(first) > int(last):
+        # An invalid range is ignored rather than refused.
+        return None
+    else:
+        first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first > last:
+        raise ValueError(f"No byte of the {size} bytes long file is in the range.")
+    return first, last
+
+
+class FileRange:
+    """
+    File object reading ``length`` bytes of a file from its position.
+
+    It keeps the file descriptor, so servers using ``wsgi.file_wrapper`` can send the range
+    with sendfile from the position and for the ``Content-Length`` of the response.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _offloaded_response(path, full_path):
+    response = HttpResponse(content_type=_content_type(path))
+    if settings.MEDIA_SENDFILE_HEADER.lower() == "x-accel-redirect":
+        # nginx serves the internal location aliased to MEDIA_ROOT, ranges included.
+        response["X-Accel-Redirect"] = settings.MEDIA_SENDFILE_PREFIX + quote(path)
+    else:
+        response[settings.MEDIA_SENDFILE_HEADER] = str(full_path)
+    return response
+
+
+def _file_response(request, full_path, size, etag, last_modified):
+    requested = None
+    header = request.headers.get("Range")
+    if header and _if_range_matches(request.headers.get("If-Range"), etag, last_modified):
+        try:
+            requested = byte_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    file = full_path.open("rb")
+    if requested is None:
+        response = FileResponse(file)
+    else:
+        first, last = requested
+        file.seek(first)
+        response = FileResponse(
+            FileRange(file, last - first + 1),
+            status=206,
+            content_type=_content_type(full_path.name),
+        )
+        response["Content-Length"] = last - first + 1
+        response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _content_type(name):
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def _if_range_matches(if_range, etag, last_modified):
+    # A range is only served of the representation the client already holds part of.
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
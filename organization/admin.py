@@ -1,6 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+
+from media.admin import image_download_status
 
 from .forms import (
+    BulkApplyTemplateForm,
     DesignationForm,
     OrganizationForm,
 )
@@ -12,6 +17,7 @@ from .models import (
     Organization,
     OrganizationTemplate,
 )
+from .templating import bulk_apply_template
 
 
 class DepartmentInline(admin.StackedInline):
@@ -51,6 +57,7 @@ class OrganizationAdmin(admin.ModelAdmin):
         "contact_no",
         "is_active",
     )
+    readonly_fields = ("template", image_download_status("logo", "Logo download"))
     inlines = [DepartmentInline, DesignationInline]
 
 
@@ -59,3 +66,41 @@ class OrganizationTemplateAdmin(admin.ModelAdmin):
     inlines = [DepartmentTemplateInline, DesignationTemplateInline]
     list_display = ("name", "description", "is_active")
     search_fields = ("name",)
+    actions = ["apply_to_organizations"]
+
+    @admin.action(description="Create organizations from a file with the selected template")
+    def apply_to_organizations(self, request, queryset):
+        """
+        Ask for the CSV or JSON file of organizations, then create them with the template,
+        like the ``apply_organization_template`` command.
+        """
+        if len(queryset) != 1:
+            self.message_user(request, "Select exactly one template.", messages.ERROR)
+            return None
+        template = queryset[0]
+        form = BulkApplyTemplateForm(
+            request.POST if "apply" in request.POST else None,
+            request.FILES or None,
+            template=template,
+        )
+        if form.is_valid():
+            counts = bulk_apply_template(template, form.cleaned_data["rows"])
+            self.message_user(
+                request,
+                f"Applied '{template}': {counts['created']} organization(s) created, "
+                f"{counts['updated']} updated, {counts['unchanged']} unchanged.",
+                messages.SUCCESS,
+            )
+            return None
+        return TemplateResponse(
+            request,
+            "admin/organization/organizationtemplate/apply_to_organizations.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": f"Create organizations with '{template}'",
+                "opts": self.model._meta,
+                "form": form,
+                "template": template,
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
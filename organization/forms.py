@@ -4,9 +4,15 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
-from root.utils import download_image_from_url
+from media.downloads import enqueue_image_download
 
 from .models import Department, Designation, Organization, OrganizationTemplate
+from .templating import (
+    get_applicable_template,
+    instantiate_template,
+    read_organization_rows,
+    validate_organization_rows,
+)
 
 
 class OrganizationForm(forms.ModelForm):
@@ -14,7 +20,9 @@ class OrganizationForm(forms.ModelForm):
     OrganizationForm class is used to customize the form for the Organization model.
     """
 
-    logo_url = forms.URLField(required=False)
+    logo_url = forms.URLField(
+        required=False, help_text="The logo is downloaded in the background after saving."
+    )
     organization_template = forms.ModelChoiceField(
         queryset=OrganizationTemplate.objects.filter(is_active=True), required=False
     )
@@ -56,36 +64,21 @@ class OrganizationForm(forms.ModelForm):
 
         if template is None:
             return template
-        if not self.fields["organization_template"].queryset.filter(pk=template.pk).exists():
-            raise forms.ValidationError(
-                "The selected organization template is not available or has been deactivated."
-                "Please select a different template or create the organization without a template."
-            )
 
-        try:
-            template = OrganizationTemplate.objects.get(pk=template.pk, is_active=True)
-        except OrganizationTemplate.DoesNotExist:
+        template = get_applicable_template(template.pk)
+        if template is None:
             raise forms.ValidationError(
                 "The selected organization template is not available or has been deactivated. "
                 "Please select a different template or create the organization without a template."
             )
 
-        template.refresh_from_db()
-
-        active_departments = template.department_templates.filter(is_active=True)
-        if not active_departments.exists():
+        if not template.has_active_departments:
             raise forms.ValidationError(
                 f"The selected template '{template.name}' does not contain any active departments."
                 "Please select a different template or create the organization without a template."
             )
 
-        has_active_designations = False
-        for dept_template in active_departments:
-            if dept_template.designation_templates.filter(is_active=True).exists():
-                has_active_designations = True
-                break
-
-        if not has_active_designations:
+        if not template.has_active_designations:
             raise forms.ValidationError(
                 f"The template '{template.name}' does not contain any active designations. "
                 "Please select a different template or create the organization without a template."
@@ -95,15 +88,11 @@ class OrganizationForm(forms.ModelForm):
 
     def save(self, commit=True):
         instance = super().save(commit=False)
-        logo_url = self.cleaned_data.get("logo_url")
-        if logo_url:
-            image_file = download_image_from_url(logo_url, f"{instance.name}.jpg")
-            instance.logo.save(f"{instance.name}.jpg", image_file, save=False)
-
         is_new_organization = not self.instance.pk
         org_template = self.cleaned_data.get("organization_template")
 
         if is_new_organization and org_template:
+            instance.template = org_template
             try:
                 with transaction.atomic():
                     instance.save()
@@ -115,53 +104,18 @@ class OrganizationForm(forms.ModelForm):
                 )
         return instance
 
+    def _save_m2m(self):
+        super()._save_m2m()
+        # Queued once the organization is saved, so the request doesn't wait for the download.
+        logo_url = self.cleaned_data.get("logo_url")
+        if logo_url:
+            enqueue_image_download(self.instance, "logo", logo_url, f"{self.instance.name}.jpg")
+
     def _create_from_template(self, organization, org_template):
         """
         Create departments and designations from organization template.
         """
-
-        for department_template in org_template.department_templates.all():
-            try:
-                department_data = {
-                    "organization": organization,
-                    "name": department_template.name,
-                    "description": department_template.description,
-                    "is_active": department_template.is_active,
-                    "contact_no": self._get_default_contact_no(department_template),
-                    "email": self._get_default_email(department_template, organization),
-                }
-
-                department = Department.objects.create(**department_data)
-
-                for designation_template in department_template.designation_templates.all():
-                    Designation.objects.create(
-                        organization=organization,
-                        department=department,
-                        title=designation_template.title,
-                        description=designation_template.description,
-                        priority=designation_template.priority,
-                        allow_multiple_employees=designation_template.allow_multiple_employees,
-                    )
-
-            except Exception:
-                raise
-
-    def _get_default_contact_no(self, department_template):
-        """
-        Get default contact number for department created from template.
-        """
-        if hasattr(self, "instance") and self.instance and self.instance.contact_no:
-            return self.instance.contact_no
-        return "N/A"
-
-    def _get_default_email(self, department_template, organization):
-        """
-        Get default email for department created from template.
-        TODO: Change default email to N/A
-        """
-        dept_name_clean = department_template.name.lower().replace(" ", "").replace("-", "")
-        org_name_clean = organization.name.lower().replace(" ", "").replace("-", "")
-        return f"{dept_name_clean}@{org_name_clean}.local"
+        instantiate_template(org_template, [organization])
 
 
 class DesignationForm(forms.ModelForm):
@@ -250,3 +204,29 @@ class DesignationForm(forms.ModelForm):
         """
 
         js = ("js/chained/get_department_for_organization.js",)
+
+
+class BulkApplyTemplateForm(forms.Form):
+    """
+    BulkApplyTemplateForm takes the CSV or JSON file of organizations an organization
+    template is applied to from the admin.
+    """
+
+    file = forms.FileField(
+        help_text="A .csv file with a header row, or a .json list of objects, with a username "
+        "and the organization fields of each organization."
+    )
+
+    def __init__(self, *args, template, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.template = template
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        try:
+            rows = read_organization_rows(file, file.name)
+            validate_organization_rows(rows, self.template)
+        except ValidationError as error:
+            raise forms.ValidationError(error.messages)
+        self.cleaned_data["rows"] = rows
+        return file
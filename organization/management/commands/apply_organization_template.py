@@ -0,0 +1,52 @@
+"""Create organizations in bulk from a CSV or JSON file and an organization template."""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organization.models import OrganizationTemplate
+from organization.templating import bulk_apply_template, read_organization_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the users and organizations listed in a CSV or JSON file with the departments "
+        "and designations of a template. Existing organizations, matched by username, are "
+        "updated or skipped, so the command can be run again safely."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("template_id", type=int)
+        parser.add_argument("path", help="A .csv file with a header row, or a .json list.")
+        parser.add_argument(
+            "--batch-size", type=int, default=50, help="Organizations written per transaction."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            template = OrganizationTemplate.objects.get(pk=options["template_id"])
+        except OrganizationTemplate.DoesNotExist:
+            raise CommandError(f"Organization template {options['template_id']} does not exist.")
+        try:
+            with open(options["path"], encoding="utf-8-sig") as file:
+                rows = read_organization_rows(file, options["path"])
+        except OSError as error:
+            raise CommandError(f"Could not read {options['path']}: {error}")
+        except ValidationError as error:
+            raise CommandError("\n".join(error.messages))
+
+        def progress(done, counts):
+            self.stdout.write(
+                f"{done}/{len(rows)} rows: {counts['created']} created, "
+                f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+
+        try:
+            counts = bulk_apply_template(template, rows, options["batch_size"], progress)
+        except ValidationError as error:
+            raise CommandError("\n".join(error.messages))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Applied '{template}' to {len(rows)} organization(s): {counts['created']} "
+                f"created, {counts['updated']} updated, {counts['unchanged']} unchanged."
+            )
+        )
@@ -0,0 +1,49 @@
+"""Bring the organizations created from a template in line with its current rows."""
+
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+
+from organization.models import OrganizationTemplate
+from organization.templating import TemplateSync
+
+
+class Command(BaseCommand):
+    help = (
+        "Create, update and deactivate the departments and designations of the organizations "
+        "created from a template so they match the template's current rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("template_id", type=int)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report the changes without writing them."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            template = OrganizationTemplate.objects.get(pk=options["template_id"])
+        except OrganizationTemplate.DoesNotExist:
+            raise CommandError(f"Organization template {options['template_id']} does not exist.")
+
+        sync = TemplateSync(template)
+        report = sorted(sync.report, key=lambda entry: entry[0])
+        for organization_id, entries in groupby(report, key=lambda entry: entry[0]):
+            self.stdout.write(f"{sync.organizations[organization_id]}:")
+            for _, change in entries:
+                self.stdout.write(f"  {change}")
+
+        summary = ", ".join(f"{count} {name}" for name, count in sync.counts.items() if count)
+        if not summary:
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(sync.organizations)} organization(s) are up to date.")
+            )
+        elif options["dry_run"]:
+            self.stdout.write(f"Dry run, nothing was written: {summary}.")
+        else:
+            sync.apply()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Synchronized {len(sync.organization_ids)} organization(s): {summary}."
+                )
+            )
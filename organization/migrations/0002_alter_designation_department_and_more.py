@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='designation',
+            name='department',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='organization.department'),
+        ),
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['organization'], name='department_active_org_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='departmenttemplate',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['organization_template'], name='depttemplate_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='designation',
+            index=models.Index(fields=['department', 'priority'], name='designation_dept_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='designationtemplate',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['department_template'], name='desigtemplate_active_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0002_alter_designation_department_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='department_template',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='departments', to='organization.departmenttemplate'),
+        ),
+        migrations.AddField(
+            model_name='designation',
+            name='designation_template',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='designations', to='organization.designationtemplate'),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='organizations', to='organization.organizationtemplate'),
+        ),
+    ]
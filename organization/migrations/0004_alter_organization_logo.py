@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:00
+
+import media.storage
+import root.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0003_organization_template_links'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organization',
+            name='logo',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=media.storage.content_addressed_storage, upload_to=root.utils.UploadToPathAndRename('logos')),
+        ),
+    ]
@@ -1,10 +1,13 @@
 """This file contains the models for the organization app."""
 
+from functools import partial
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.core.files.storage import default_storage
-from django.db import models
+from django.db import models, transaction
 
+from media.storage import content_addressed_storage, replace_file
+from root.tracking import TrackedFieldsMixin
 from root.utils import UploadToPathAndRename
 
 from .choices import PROVINCE_CHOICES
@@ -12,11 +15,16 @@ from .choices import PROVINCE_CHOICES
 User = get_user_model()
 
 
-class Organization(models.Model):
+class Organization(TrackedFieldsMixin, models.Model):
     """
     Organization model represents an organization in the system.
+
+    Saving an organization loaded from the database runs no query besides the UPDATE
+    unless its user changes.
     """
 
+    tracked_fields = ("user", "logo")
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=200, blank=False, null=False)
     tag_line = models.CharField(max_length=200, blank=True, null=False)
@@ -29,56 +37,100 @@ class Organization(models.Model):
 
     contact_no = models.CharField(max_length=15, blank=False, null=False)
     website = models.URLField(max_length=200, blank=False, null=False)
-    logo = models.ImageField(upload_to=UploadToPathAndRename("logos"), blank=True, null=True)
+    logo = models.ImageField(
+        upload_to=UploadToPathAndRename("logos"),
+        storage=content_addressed_storage,
+        blank=True,
+        null=True,
+        db_index=True,
+    )
     is_active = models.BooleanField(default=True)
+    # Template the departments and designations were created from, kept in sync with it.
+    template = models.ForeignKey(
+        "OrganizationTemplate",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="organizations",
+    )
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        try:
-            old_organization = Organization.objects.get(pk=self.pk)
-            if (
-                old_organization.logo
-                and old_organization.logo != self.logo
-                and default_storage.exists(old_organization.logo.name)
-            ):
-                default_storage.delete(old_organization.logo.name)
-        except Organization.DoesNotExist:
-            pass
-        except Exception as e:
-            raise ValidationError(f"An error occurred: {e}")
+        # An unchanged user was checked when it was stored and stays backed by the unique
+        # foreign key, so only a newly assigned one costs the existence and uniqueness queries.
+        self.full_clean(exclude=None if self.has_changed("user") else ["user"])
+        old_logo = self.stored_value("logo")
+        logo_changed = self.has_changed("logo")
         super().save(*args, **kwargs)
+        if logo_changed:
+            # Released once committed, when no other row shares the replaced file.
+            transaction.on_commit(partial(replace_file, old_logo, self.logo.name))
 
     def __str__(self):
         return str(self.name)
 
 
-class Department(models.Model):
+class Department(TrackedFieldsMixin, models.Model):
     """
     Department Model represents the department within the organization.
     """
 
+    tracked_fields = ("organization",)
+
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
     name = models.CharField(max_length=200, blank=False, null=False)
     description = models.TextField(blank=False)
     contact_no = models.CharField(max_length=20, blank=False, null=False)
     email = models.CharField(max_length=200, blank=False, null=False)
     is_active = models.BooleanField(default=True)
+    # Template row the department was created from. The reference outlives the row, so a
+    # template sync can tell the departments of deleted rows apart from hand-made ones.
+    department_template = models.ForeignKey(
+        "DepartmentTemplate",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        blank=True,
+        null=True,
+        editable=False,
+        related_name="departments",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["organization"],
+                condition=models.Q(is_active=True),
+                name="department_active_org_idx",
+            ),
+        ]
 
     def __str__(self):
         return str(self.name)
 
 
-class Designation(models.Model):
+class Designation(TrackedFieldsMixin, models.Model):
     """
     Designation Model represents the post / designation of a employee.
     """
 
+    tracked_fields = ("organization", "department")
+
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
-    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    # Indexed by the (department, priority) index below.
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=200, blank=False, null=False)
     description = models.TextField(blank=False, null=False)
     priority = models.IntegerField(blank=False, null=False)
     allow_multiple_employees = models.BooleanField(default=False)
+    # Template row the designation was created from, outliving it like the department's.
+    designation_template = models.ForeignKey(
+        "DesignationTemplate",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        blank=True,
+        null=True,
+        editable=False,
+        related_name="designations",
+    )
 
     def clean(self):
         try:
@@ -88,6 +140,11 @@ class Designation(models.Model):
         except (AttributeError, Department.DoesNotExist):
             raise ValidationError("Department is required.")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["department", "priority"], name="designation_dept_priority_idx"),
+        ]
+
     def __str__(self):
         return str(self.title)
 
@@ -123,6 +180,15 @@ class DepartmentTemplate(models.Model):
     description = models.TextField()
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["organization_template"],
+                condition=models.Q(is_active=True),
+                name="depttemplate_active_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -144,5 +210,14 @@ class DesignationTemplate(models.Model):
     allow_multiple_employees = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["department_template"],
+                condition=models.Q(is_active=True),
+                name="desigtemplate_active_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
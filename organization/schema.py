@@ -1,8 +1,12 @@
 """This module contains the schema for the organization app."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 import strawberry
+from strawberry import relay
+from strawberry.types import Info
+
+from root.pagination import KeysetConnection, cap_list
 
 from .models import Department, Designation, Organization
 from .types import DepartmentType, DesignationType, OrganizationType
@@ -14,22 +18,40 @@ class Query:
 
     @strawberry.field
     def get_organizations_by_id(
-        self, organization_id: Optional[int] = None
+        self, info: Info, organization_id: Optional[int] = None
     ) -> List[OrganizationType]:
         """
-        Fetches all the organizations.
+        Fetches all the organizations, at most GRAPHQL_MAX_LIST_SIZE of them.
         """
         if organization_id:
             return Organization.objects.filter(id=organization_id)
+        return cap_list(Organization.objects.all(), info)
+
+    @relay.connection(KeysetConnection[OrganizationType])
+    def organizations(self) -> Iterable[Organization]:
+        """
+        Paginates through all the organizations.
+        """
         return Organization.objects.all()
 
     @strawberry.field
-    def get_departments_by_id(self, department_id: Optional[int] = None) -> List[DepartmentType]:
+    def get_departments_by_id(
+        self, info: Info, department_id: Optional[int] = None
+    ) -> List[DepartmentType]:
         """
-        Fetches all the departments.
+        Fetches all the departments, at most GRAPHQL_MAX_LIST_SIZE of them.
         """
         if department_id:
             return Department.objects.filter(id=department_id)
+        return cap_list(Department.objects.all(), info)
+
+    @relay.connection(KeysetConnection[DepartmentType])
+    def departments(self, organization_id: Optional[int] = None) -> Iterable[Department]:
+        """
+        Paginates through all the departments, optionally of a single organization.
+        """
+        if organization_id:
+            return Department.objects.filter(organization_id=organization_id)
         return Department.objects.all()
 
     @strawberry.field
@@ -41,14 +63,28 @@ class Query:
 
     @strawberry.field
     def get_designations_by_id(
-        self, designation_id: Optional[int] = None
+        self, info: Info, designation_id: Optional[int] = None
     ) -> List[DesignationType]:
         """
-        Fetches all the designations.
+        Fetches all the designations, at most GRAPHQL_MAX_LIST_SIZE of them.
         """
         if designation_id:
             return Designation.objects.filter(id=designation_id)
-        return Designation.objects.all()
+        return cap_list(Designation.objects.all(), info)
+
+    @relay.connection(KeysetConnection[DesignationType])
+    def designations(
+        self, organization_id: Optional[int] = None, department_id: Optional[int] = None
+    ) -> Iterable[Designation]:
+        """
+        Paginates through all the designations, optionally of an organization or department.
+        """
+        queryset = Designation.objects.all()
+        if organization_id:
+            queryset = queryset.filter(organization_id=organization_id)
+        if department_id:
+            queryset = queryset.filter(department_id=department_id)
+        return queryset
 
     @strawberry.field
     def get_designations_by_organization(self, organization_id: int) -> List[DesignationType]:
@@ -60,9 +96,9 @@ class Query:
     @strawberry.field
     def get_designations_by_department(self, department_id: int) -> List[DesignationType]:
         """
-        Fetches all the designations of a department.
+        Fetches all the designations of a department, ordered by priority.
         """
-        return Designation.objects.filter(department_id=department_id)
+        return Designation.objects.filter(department_id=department_id).order_by("priority")
 
 
 schema = strawberry.Schema(query=Query)
@@ -1,17 +1,27 @@
 # organization/signals.py
 
-from django.core.files.storage import default_storage
+from functools import partial
+
+from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models.signals import post_delete, pre_delete
-from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from media.storage import release_file
+from root.response_cache import invalidate_organizations
 
-from .models import Organization
+from .models import Department, Designation, Organization
 
+# Sent with the ``organization_ids`` whose rows were written in bulk, which sends no
+# post_save or post_delete.
+organizations_changed = Signal()
 
-@receiver(pre_delete, sender=Organization)
+
+@receiver(post_delete, sender=Organization)
 def delete_logo_with_organization(sender, instance, **kwargs):
-    if instance.logo and default_storage.exists(instance.logo.name):
-        default_storage.delete(instance.logo.name)
+    if instance.logo:
+        # Counted once committed, so a rolled back delete keeps the file.
+        transaction.on_commit(partial(release_file, instance.logo.name))
 
 
 @receiver(post_delete, sender=Organization)
@@ -19,3 +29,41 @@ def delete_user_with_organization(sender, instance, **kwargs):
     user = instance.user
     if user:
         transaction.on_commit(lambda: user.delete())
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_responses_of_organization(sender, instance, **kwargs):
+    invalidate_organizations(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_responses_of_user(sender, instance, raw=False, **kwargs):
+    # The user of an organization is exposed through its organization; other users aren't.
+    if raw:
+        return
+    organization_ids = Organization.objects.filter(user=instance).values_list("pk", flat=True)
+    if organization_ids:
+        invalidate_organizations(*organization_ids)
+
+
+@receiver(pre_save, sender=Department)
+@receiver(pre_save, sender=Designation)
+def remember_previous_organization(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._previous_organization_id = instance.stored_value("organization")
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Designation)
+@receiver(post_delete, sender=Designation)
+def invalidate_responses_of_department(sender, instance, **kwargs):
+    invalidate_organizations(
+        instance.organization_id, getattr(instance, "_previous_organization_id", None)
+    )
+
+
+@receiver(organizations_changed)
+def invalidate_responses_of_changed_organizations(sender, organization_ids, **kwargs):
+    invalidate_organizations(*organization_ids)
@@ -0,0 +1,467 @@
+"""This module contains the batched engine creating organizations' structure from templates."""
+
+import csv
+import io
+import json
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from .models import (
+    Department,
+    DepartmentTemplate,
+    Designation,
+    DesignationTemplate,
+    Organization,
+    OrganizationTemplate,
+)
+from .signals import organizations_changed
+
+User = get_user_model()
+
+# Organization columns read from each row of a bulk import; rows are matched to existing
+# organizations by the ``username`` of their user, and may also give the user's ``email``.
+ORGANIZATION_FIELDS = (
+    "name",
+    "tag_line",
+    "description",
+    "province",
+    "district",
+    "municipality",
+    "ward_no",
+    "contact_no",
+    "website",
+)
+
+
+def get_applicable_template(pk):
+    """
+    Return the active template with ``has_active_departments`` and ``has_active_designations``
+    annotations, or ``None``, in a single query.
+    """
+    active_designations = DesignationTemplate.objects.filter(
+        department_template__organization_template=OuterRef("pk"),
+        department_template__is_active=True,
+        is_active=True,
+    )
+    return (
+        OrganizationTemplate.objects.filter(pk=pk, is_active=True)
+        .annotate(
+            has_active_departments=Exists(
+                DepartmentTemplate.objects.filter(
+                    organization_template=OuterRef("pk"), is_active=True
+                )
+            ),
+            has_active_designations=Exists(active_designations),
+        )
+        .first()
+    )
+
+
+def instantiate_template(template, organizations):
+    """
+    Create the departments and designations of the template in each of the organizations.
+
+    The template is read with two queries and the rows are written with ``bulk_create``, so
+    the query count does not grow with the template or the number of organizations, apart
+    from the INSERT batches SQLite's variable limit splits large writes into.
+
+    ``bulk_create`` sends no ``post_save``, so ``organizations_changed`` is sent instead to
+    invalidate the cached responses and charters of the organizations.
+    """
+    department_templates = list(
+        template.department_templates.prefetch_related("designation_templates")
+    )
+    pairs = [
+        (organization, department_template)
+        for organization in organizations
+        for department_template in department_templates
+    ]
+    departments = Department.objects.bulk_create(
+        Department(
+            organization=organization,
+            name=department_template.name,
+            description=department_template.description,
+            is_active=department_template.is_active,
+            contact_no=organization.contact_no or "N/A",
+            email=default_department_email(department_template, organization),
+            department_template=department_template,
+        )
+        for organization, department_template in pairs
+    )
+    designations = Designation.objects.bulk_create(
+        Designation(
+            organization=organization,
+            department=department,
+            title=designation_template.title,
+            description=designation_template.description,
+            priority=designation_template.priority,
+            allow_multiple_employees=designation_template.allow_multiple_employees,
+            designation_template=designation_template,
+        )
+        for department, (organization, department_template) in zip(departments, pairs)
+        for designation_template in department_template.designation_templates.all()
+    )
+    organizations_changed.send(
+        sender=Organization, organization_ids=[organization.pk for organization in organizations]
+    )
+    return departments, designations
+
+
+# Fields of departments and designations copied from their template rows, and kept in sync
+# with them.
+DEPARTMENT_TEMPLATE_FIELDS = ("name", "description", "is_active")
+DESIGNATION_TEMPLATE_FIELDS = ("title", "description", "priority", "allow_multiple_employees")
+
+
+class TemplateSync:
+    """
+    The changes bringing the organizations created from a template in line with it.
+
+    Departments and designations are matched to the template rows they were created from:
+    rows added to the template are created, changed ones are updated, and the departments
+    of removed rows are deactivated. The designations of removed rows are deleted, unless
+    employees still hold them. The template and its organizations are read with a constant
+    number of queries, and ``apply`` writes the changes with bulk queries.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.departments_to_create = []
+        self.departments_to_update = []
+        self.departments_to_deactivate = []
+        self.designations_to_create = []
+        self.designations_to_update = []
+        self.designations_to_delete = []
+        # Designations of removed template rows left in place for their employees.
+        self.designations_kept = []
+        # (organization id, change) pairs, in the order the changes were planned.
+        self.report = []
+        self._plan()
+
+    def _plan(self):
+        department_templates = list(
+            self.template.department_templates.prefetch_related("designation_templates")
+        )
+        departments = {
+            (department.organization_id, department.department_template_id): department
+            for department in Department.objects.filter(
+                organization__template=self.template, department_template__isnull=False
+            )
+        }
+        Employee = apps.get_model("employee", "Employee")
+        designations = {
+            (designation.organization_id, designation.designation_template_id): designation
+            for designation in Designation.objects.filter(
+                organization__template=self.template, designation_template__isnull=False
+            ).annotate(occupied=Exists(Employee.objects.filter(designation=OuterRef("pk"))))
+        }
+        self.organizations = {
+            organization.pk: organization
+            for organization in self.template.organizations.order_by("pk")
+        }
+        for organization in self.organizations.values():
+            for department_template in department_templates:
+                department = self._plan_department(organization, department_template, departments)
+                for designation_template in department_template.designation_templates.all():
+                    self._plan_designation(
+                        organization, department, designation_template, designations
+                    )
+
+        # What is left was created from template rows that have since been removed.
+        for department in departments.values():
+            if department.is_active:
+                department.is_active = False
+                self.departments_to_deactivate.append(department)
+                self._note(department.organization_id, f"- department '{department}'")
+        for designation in designations.values():
+            if designation.occupied:
+                self.designations_kept.append(designation)
+                self._note(
+                    designation.organization_id,
+                    f"! designation '{designation}' kept for its employees",
+                )
+            else:
+                self.designations_to_delete.append(designation)
+                self._note(designation.organization_id, f"- designation '{designation}'")
+
+    def _plan_department(self, organization, department_template, departments):
+        department = departments.pop((organization.pk, department_template.pk), None)
+        if department is None:
+            department = Department(
+                organization=organization,
+                contact_no=organization.contact_no or "N/A",
+                email=default_department_email(department_template, organization),
+                department_template=department_template,
+            )
+            _copy(department_template, department, DEPARTMENT_TEMPLATE_FIELDS)
+            self.departments_to_create.append(department)
+            self._note(organization.pk, f"+ department '{department}'")
+        elif changed := _copy(department_template, department, DEPARTMENT_TEMPLATE_FIELDS):
+            self.departments_to_update.append(department)
+            self._note(organization.pk, f"~ department '{department}': {', '.join(changed)}")
+        return department
+
+    def _plan_designation(self, organization, department, designation_template, designations):
+        designation = designations.pop((organization.pk, designation_template.pk), None)
+        if designation is None:
+            designation = Designation(
+                organization=organization,
+                department=department,
+                designation_template=designation_template,
+            )
+            _copy(designation_template, designation, DESIGNATION_TEMPLATE_FIELDS)
+            self.designations_to_create.append(designation)
+            self._note(organization.pk, f"+ designation '{designation}' in '{department}'")
+            return
+        changed = _copy(designation_template, designation, DESIGNATION_TEMPLATE_FIELDS)
+        if designation.department_id != department.pk:
+            designation.department = department
+            changed.append("department")
+        if changed:
+            self.designations_to_update.append(designation)
+            self._note(organization.pk, f"~ designation '{designation}': {', '.join(changed)}")
+
+    def _note(self, organization_id, change):
+        self.report.append((organization_id, change))
+
+    @property
+    def counts(self):
+        return {
+            "departments created": len(self.departments_to_create),
+            "departments updated": len(self.departments_to_update),
+            "departments deactivated": len(self.departments_to_deactivate),
+            "designations created": len(self.designations_to_create),
+            "designations updated": len(self.designations_to_update),
+            "designations deleted": len(self.designations_to_delete),
+            "designations kept": len(self.designations_kept),
+        }
+
+    @property
+    def organization_ids(self):
+        return sorted({organization_id for organization_id, _ in self.report})
+
+    def apply(self):
+        """Write the changes in one transaction."""
+        with transaction.atomic():
+            Department.objects.bulk_create(self.departments_to_create)
+            Department.objects.bulk_update(
+                self.departments_to_update + self.departments_to_deactivate,
+                DEPARTMENT_TEMPLATE_FIELDS,
+            )
+            # The new designations pick up the primary keys of their new departments.
+            Designation.objects.bulk_create(self.designations_to_create)
+            Designation.objects.bulk_update(
+                self.designations_to_update, (*DESIGNATION_TEMPLATE_FIELDS, "department")
+            )
+            if self.designations_to_delete:
+                Designation.objects.filter(
+                    pk__in=[designation.pk for designation in self.designations_to_delete]
+                ).delete()
+            self._move_employees()
+            if self.report:
+                organizations_changed.send(
+                    sender=Organization, organization_ids=self.organization_ids
+                )
+
+    def _move_employees(self):
+        """Move the employees of designations moved to another department along with them."""
+        moved = [
+            designation.pk
+            for designation in self.designations_to_update
+            if designation.department_id != designation.stored_value("department")
+        ]
+        if not moved:
+            return
+        Employee = apps.get_model("employee", "Employee")
+        Employee.objects.filter(designation_id__in=moved).update(
+            department_id=Subquery(
+                Designation.objects.filter(pk=OuterRef("designation_id")).values("department_id")
+            )
+        )
+
+
+def _copy(source, target, fields):
+    """Copy the fields from the template row, returning the names of those that changed."""
+    changed = [field for field in fields if getattr(target, field) != getattr(source, field)]
+    for field in changed:
+        setattr(target, field, getattr(source, field))
+    return changed
+
+
+def read_organization_rows(file, name):
+    """Read the organization rows of a ``.csv`` or ``.json`` file, a list of objects."""
+    content = file.read()
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    suffix = Path(name).suffix.lower()
+    if suffix == ".csv":
+        return list(csv.DictReader(io.StringIO(content)))
+    if suffix == ".json":
+        try:
+            rows = json.loads(content)
+        except ValueError as error:
+            raise ValidationError(f"The file is not valid JSON: {error}")
+        if isinstance(rows, list) and all(isinstance(row, dict) for row in rows):
+            return rows
+        raise ValidationError("The JSON file must contain a list of organization objects.")
+    raise ValidationError(f"Unsupported file type '{suffix}', use a .csv or .json file.")
+
+
+def validate_organization_rows(rows, template):
+    """
+    Check every row before anything is written, raising a ``ValidationError`` listing the
+    problems of all rows by their 1-based number.
+
+    A row may only name a user without an organization, or one whose organization was
+    created from ``template``. Rows updating an organization are checked with their columns
+    applied to it, as they will be saved.
+    """
+    errors = []
+    seen = set()
+    users = User.objects.select_related("organization").in_bulk(
+        [_username(row) for row in rows], field_name="username"
+    )
+    for number, row in enumerate(rows, start=1):
+        username = _username(row)
+        if not username:
+            errors.append(f"Row {number}: username is required.")
+        elif username in seen:
+            errors.append(f"Row {number}: username '{username}' is repeated.")
+        seen.add(username)
+        organization = _existing_organization(users.get(username))
+        if organization is None:
+            organization = Organization()
+        elif organization.template_id != template.pk:
+            errors.append(
+                f"Row {number}: username '{username}' belongs to the organization "
+                f"'{organization.name}', which was not created from this template."
+            )
+            continue
+        for field, value in _organization_values(row).items():
+            setattr(organization, field, value)
+        try:
+            organization.full_clean(exclude=["user", "logo"], validate_unique=False)
+        except ValidationError as error:
+            for field, messages in error.message_dict.items():
+                errors.extend(f"Row {number}: {field}: {message}" for message in messages)
+    if errors:
+        raise ValidationError(errors)
+
+
+def bulk_apply_template(template, rows, batch_size=50, progress=None):
+    """
+    Create the users and organizations of the rows, with the structure of the template,
+    in one transaction per batch of rows.
+
+    Rows whose organization already exists are updated when their values changed and
+    skipped otherwise, and only new organizations get the template's departments and
+    designations, so running the same import again is a no-op. A failed batch is rolled
+    back alone; running the import again resumes after the committed ones.
+
+    ``progress`` is called after each batch with the number of rows done so far and the
+    counts of ``created``, ``updated`` and ``unchanged`` organizations.
+    """
+    validate_organization_rows(rows, template)
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    for start in range(0, len(rows), batch_size):
+        with transaction.atomic():
+            batch_counts = _apply_batch(template, rows[start : start + batch_size])
+        for key, value in batch_counts.items():
+            counts[key] += value
+        if progress is not None:
+            progress(min(start + batch_size, len(rows)), counts)
+    return counts
+
+
+def _apply_batch(template, rows):
+    users = User.objects.select_related("organization").in_bulk(
+        [_username(row) for row in rows], field_name="username"
+    )
+    matches = [_match_row(row, users, template) for row in rows]
+    new_users = [user for user, state, _ in matches if state == "created"]
+    changed_users = [user for user, state, _ in matches if state == "changed"]
+    new_organizations = [org for _, _, (org, state) in matches if state == "created"]
+    changed_organizations = [org for _, _, (org, state) in matches if state == "changed"]
+
+    # The organizations pick up the primary keys of their new users on bulk_create.
+    User.objects.bulk_create(new_users)
+    User.objects.bulk_update(changed_users, ["email"])
+    Organization.objects.bulk_create(new_organizations)
+    Organization.objects.bulk_update(changed_organizations, ORGANIZATION_FIELDS)
+    if new_organizations:
+        instantiate_template(template, new_organizations)
+    if changed_organizations:
+        organizations_changed.send(
+            sender=Organization,
+            organization_ids=[organization.pk for organization in changed_organizations],
+        )
+    unchanged = sum(
+        user_state == organization_state == "unchanged"
+        for _, user_state, (_, organization_state) in matches
+    )
+    return {
+        "created": len(new_organizations),
+        "updated": len(rows) - len(new_organizations) - unchanged,
+        "unchanged": unchanged,
+    }
+
+
+def _match_row(row, users, template):
+    """
+    Return the user of the row, whether it is ``created``, ``changed`` or ``unchanged``,
+    and the same for its organization, updating existing instances in memory with the
+    columns present in the row.
+    """
+    username = _username(row)
+    email = (row.get("email") or "").strip()
+    user = users.get(username)
+    if user is None:
+        user = User(username=username, email=email)
+        user.set_unusable_password()
+        user_state = "created"
+    elif email and user.email != email:
+        user.email = email
+        user_state = "changed"
+    else:
+        user_state = "unchanged"
+
+    values = _organization_values(row)
+    organization = _existing_organization(user)
+    if organization is None:
+        return user, user_state, (Organization(user=user, template=template, **values), "created")
+    if all(getattr(organization, field) == value for field, value in values.items()):
+        return user, user_state, (organization, "unchanged")
+    for field, value in values.items():
+        setattr(organization, field, value)
+    return user, user_state, (organization, "changed")
+
+
+def _existing_organization(user):
+    if user is None or user.pk is None:
+        return None
+    return getattr(user, "organization", None)
+
+
+def _username(row):
+    # JSON rows may hold numbers or booleans where CSV rows always hold text.
+    return str(row.get("username") or "").strip()
+
+
+def _organization_values(row):
+    return {
+        field: str(row.get(field) or "").strip() for field in ORGANIZATION_FIELDS if field in row
+    }
+
+
+def default_department_email(department_template, organization):
+    """
+    Get default email for department created from template.
+    """
+    dept_name_clean = department_template.name.lower().replace(" ", "").replace("-", "")
+    org_name_clean = organization.name.lower().replace(" ", "").replace("-", "")
+    return f"{dept_name_clean}@{org_name_clean}.local"
@@ -2,12 +2,35 @@
 Unit tests for organization models and forms.
 """
 
+import csv
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
 from django import forms
+from django.conf import settings
+from django.contrib.admin import helpers
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from faker import Faker
 
+from employee.models import Employee
+from root.testing import (
+    GraphQLTestCase,
+    create_department,
+    create_designation,
+    create_organization,
+)
+
 from .choices import PROVINCE_CHOICES
 from .forms import DesignationForm, OrganizationForm
 from .models import (
@@ -18,6 +41,12 @@ from .models import (
     Organization,
     OrganizationTemplate,
 )
+from .templating import (
+    TemplateSync,
+    bulk_apply_template,
+    get_applicable_template,
+    instantiate_template,
+)
 
 User = get_user_model()
 fake = Faker()
@@ -1121,3 +1150,680 @@ class OrganizationFormTemplateValidationTests(TestCase):
         with self.assertRaises(forms.ValidationError) as context:
             form.clean_organization_template()
         self.assertIn("not available or has been deactivated", str(context.exception))
+
+    def test_saving_with_a_template_links_the_organization_to_it(self):
+        """Test that the organization and its rows remember the template they came from."""
+        form_data = self.valid_form_data.copy()
+        form_data["organization_template"] = self.active_template.id
+        form = OrganizationForm(data=form_data)
+        self.assertTrue(form.is_valid(), f"Form errors: {form.errors}")
+
+        organization = form.save()
+
+        self.assertEqual(organization.template, self.active_template)
+        department = organization.department_set.get()
+        self.assertEqual(department.department_template, self.active_dept_template)
+        self.assertEqual(
+            department.designation_set.get().designation_template, self.active_desig_template
+        )
+
+
+class TemplateInstantiationTests(TestCase):
+    """Test cases for the batched creation of departments and designations from templates."""
+
+    def setUp(self):
+        """Set up two organizations and a template of 30 departments with 10 designations each."""
+        self.organizations = [create_organization() for _ in range(2)]
+        self.template = OrganizationTemplate.objects.create(
+            name="Municipality", description=fake.text(max_nb_chars=50)
+        )
+        department_templates = DepartmentTemplate.objects.bulk_create(
+            DepartmentTemplate(
+                organization_template=self.template,
+                name=f"Department {index}",
+                description=fake.text(max_nb_chars=50),
+                is_active=index % 10 != 0,
+            )
+            for index in range(30)
+        )
+        DesignationTemplate.objects.bulk_create(
+            DesignationTemplate(
+                organization_template=self.template,
+                department_template=department_template,
+                title=f"{department_template.name} designation {index}",
+                description=fake.text(max_nb_chars=50),
+                priority=index,
+                allow_multiple_employees=index % 2 == 0,
+                is_active=index != 0,
+            )
+            for department_template in department_templates
+            for index in range(10)
+        )
+
+    def test_validation_is_a_single_query(self):
+        """Test that the template is validated with one query whatever its size."""
+        with self.assertNumQueries(1):
+            template = get_applicable_template(self.template.pk)
+
+        self.assertTrue(template.has_active_departments)
+        self.assertTrue(template.has_active_designations)
+        DesignationTemplate.objects.update(is_active=False)
+        self.assertFalse(get_applicable_template(self.template.pk).has_active_designations)
+        self.template.is_active = False
+        self.template.save()
+        self.assertIsNone(get_applicable_template(self.template.pk))
+
+    def test_instantiation_runs_a_constant_number_of_queries(self):
+        """Test that 30 departments and 300 designations are written in batched INSERTs."""
+        # Two reads of the template, one INSERT of the departments and three of the
+        # designations, which SQLite's 999 variable limit splits in batches of 142 rows.
+        with self.assertNumQueries(6):
+            departments, designations = instantiate_template(self.template, self.organizations[:1])
+
+        self.assertEqual(len(departments), 30)
+        self.assertEqual(len(designations), 300)
+        organization = self.organizations[0]
+        self.assertEqual(Department.objects.filter(organization=organization).count(), 30)
+        self.assertEqual(Department.objects.filter(is_active=False).count(), 3)
+        self.assertEqual(
+            Designation.objects.filter(
+                organization=organization, department__organization=organization
+            ).count(),
+            300,
+        )
+        department = Department.objects.get(name="Department 1")
+        self.assertEqual(department.contact_no, organization.contact_no)
+        self.assertEqual(
+            list(department.designation_set.order_by("priority").values_list("title", flat=True)),
+            [f"Department 1 designation {index}" for index in range(10)],
+        )
+
+    def test_organizations_share_the_template_reads(self):
+        """Test that several organizations are instantiated with the same two reads."""
+        template = OrganizationTemplate.objects.create(name="Small", description="Small")
+        department_template = DepartmentTemplate.objects.create(
+            organization_template=template, name="Ward Office", description="Ward"
+        )
+        DesignationTemplate.objects.create(
+            organization_template=template,
+            department_template=department_template,
+            title="Ward Secretary",
+            description="Secretary",
+            priority=1,
+        )
+
+        with self.assertNumQueries(4):
+            instantiate_template(template, self.organizations)
+
+        self.assertEqual(
+            set(Designation.objects.values_list("organization_id", "department__organization_id")),
+            {(organization.pk, organization.pk) for organization in self.organizations},
+        )
+
+
+class GraphQLDataLoaderTests(GraphQLTestCase):
+    """Test cases for the batched relation loading of the GraphQL types."""
+
+    query = """
+        query {
+            getDesignationsById {
+                title
+                organization { name user { username } }
+                department { name organization { name } }
+            }
+        }
+    """
+
+    def setUp(self):
+        """Set up organizations with departments to attach designations to."""
+        self.departments = [create_department(create_organization()) for _ in range(3)]
+
+    def _create_designations(self, count):
+        Designation.objects.bulk_create(
+            Designation(
+                organization=department.organization,
+                department=department,
+                title=fake.job(),
+                description=fake.text(max_nb_chars=50),
+                priority=index,
+            )
+            for index in range(count)
+            for department in self.departments
+        )
+
+    def test_relations_are_resolved(self):
+        """Test that batched relations resolve to the right rows."""
+        self._create_designations(1)
+
+        data, _ = self.execute_data(self.query)
+
+        designations = data["getDesignationsById"]
+        self.assertEqual(len(designations), 3)
+        for designation in designations:
+            department = Department.objects.get(name=designation["department"]["name"])
+            self.assertEqual(designation["organization"]["name"], department.organization.name)
+            self.assertEqual(
+                designation["organization"]["user"]["username"],
+                department.organization.user.username,
+            )
+
+    def test_query_count_is_constant_as_rows_grow(self):
+        """Test that each relation level costs one query regardless of the row count."""
+        self._create_designations(2)
+        _, small_queries = self.execute_data(self.query)
+
+        self._create_designations(40)
+        data, large_queries = self.execute_data(self.query)
+
+        self.assertEqual(len(data["getDesignationsById"]), 126)
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertLessEqual(len(large_queries), 4)
+
+
+class GraphQLPaginationTests(GraphQLTestCase):
+    """Test cases for the keyset paginated GraphQL connections."""
+
+    def setUp(self):
+        """Set up an organization with a handful of departments."""
+        self.organization = create_organization()
+        Department.objects.bulk_create(
+            Department(
+                organization=self.organization,
+                name=f"Department {index}",
+                description=fake.text(max_nb_chars=50),
+                contact_no=fake.phone_number()[:20],
+                email=fake.email(),
+            )
+            for index in range(7)
+        )
+
+    def test_pages_cover_every_row_exactly_once(self):
+        """Test that following end cursors walks through all departments in order."""
+        query = """
+            query ($after: String) {
+                departments(first: 3, after: $after) {
+                    pageInfo { hasNextPage hasPreviousPage endCursor }
+                    edges { node { name } }
+                }
+            }
+        """
+        names, after, pages = [], None, 0
+        while True:
+            result, _ = self.execute(query, after=after)
+            self.assertIsNone(result.errors)
+            page = result.data["departments"]
+            names += [edge["node"]["name"] for edge in page["edges"]]
+            self.assertEqual(page["pageInfo"]["hasPreviousPage"], after is not None)
+            pages += 1
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            after = page["pageInfo"]["endCursor"]
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(names, [f"Department {index}" for index in range(7)])
+
+    def test_backward_pagination_and_total_count(self):
+        """Test that last/before pages backwards and totalCount counts the whole set."""
+        result, _ = self.execute(
+            """
+            query ($organizationId: Int) {
+                departments(last: 2, organizationId: $organizationId) {
+                    totalCount
+                    pageInfo { hasPreviousPage hasNextPage }
+                    edges { node { name } }
+                }
+            }
+            """,
+            organizationId=self.organization.id,
+        )
+
+        self.assertIsNone(result.errors)
+        page = result.data["departments"]
+        self.assertEqual(page["totalCount"], 7)
+        self.assertTrue(page["pageInfo"]["hasPreviousPage"])
+        self.assertFalse(page["pageInfo"]["hasNextPage"])
+        self.assertEqual(
+            [edge["node"]["name"] for edge in page["edges"]],
+            ["Department 5", "Department 6"],
+        )
+
+    def test_page_size_above_limit_is_rejected(self):
+        """Test that asking for more rows than GRAPHQL_MAX_PAGE_SIZE fails."""
+        with override_settings(GRAPHQL_MAX_PAGE_SIZE=5):
+            result, _ = self.execute("{ departments(first: 6) { edges { node { name } } } }")
+
+        self.assertIsNotNone(result.errors)
+        self.assertIn("between 0 and 5", result.errors[0].message)
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test that a cursor not produced by the server fails cleanly."""
+        result, _ = self.execute('{ departments(after: "bm9wZQ==") { edges { node { name } } } }')
+
+        self.assertIsNotNone(result.errors)
+        self.assertIn("Invalid cursor", result.errors[0].message)
+
+    def test_legacy_list_field_within_limit_returns_every_row(self):
+        """Test that the unpaginated list field returns all rows up to the list size."""
+        with override_settings(GRAPHQL_MAX_LIST_SIZE=7):
+            data, _ = self.execute_data("{ getDepartmentsById { name } }")
+
+        self.assertEqual(len(data["getDepartmentsById"]), 7)
+
+    def test_legacy_list_field_above_limit_is_rejected(self):
+        """Test that the unpaginated list field fails instead of silently truncating."""
+        with override_settings(GRAPHQL_MAX_LIST_SIZE=5):
+            result, _ = self.execute("{ getDepartmentsById { name } }")
+
+        self.assertIsNotNone(result.errors)
+        self.assertIn("more than 5 items", result.errors[0].message)
+
+
+class HotPathIndexTests(TestCase):
+    """Test that the hot organization lookups are served by their indexes."""
+
+    def test_active_departments_use_the_partial_index(self):
+        """Test that active departments of an organization are read from the partial index."""
+        plan = Department.objects.filter(organization_id=1, is_active=True).explain()
+
+        self.assertIn("USING INDEX department_active_org_idx", plan)
+
+    def test_designations_by_priority_need_no_sort(self):
+        """Test that designations of a department come out of the index in priority order."""
+        plan = Designation.objects.filter(department_id=1).order_by("priority").explain()
+
+        self.assertIn("USING INDEX designation_dept_priority_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_active_templates_use_the_partial_indexes(self):
+        """Test that the active department and designation templates use partial indexes."""
+        department_plan = DepartmentTemplate.objects.filter(
+            organization_template_id=1, is_active=True
+        ).explain()
+        designation_plan = DesignationTemplate.objects.filter(
+            department_template_id=1, is_active=True
+        ).explain()
+
+        self.assertIn("USING INDEX depttemplate_active_idx", department_plan)
+        self.assertIn("USING INDEX desigtemplate_active_idx", designation_plan)
+
+
+class OrganizationSaveQueryBudgetTests(TestCase):
+    """Test the number of queries saving loaded organizations and their children costs."""
+
+    def setUp(self):
+        """Set up an organization with a department and a designation."""
+        self.organization = create_organization(logo="logos/old.png")
+        self.departments = [
+            create_department(self.organization, name=f"Department {index}") for index in range(2)
+        ]
+        self.designation = create_designation(self.departments[0])
+
+    def test_saving_a_loaded_organization_runs_only_the_update(self):
+        """Test that neither the row nor the unchanged user is fetched again."""
+        organization = Organization.objects.get(pk=self.organization.pk)
+        organization.name = fake.company()
+
+        with self.assertNumQueries(1):
+            organization.save()
+
+    def test_replaced_logo_is_released_without_a_query(self):
+        """Test that the stored logo is compared without fetching the row again."""
+        organization = Organization.objects.get(pk=self.organization.pk)
+        organization.logo = "logos/new.png"
+
+        with (
+            mock.patch("organization.models.replace_file") as replace_file,
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertNumQueries(1),
+        ):
+            organization.save()
+
+        replace_file.assert_called_once_with("logos/old.png", "logos/new.png")
+
+    def test_new_user_is_validated(self):
+        """Test that a newly assigned user is still checked for existence and uniqueness."""
+        organization = Organization.objects.get(pk=self.organization.pk)
+        organization.user = User.objects.create_user(username=fake.unique.user_name())
+
+        with self.assertNumQueries(3):
+            organization.save()
+
+    def test_designation_moves_employees_only_when_its_department_changes(self):
+        """Test that saving an unmoved designation leaves its employees alone."""
+        designation = Designation.objects.get(pk=self.designation.pk)
+        designation.title = fake.job()
+
+        with self.assertNumQueries(1):
+            designation.save()
+
+        designation.department = self.departments[1]
+        with self.assertNumQueries(2):
+            designation.save()
+
+
+class BulkApplyTemplateTests(TestCase):
+    """Test cases for creating organizations in bulk from a file and a template."""
+
+    def setUp(self):
+        """Set up a template with two departments and three designations."""
+        self.template = OrganizationTemplate.objects.create(
+            name="Municipality", description=fake.text(max_nb_chars=50)
+        )
+        for name, titles in (("Ward Office", ["Secretary", "Clerk"]), ("Health", ["Doctor"])):
+            department_template = DepartmentTemplate.objects.create(
+                organization_template=self.template, name=name, description=name
+            )
+            for priority, title in enumerate(titles):
+                DesignationTemplate.objects.create(
+                    organization_template=self.template,
+                    department_template=department_template,
+                    title=title,
+                    description=title,
+                    priority=priority,
+                )
+        self.rows = [
+            {
+                "username": f"municipality{index}",
+                "email": f"municipality{index}@example.com",
+                "name": f"Municipality {index}",
+                "tag_line": "",
+                "description": fake.text(max_nb_chars=100),
+                "province": PROVINCE_CHOICES[0][0],
+                "district": fake.city(),
+                "municipality": fake.city(),
+                "ward_no": str(index + 1),
+                "contact_no": "01-5550000",
+                "website": f"https://municipality{index}.example.com",
+            }
+            for index in range(5)
+        ]
+
+    def _write(self, suffix, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / f"organizations{suffix}"
+        path.write_text(content)
+        return str(path)
+
+    def _csv(self, rows):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        return self._write(".csv", buffer.getvalue())
+
+    def _call(self, path, *args):
+        stdout = io.StringIO()
+        call_command("apply_organization_template", self.template.pk, path, *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_command_creates_organizations_with_the_template(self):
+        """Test that users, organizations, departments and designations are created."""
+        output = self._call(self._csv(self.rows), "--batch-size", "2")
+
+        self.assertIn("2/5 rows: 2 created", output)
+        self.assertIn("5 created, 0 updated, 0 unchanged", output)
+        organizations = Organization.objects.filter(user__username__startswith="municipality")
+        self.assertEqual(organizations.count(), 5)
+        self.assertEqual(Department.objects.filter(organization__in=organizations).count(), 10)
+        self.assertEqual(Designation.objects.filter(organization__in=organizations).count(), 15)
+        user = User.objects.get(username="municipality3")
+        self.assertEqual(user.email, "municipality3@example.com")
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(user.organization.name, "Municipality 3")
+        self.assertEqual(user.organization.template, self.template)
+
+    def test_rerun_skips_unchanged_rows(self):
+        """Test that a second run only updates the changed rows and adds no structure."""
+        path = self._csv(self.rows)
+        self._call(path)
+        self.rows[1]["website"] = "https://new.example.com"
+        self.rows.append({**self.rows[0], "username": "newcomer", "email": ""})
+
+        output = self._call(self._csv(self.rows))
+
+        self.assertIn("1 created, 1 updated, 4 unchanged", output)
+        self.assertEqual(
+            Organization.objects.get(user__username="municipality1").website,
+            "https://new.example.com",
+        )
+        self.assertEqual(Department.objects.count(), 12)
+        self.assertIn("0 created, 0 updated, 6 unchanged", self._call(self._csv(self.rows)))
+
+    def test_batches_run_a_constant_number_of_queries(self):
+        """Test that a batch costs the same queries whatever the number of its rows."""
+        with CaptureQueriesContext(connection) as small:
+            bulk_apply_template(self.template, self.rows[:1])
+        with CaptureQueriesContext(connection) as large:
+            bulk_apply_template(self.template, self.rows[1:])
+
+        self.assertEqual(len(large), len(small))
+
+    def test_json_file_is_read(self):
+        """Test that a JSON list of objects is accepted like a CSV file."""
+        self._call(self._write(".json", json.dumps(self.rows)))
+
+        self.assertEqual(Organization.objects.count(), 5)
+
+    def test_invalid_rows_are_reported_before_writing(self):
+        """Test that every invalid row is reported and nothing is created."""
+        self.rows[1]["province"] = "Atlantis"
+        self.rows[3]["website"] = ""
+        self.rows[4]["username"] = self.rows[0]["username"]
+
+        with self.assertRaises(CommandError) as context:
+            self._call(self._csv(self.rows))
+
+        message = str(context.exception)
+        self.assertIn("Row 2: province", message)
+        self.assertIn("Row 4: website", message)
+        self.assertIn("Row 5: username 'municipality0' is repeated", message)
+        self.assertFalse(Organization.objects.exists())
+
+    def test_usernames_that_are_not_text_are_read_as_text(self):
+        """Test that JSON usernames holding numbers or booleans are validated as text."""
+        self.rows[1]["username"] = False
+        self.rows[2]["username"] = 2024
+
+        with self.assertRaises(CommandError) as context:
+            self._call(self._write(".json", json.dumps(self.rows)))
+
+        message = str(context.exception)
+        self.assertIn("Row 2: username is required", message)
+        self.assertNotIn("Row 3", message)
+        self.assertFalse(Organization.objects.exists())
+
+        self.rows[1]["username"] = "municipality1"
+        self._call(self._write(".json", json.dumps(self.rows)))
+        self.assertEqual(User.objects.get(username="2024").organization.name, "Municipality 2")
+
+    def test_users_of_other_organizations_are_reported(self):
+        """Test that a row naming the user of an organization not from the template fails."""
+        other = create_organization()
+        unlinked = User.objects.create_user(username="unlinked")
+        self.rows[1]["username"] = other.user.username
+        self.rows[2]["username"] = unlinked.username
+
+        with self.assertRaises(CommandError) as context:
+            self._call(self._csv(self.rows))
+
+        message = str(context.exception)
+        self.assertIn(
+            f"Row 2: username '{other.user.username}' belongs to the organization", message
+        )
+        self.assertNotIn("Row 3", message)
+        other.refresh_from_db()
+        self.assertNotEqual(other.name, self.rows[1]["name"])
+        self.assertEqual(Organization.objects.count(), 1)
+
+        self.rows[1]["username"] = "municipality1"
+        self._call(self._csv(self.rows))
+        self.assertEqual(User.objects.get(username="unlinked").organization.name, "Municipality 2")
+
+    def test_update_keeps_the_columns_missing_from_the_file(self):
+        """Test that rerunning with fewer columns only overwrites the columns given."""
+        self._call(self._write(".json", json.dumps(self.rows)))
+        rows = [
+            {"username": row["username"], "tag_line": f"Serving {row['name']}"}
+            for row in self.rows
+        ]
+
+        output = self._call(self._write(".json", json.dumps(rows)))
+
+        self.assertIn("0 created, 5 updated, 0 unchanged", output)
+        organization = Organization.objects.get(user__username="municipality2")
+        self.assertEqual(organization.tag_line, "Serving Municipality 2")
+        self.assertEqual(organization.website, "https://municipality2.example.com")
+        self.assertEqual(organization.name, "Municipality 2")
+
+    def test_admin_action_applies_the_uploaded_file(self):
+        """Test that the admin action asks for a file and then creates the organizations."""
+        # Render the admin without the collected static files manifest.
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }
+        self.enterContext(override_settings(STORAGES=storages))
+
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="unused-password")
+        )
+        url = reverse("admin:organization_organizationtemplate_changelist")
+        data = {"action": "apply_to_organizations", helpers.ACTION_CHECKBOX_NAME: self.template.pk}
+
+        response = self.client.post(url, data)
+        self.assertContains(response, 'name="apply"')
+
+        with open(self._csv(self.rows), "rb") as file:
+            upload = SimpleUploadedFile("organizations.csv", file.read())
+        response = self.client.post(url, {**data, "apply": "1", "file": upload}, follow=True)
+
+        self.assertContains(response, "5 organization(s) created")
+        self.assertEqual(Organization.objects.count(), 5)
+
+
+class TemplateSyncTests(TestCase):
+    """Test cases for synchronizing organizations with the template they were created from."""
+
+    def setUp(self):
+        """Set up two organizations created from a template with two departments."""
+        self.template = OrganizationTemplate.objects.create(
+            name="Municipality", description=fake.text(max_nb_chars=50)
+        )
+        self.department_templates = {}
+        self.designation_templates = {}
+        for name, titles in (("Ward Office", ["Secretary", "Clerk"]), ("Health", ["Doctor"])):
+            department_template = DepartmentTemplate.objects.create(
+                organization_template=self.template, name=name, description=name
+            )
+            self.department_templates[name] = department_template
+            for priority, title in enumerate(titles):
+                self.designation_templates[title] = DesignationTemplate.objects.create(
+                    organization_template=self.template,
+                    department_template=department_template,
+                    title=title,
+                    description=title,
+                    priority=priority,
+                )
+        self.organizations = [
+            create_organization(name=f"Municipality {index}", template=self.template)
+            for index in range(2)
+        ]
+        instantiate_template(self.template, self.organizations)
+
+    def _sync(self, *args):
+        stdout = io.StringIO()
+        call_command("sync_organization_template", self.template.pk, *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_unchanged_template_is_up_to_date(self):
+        """Test that organizations matching their template need no change."""
+        self.assertEqual(TemplateSync(self.template).report, [])
+        self.assertIn("2 organization(s) are up to date", self._sync())
+
+    def test_template_changes_are_applied_to_every_organization(self):
+        """Test that added, changed, moved and removed rows reach the organizations."""
+        organization = self.organizations[0]
+        doctor = Designation.objects.get(organization=organization, title="Doctor")
+        clerk = Designation.objects.get(organization=organization, title="Clerk")
+        doctor_employee = Employee.objects.create(
+            designation=doctor, name="Doctor", description="Doctor", contact_no="9800000000"
+        )
+        clerk_employee = Employee.objects.create(
+            designation=clerk, name="Clerk", description="Clerk", contact_no="9800000000"
+        )
+        hand_made = Department.objects.create(
+            organization=organization,
+            name="Hand made",
+            description="Not from the template",
+            contact_no="01-5550000",
+            email="hand@example.com",
+        )
+
+        finance = DepartmentTemplate.objects.create(
+            organization_template=self.template, name="Finance", description="Finance"
+        )
+        DesignationTemplate.objects.create(
+            organization_template=self.template,
+            department_template=finance,
+            title="Accountant",
+            description="Accountant",
+            priority=0,
+        )
+        self.designation_templates["Secretary"].priority = 5
+        self.designation_templates["Secretary"].save()
+        self.designation_templates["Clerk"].department_template = finance
+        self.designation_templates["Clerk"].save()
+        self.department_templates["Health"].delete()
+
+        output = self._sync("--dry-run")
+
+        self.assertIn("Municipality 0:\n  ~ designation 'Secretary': priority", output)
+        self.assertIn("+ department 'Finance'", output)
+        self.assertIn("~ designation 'Secretary': priority", output)
+        self.assertIn("~ designation 'Clerk': department", output)
+        self.assertIn("- department 'Health'", output)
+        self.assertIn("! designation 'Doctor' kept for its employees", output)
+        self.assertIn("Municipality 1:", output)
+        self.assertIn("Dry run, nothing was written", output)
+        self.assertFalse(Department.objects.filter(name="Finance").exists())
+
+        output = self._sync()
+
+        self.assertIn("Synchronized 2 organization(s): 2 departments created", output)
+        for each in self.organizations:
+            finance_department = Department.objects.get(organization=each, name="Finance")
+            self.assertEqual(
+                set(finance_department.designation_set.values_list("title", flat=True)),
+                {"Accountant", "Clerk"},
+            )
+            self.assertFalse(Department.objects.get(organization=each, name="Health").is_active)
+            self.assertEqual(
+                Designation.objects.get(organization=each, title="Secretary").priority, 5
+            )
+        self.assertTrue(Designation.objects.filter(pk=doctor.pk).exists())
+        self.assertFalse(
+            Designation.objects.filter(organization=self.organizations[1], title="Doctor").exists()
+        )
+        clerk_employee.refresh_from_db()
+        self.assertEqual(clerk_employee.department.name, "Finance")
+        doctor_employee.refresh_from_db()
+        self.assertEqual(doctor_employee.department.name, "Health")
+        hand_made.refresh_from_db()
+        self.assertTrue(hand_made.is_active)
+        self.assertIn("Municipality 0:\n  ! designation 'Doctor'", self._sync())
+
+    def test_planning_runs_a_constant_number_of_queries(self):
+        """Test that the changes are planned with the same queries for any organization count."""
+        DepartmentTemplate.objects.create(
+            organization_template=self.template, name="Finance", description="Finance"
+        )
+        with self.assertNumQueries(5):
+            TemplateSync(self.template)
+
+        more = create_organization(name="Municipality 2", template=self.template)
+        instantiate_template(self.template, [more])
+        with self.assertNumQueries(5):
+            sync = TemplateSync(self.template)
+
+        self.assertEqual(sync.counts["departments created"], 2)
@@ -1,6 +1,14 @@
 """This module contains the types for the organization app."""
 
+from typing import Optional
+
 import strawberry
+import strawberry.django
+import strawberry_django
+
+from media.types import ImageFormat, ImageSize
+from media.variants import variant_url
+from root.loaders import LoaderField
 
 from .models import Department, Designation, Organization, User
 
@@ -26,7 +34,7 @@ class OrganizationType:
     """
 
     id: int
-    user: UserType
+    user: UserType = strawberry_django.field(field_cls=LoaderField)
     name: str
     tag_line: str
     description: str
@@ -36,9 +44,22 @@ class OrganizationType:
     ward_no: str
     contact_no: str
     website: str
-    logo: str
     is_active: bool
 
+    @strawberry_django.field(only=["logo"])
+    def logo(
+        self, size: Optional[ImageSize] = None, format: ImageFormat = ImageFormat.WEBP
+    ) -> str:
+        """
+        Returns the logo URL, or the URL of its resized variant when a size is given.
+        If the organization does not have a logo, returns an empty string.
+        """
+        if not self.logo:
+            return ""
+        if size is None:
+            return self.logo.url
+        return variant_url(self.logo, size.value, format.value) or ""
+
 
 @strawberry.django.type(Department)
 class DepartmentType:
@@ -52,7 +73,7 @@ class DepartmentType:
     contact_no: str
     email: str
     is_active: bool
-    organization: OrganizationType
+    organization: OrganizationType = strawberry_django.field(field_cls=LoaderField)
 
 
 @strawberry.django.type(Designation)
@@ -66,5 +87,5 @@ class DesignationType:
     description: str
     priority: int
     allow_multiple_employees: bool
-    organization: OrganizationType
-    department: DepartmentType
+    organization: OrganizationType = strawberry_django.field(field_cls=LoaderField)
+    department: DepartmentType = strawberry_django.field(field_cls=LoaderField)
@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "root.settings")
+os.environ.setdefault("GRAPHQL_ASYNC", "True")
 
 application = get_asgi_application()
@@ -0,0 +1,59 @@
+"""This module contains the helpers shared by the ``benchmark_*`` management commands."""
+
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+
+
+@contextmanager
+def benchmark_database(keepdb=False, name=None):
+    """
+    Run the block against a throwaway test database so benchmarks never touch real data.
+    Pass ``name`` to create it in that file, e.g. to share it with server processes.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    # Point the aliases mirroring the default database, like the read replica, at the
+    # test database too, as the test runner does.
+    mirrors = {
+        alias: connections[alias].settings_dict
+        for alias in connections
+        if connections[alias].settings_dict["TEST"].get("MIRROR") == DEFAULT_DB_ALIAS
+    }
+    for alias in mirrors:
+        connections[alias].close()
+        connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        for alias, settings_dict in mirrors.items():
+            connections[alias].close()
+            connections[alias].settings_dict = settings_dict
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def measure(func, repeat=20):
+    """
+    Call ``func`` ``repeat`` times and return the query count of one call together with
+    the median and p99 wall time in milliseconds.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    query_count = len(queries)
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return {
+        "queries": query_count,
+        "median_ms": statistics.median(durations),
+        "p99_ms": durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+    }
@@ -0,0 +1,136 @@
+"""This module contains the LRU cache of parsed and validated GraphQL documents."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from graphql import GraphQLError, parse
+from graphql.language import print_ast
+from strawberry.extensions import SchemaExtension
+
+
+class CachedDocument:
+    """A parsed document together with its normalized text and validation results."""
+
+    __slots__ = ("document", "_normalized", "validation_errors")
+
+    def __init__(self, document):
+        self.document = document
+        self._normalized = None
+        self.validation_errors = {}
+
+    @property
+    def normalized(self):
+        """The document printed back without comments and insignificant whitespace."""
+        if self._normalized is None:
+            self._normalized = print_ast(self.document)
+        return self._normalized
+
+
+class DocumentCache:
+    """
+    Keeps the ``max_size`` most recently used documents, keyed by the SHA-256 hash of
+    their text, and counts hits and misses.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query):
+        """
+        Return the cached document of the query text, parsing it on a miss. Syntax errors
+        are raised as ``GraphQLError`` and never cached.
+        """
+        key = hashlib.sha256(query.encode()).hexdigest()
+        with self._lock:
+            cached = self._documents.get(key)
+            if cached is not None:
+                self._documents.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        cached = CachedDocument(parse(query))
+        with self._lock:
+            self._documents[key] = cached
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+        return cached
+
+    def peek(self, query):
+        """Return the cached document of the query text without counting a lookup."""
+        with self._lock:
+            return self._documents.get(hashlib.sha256(query.encode()).hexdigest())
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def stats(self):
+        """Return the size and the hit and miss counters of this process."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._documents),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_document_cache = None
+
+
+def get_document_cache():
+    """Return the document cache sized by ``GRAPHQL_DOCUMENT_CACHE_SIZE``."""
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+    return _document_cache
+
+
+@receiver(setting_changed)
+def reset_document_cache(setting, **kwargs):
+    global _document_cache
+    if setting == "GRAPHQL_DOCUMENT_CACHE_SIZE":
+        _document_cache = None
+
+
+class DocumentCacheExtension(SchemaExtension):
+    """
+    Serves the parsing and validation steps of every operation from the document cache,
+    so a document sent again is neither parsed nor validated a second time.
+    """
+
+    def on_parse(self):
+        execution_context = self.execution_context
+        if execution_context.graphql_document is None:
+            try:
+                cached = get_document_cache().get(execution_context.query)
+            except GraphQLError:
+                # Let the regular parsing step report the syntax error.
+                cached = None
+            if cached is not None:
+                execution_context.graphql_document = cached.document
+        yield
+
+    def on_validate(self):
+        execution_context = self.execution_context
+        cached = get_document_cache().peek(execution_context.query)
+        if cached is None or cached.document is not execution_context.graphql_document:
+            yield
+            return
+
+        rules = execution_context.validation_rules
+        errors = cached.validation_errors.get(rules)
+        if errors is not None:
+            execution_context.pre_execution_errors = errors
+        yield
+        cached.validation_errors.setdefault(rules, execution_context.pre_execution_errors)
@@ -0,0 +1,252 @@
+"""This module contains the per-request DataLoader layer for the GraphQL schema."""
+
+import contextvars
+import inspect
+from collections import defaultdict
+
+from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor,
+    ReverseManyToOneDescriptor,
+)
+from strawberry.extensions import SchemaExtension
+from strawberry_django.fields.field import StrawberryDjangoField
+from strawberry_django.optimizer import mark_optimized_by_prefetching
+from strawberry_django.queryset import run_type_get_queryset
+from strawberry_django.resolvers import django_resolver
+
+_current_registry = contextvars.ContextVar("loader_registry", default=None)
+
+
+class DataLoader:
+    """
+    Synchronous DataLoader that resolves every queued key with a single batch call.
+
+    Keys are queued with ``enqueue`` as soon as they are known (e.g. the foreign keys of
+    every row in a list) and are fetched together the first time any of them is loaded.
+    """
+
+    def __init__(self, batch_load_fn):
+        self.batch_load_fn = batch_load_fn
+        self._cache = {}
+        self._queue = set()
+
+    def enqueue(self, keys):
+        """Queue keys for the next batch without hitting the database."""
+        self._queue.update(key for key in keys if key is not None and key not in self._cache)
+
+    def prime(self, key, value):
+        """Store an already loaded value so it is never fetched again."""
+        self._cache.setdefault(key, value)
+        self._queue.discard(key)
+
+    def load(self, key):
+        """Return the value for the key, dispatching the pending batch if required."""
+        if key is None:
+            return None
+        if key not in self._cache:
+            self.dispatch([key])
+        return self._cache.get(key)
+
+    def load_many(self, keys):
+        """Return the values for the keys, dispatching the pending batch if required."""
+        missing = [key for key in keys if key is not None and key not in self._cache]
+        if missing:
+            self.dispatch(missing)
+        return [self._cache.get(key) for key in keys]
+
+    def dispatch(self, keys=()):
+        """Fetch the requested keys together with every queued key."""
+        batch = (self._queue | set(keys)) - self._cache.keys()
+        self._queue = set()
+        if not batch:
+            return
+        results = self.batch_load_fn(list(batch))
+        for key in batch:
+            self._cache[key] = results.get(key)
+
+
+class LoaderRegistry:
+    """
+    Holds the DataLoaders of a single GraphQL operation.
+
+    Every model instance handed to the registry queues its forward relations, so the
+    first relation resolved on a list of rows loads that relation for all of them with
+    one ``id__in`` query. To-many relations are prefetched the same way, for every
+    instance of the model seen so far.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._instances = defaultdict(list)
+
+    def model_loader(self, model, field_name="pk"):
+        """Return the loader fetching ``model`` rows by ``field_name``."""
+        key = (model, field_name)
+        if key not in self._loaders:
+            self._loaders[key] = DataLoader(self._model_batch_fn(model, field_name))
+        return self._loaders[key]
+
+    def _model_batch_fn(self, model, field_name):
+        def batch_load_fn(keys):
+            results = model._default_manager.in_bulk(keys, field_name=field_name)
+            self.observe(results.values())
+            return results
+
+        return batch_load_fn
+
+    def observe(self, instances):
+        """
+        Prime the loaders with the instances and queue their forward relations.
+
+        Relations already joined with ``select_related`` are walked as well, so rows
+        reached through them are batched like any other level.
+        """
+        pending = list(instances)
+        seen = set()
+        while pending:
+            instance = pending.pop()
+            if not isinstance(instance, models.Model) or id(instance) in seen:
+                continue
+            seen.add(id(instance))
+            self._instances[type(instance)].append(instance)
+            if not instance.get_deferred_fields():
+                self.model_loader(type(instance)).prime(instance.pk, instance)
+            for field in _forward_relations(type(instance)):
+                if field.is_cached(instance):
+                    pending.append(field.get_cached_value(instance))
+                    continue
+                key = instance.__dict__.get(field.attname)
+                if key is not None:
+                    self._relation_loader(field).enqueue([key])
+
+    def _relation_loader(self, field):
+        target = field.target_field
+        field_name = "pk" if target.primary_key else target.name
+        return self.model_loader(field.related_model, field_name)
+
+    def load_related(self, instance, name):
+        """Return the forward relation ``name`` of the instance through its loader."""
+        field = instance._meta.get_field(name)
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+        value = self._relation_loader(field).load(getattr(instance, field.attname))
+        field.set_cached_value(instance, value)
+        return value
+
+    def prefetch_related(self, instance, name, queryset=None):
+        """
+        Prefetch the to-many relation ``name`` for the instance and every sibling of the
+        same model that has not been prefetched yet, using one query per relation.
+
+        ``queryset`` restricts the related rows, e.g. to the active ones.
+        """
+        siblings = [
+            sibling
+            for sibling in self._instances[type(instance)]
+            if not _is_prefetched(sibling, name)
+        ]
+        if instance not in siblings:
+            siblings.append(instance)
+        prefetch_related_objects(siblings, Prefetch(name, queryset=queryset))
+        for sibling in siblings:
+            mark_optimized_by_prefetching(sibling._prefetched_objects_cache[name])
+            self.observe(sibling._prefetched_objects_cache[name])
+
+    def load_path(self, instance, path):
+        """Follow a ``__`` separated chain of forward relations through the loaders."""
+        for name in path.split("__"):
+            if instance is None:
+                return None
+            instance = self.load_related(instance, name)
+        return instance
+
+
+def _forward_relations(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.is_relation and (field.many_to_one or field.one_to_one)
+    ]
+
+
+def _is_prefetched(instance, name):
+    return name in getattr(instance, "_prefetched_objects_cache", {})
+
+
+def get_loaders():
+    """
+    Return the loader registry of the running GraphQL operation.
+
+    Outside of an operation a throwaway registry is returned, so resolvers stay correct
+    even though nothing is batched.
+    """
+    registry = _current_registry.get()
+    if registry is None:
+        return LoaderRegistry()
+    return registry
+
+
+class DataLoaderExtension(SchemaExtension):
+    """
+    Scopes a fresh loader registry to every operation and feeds it the model instances
+    returned by each resolver.
+    """
+
+    def on_operation(self):
+        token = _current_registry.set(LoaderRegistry())
+        try:
+            yield
+        finally:
+            _current_registry.reset(token)
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        result = _next(root, info, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return self._observe_async(result)
+        if isinstance(result, models.QuerySet):
+            result = list(result)
+        if isinstance(result, list):
+            get_loaders().observe(result)
+        return result
+
+    async def _observe_async(self, result):
+        # Under async execution querysets are already evaluated in a worker thread.
+        result = await result
+        if isinstance(result, list):
+            get_loaders().observe(result)
+        return result
+
+
+class LoaderField(StrawberryDjangoField):
+    """
+    Django field that resolves uncached relations through the operation's loaders instead
+    of issuing one query per row.
+
+    Loads run inline under sync execution and in a worker thread under async execution.
+    """
+
+    def get_result(self, source, info, args, kwargs):
+        if source is not None and self.base_resolver is None:
+            name = self.django_name or self.python_name
+            attr = getattr(source.__class__, name, None)
+            if isinstance(attr, ForwardManyToOneDescriptor):
+                if attr.field.is_cached(source):
+                    return attr.field.get_cached_value(source)
+                return django_resolver(get_loaders().load_related, qs_hook=None)(
+                    source, attr.field.name
+                )
+            if isinstance(attr, ReverseManyToOneDescriptor) and not _is_prefetched(source, name):
+                return django_resolver(self._prefetch_result, qs_hook=None)(
+                    source, info, args, kwargs
+                )
+        return super().get_result(source, info, args, kwargs)
+
+    def _prefetch_result(self, source, info, args, kwargs):
+        # The related type's get_queryset applies to the batch, as it would to a single row.
+        queryset = run_type_get_queryset(
+            self.django_model._default_manager.all(), self.django_type, info
+        )
+        get_loaders().prefetch_related(source, self.django_name or self.python_name, queryset)
+        return super().get_result(source, info, args, kwargs)
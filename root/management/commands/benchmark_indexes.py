@@ -0,0 +1,202 @@
+"""Benchmark the hot filter paths with and without their composite and partial indexes."""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+
+from employee.models import Employee
+from organization.models import (
+    Department,
+    DepartmentTemplate,
+    Designation,
+    DesignationTemplate,
+    Organization,
+    OrganizationTemplate,
+)
+from root.benchmark import benchmark_database, measure
+from service.models import Service, ServiceDetail
+
+User = get_user_model()
+
+# Models whose hot path indexes are dropped for the baseline run, together with the plain
+# foreign key indexes they replace.
+INDEXED_MODELS = {
+    Department: [],
+    Designation: ["department"],
+    Employee: ["designation"],
+    ServiceDetail: [],
+    DepartmentTemplate: [],
+    DesignationTemplate: [],
+}
+
+
+class Command(BaseCommand):
+    help = "Time the hot lookups of a large tree with and without the hot path indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=100_000)
+        parser.add_argument("--organizations", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write(f"Seeding {options['employees']} employees...")
+            ids = self._seed(options["employees"], options["organizations"])
+            lookups = {
+                "active departments": lambda: Department.objects.filter(
+                    organization_id=ids["organization"], is_active=True
+                ).order_by("pk"),
+                "designations by priority": lambda: Designation.objects.filter(
+                    department_id=ids["department"]
+                ).order_by("priority"),
+                "available employees": lambda: Employee.objects.filter(
+                    designation_id=ids["designation"], is_available=True
+                ),
+                "active service details": lambda: ServiceDetail.objects.filter(
+                    organization_id=ids["organization"], is_active=True
+                ),
+                "active templates": lambda: DepartmentTemplate.objects.filter(
+                    organization_template_id=ids["template"], is_active=True
+                ),
+            }
+
+            results = {}
+            for run in ("indexed", "baseline"):
+                if run == "baseline":
+                    self._drop_indexes()
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+                for name, lookup in lookups.items():
+                    result = measure(lambda lookup=lookup: list(lookup()), options["repeat"])
+                    result["plan"] = _plan(lookup())
+                    results.setdefault(name, {})[run] = result
+
+            for name, runs in results.items():
+                indexed, baseline = runs["indexed"], runs["baseline"]
+                self.stdout.write(
+                    f"{name:>24}: median {indexed['median_ms']:.3f} ms indexed, "
+                    f"{baseline['median_ms']:.3f} ms baseline; "
+                    f"p99 {indexed['p99_ms']:.3f} ms indexed, "
+                    f"{baseline['p99_ms']:.3f} ms baseline"
+                )
+                for run in ("indexed", "baseline"):
+                    self.stdout.write(f"{'':>26}{run} plan: {runs[run]['plan']}")
+
+    def _drop_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model, foreign_keys in INDEXED_MODELS.items():
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+                for name in foreign_keys:
+                    schema_editor.add_index(
+                        model,
+                        models.Index(fields=[name], name=f"baseline_{model._meta.model_name}_fk"),
+                    )
+
+    def _seed(self, employee_count, organization_count):
+        organizations = Organization.objects.bulk_create(
+            Organization(
+                user=User.objects.create_user(username=f"benchmark{index}"),
+                name=f"Organization {index}",
+                description="Benchmark organization",
+                province="Bagmati",
+                district="Kathmandu",
+                municipality="Kathmandu",
+                ward_no="1",
+                contact_no="01-0000000",
+                website="https://example.com",
+            )
+            for index in range(organization_count)
+        )
+        departments = Department.objects.bulk_create(
+            Department(
+                organization=organization,
+                name=f"Department {index}",
+                description="Benchmark department",
+                contact_no="01-0000000",
+                email=f"department{index}@example.com",
+                is_active=index % 4 != 0,
+            )
+            for organization in organizations
+            for index in range(20)
+        )
+        designations = Designation.objects.bulk_create(
+            Designation(
+                organization_id=department.organization_id,
+                department=department,
+                title=f"Designation {index}",
+                description="Benchmark designation",
+                priority=(index * 7) % 10,
+                allow_multiple_employees=True,
+            )
+            for department in departments
+            for index in range(10)
+        )
+        per_designation = max(1, employee_count // len(designations))
+        Employee.objects.bulk_create(
+            (
+                Employee(
+                    designation=designation,
+                    organization_id=designation.organization_id,
+                    department_id=designation.department_id,
+                    name=f"Employee {index}",
+                    description="Benchmark employee",
+                    contact_no="9800000000",
+                    is_available=index % 3 != 0,
+                )
+                for designation in designations
+                for index in range(per_designation)
+            ),
+            batch_size=5000,
+        )
+        services = Service.objects.bulk_create(
+            Service(name=f"Service {index}") for index in range(40)
+        )
+        ServiceDetail.objects.bulk_create(
+            ServiceDetail(
+                organization=organization,
+                service=service,
+                required_documents="Citizenship",
+                process_flow="Apply",
+                timeline="1 day",
+                is_active=index % 2 == 0,
+            )
+            for organization in organizations
+            for index, service in enumerate(services)
+        )
+        templates = OrganizationTemplate.objects.bulk_create(
+            OrganizationTemplate(name=f"Template {index}", description="Benchmark template")
+            for index in range(20)
+        )
+        department_templates = DepartmentTemplate.objects.bulk_create(
+            DepartmentTemplate(
+                organization_template=template,
+                name=f"Department {index}",
+                description="Benchmark department",
+                is_active=index % 4 != 0,
+            )
+            for template in templates
+            for index in range(50)
+        )
+        DesignationTemplate.objects.bulk_create(
+            DesignationTemplate(
+                organization_template_id=department_template.organization_template_id,
+                department_template=department_template,
+                title=f"Designation {index}",
+                description="Benchmark designation",
+                priority=index,
+            )
+            for department_template in department_templates
+            for index in range(5)
+        )
+        return {
+            "organization": organizations[0].pk,
+            "department": departments[1].pk,
+            "designation": designations[0].pk,
+            "template": templates[0].pk,
+        }
+
+
+def _plan(queryset):
+    """Return the EXPLAIN QUERY PLAN steps of the queryset on a single line."""
+    return "; ".join(line.split(" ", 3)[-1] for line in queryset.explain().splitlines())
@@ -0,0 +1,179 @@
+"""Benchmark the GraphQL endpoint served by sync WSGI workers against uvicorn ASGI workers."""
+
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.middleware.csrf import CSRF_SECRET_LENGTH
+from django.utils.crypto import get_random_string
+
+from charter.management.commands.benchmark_charter import CHARTER_QUERY
+from charter.management.commands.benchmark_charter import Command as CharterBenchmark
+from root.benchmark import benchmark_database
+
+ORGANIZATIONS_QUERY = """
+query {
+    organizations(first: 20) {
+        edges { node { name user { username } } }
+    }
+}
+"""
+
+
+class Command(BaseCommand):
+    help = "Compare requests/sec and p99 latency of the WSGI and ASGI server profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=0,
+            help="Idle keep-alive connections held open during the run, like slow mobile "
+            "clients occupying a worker.",
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            database = str(Path(directory) / "benchmark.sqlite3")
+            with benchmark_database(name=database):
+                organization = CharterBenchmark()._seed(10, 8)
+                connection.close()
+                bodies = [
+                    json.dumps({"query": CHARTER_QUERY, "variables": {"id": organization.id}}),
+                    json.dumps({"query": ORGANIZATIONS_QUERY}),
+                ]
+                for mode in ("wsgi", "asgi"):
+                    with self._server(mode, database, options["workers"]) as port:
+                        result = self._run(port, bodies, options)
+                    self.stdout.write(
+                        f"{mode:>5}: {result['rps']:.0f} requests/sec, "
+                        f"median {result['median_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+                        f"{result['errors']} errors"
+                    )
+
+    @contextmanager
+    def _server(self, mode, database, workers):
+        port = _free_port()
+        env = {
+            **os.environ,
+            "SERVER_MODE": mode,
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "GUNICORN_WORKERS": str(workers),
+            # A recycled worker drops its keep-alive connections in the middle of the run.
+            "GUNICORN_MAX_REQUESTS": "0",
+            "DATABASE_PATH": database,
+            "DEBUG": "False",
+            "GRAPHQL_RESPONSE_CACHE_BACKEND": "",
+        }
+        env.pop("GRAPHQL_ASYNC", None)
+        env.pop("DATABASE_REPLICA_PATH", None)
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "docker/gunicorn.conf.py"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self._wait_until_ready(port, process)
+            yield port
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def _wait_until_ready(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError("The server exited before accepting requests.")
+            try:
+                client = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                client.request("GET", "/health/")
+                # Any answer will do: the static files check fails without collectstatic.
+                client.getresponse()
+                return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f"The server did not start within {timeout} seconds.")
+
+    def _run(self, port, bodies, options):
+        stop = threading.Event()
+        for _ in range(options["slow_clients"]):
+            threading.Thread(target=_hold_connection, args=(port, stop), daemon=True).start()
+
+        concurrency = options["concurrency"]
+        per_client = max(1, options["requests"] // concurrency)
+        # The endpoint is CSRF protected, so send a token the way a browser client does.
+        token = get_random_string(CSRF_SECRET_LENGTH)
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": f"{settings.CSRF_COOKIE_NAME}={token}",
+            "X-CSRFToken": token,
+        }
+
+        def client(index):
+            durations, errors = [], 0
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            for request in range(per_client):
+                started = time.perf_counter()
+                try:
+                    conn.request("POST", "/", bodies[(index + request) % len(bodies)], headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                    # GraphQL errors, validation ones included, are answered with a 200.
+                    if response.status != 200 or "errors" in json.loads(body):
+                        errors += 1
+                except (OSError, ValueError):
+                    errors += 1
+                    conn.close()
+                    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                durations.append((time.perf_counter() - started) * 1000)
+            conn.close()
+            return durations, errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(executor.map(client, range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+
+        durations = sorted(duration for result in results for duration in result[0])
+        return {
+            "rps": len(durations) / elapsed,
+            "median_ms": durations[len(durations) // 2],
+            "p99_ms": durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+            "errors": sum(result[1] for result in results),
+        }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _hold_connection(port, stop):
+    """Open a connection and send a request line by line, slower than any worker timeout."""
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=30) as sock:
+            sock.sendall(b"GET /health/ HTTP/1.1\r\n")
+            while not stop.wait(1):
+                sock.sendall(b"X-Slow: 1\r\n")
+    except OSError:
+        pass
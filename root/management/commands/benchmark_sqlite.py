@@ -0,0 +1,129 @@
+"""Benchmark concurrent reads against writers with default and tuned SQLite connections."""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+
+from charter.management.commands.benchmark_charter import Command as CharterBenchmark
+from charter.snapshots import get_charter_json
+from employee.models import Employee
+from root.benchmark import benchmark_database
+
+# Connection settings of the baseline run: SQLite defaults, one connection per request.
+BASELINE = {"CONN_MAX_AGE": 0, "OPTIONS": {"init_command": "PRAGMA journal_mode=DELETE"}}
+
+
+class Command(BaseCommand):
+    help = "Compare read throughput under concurrent writes with and without the SQLite tuning."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=5)
+
+    def handle(self, *args, **options):
+        # Threads open their connections from this dict, so updating it switches the setup.
+        database = connections.settings["default"]
+        tuned = {"CONN_MAX_AGE": database["CONN_MAX_AGE"], "OPTIONS": dict(database["OPTIONS"])}
+
+        with tempfile.TemporaryDirectory() as directory:
+            name = str(Path(directory) / "benchmark.sqlite3")
+            with benchmark_database(name=name):
+                organization = CharterBenchmark()._seed(10, 8)
+                for label, config in (("default", BASELINE), ("tuned", tuned)):
+                    connection.close()
+                    database.update(config)
+                    workload = Workload(organization.id)
+                    workload.run(options["readers"], options["writers"], options["seconds"])
+                    self.stdout.write(
+                        f"{label:>8}: {workload.reads_per_second:.0f} reads/sec, "
+                        f"read p99 {workload.p99_ms:.1f} ms, {workload.writes} writes, "
+                        f"{workload.locked} 'database is locked' errors"
+                    )
+                database.update(tuned)
+
+
+class Workload:
+    """Readers fetching an organization's charter while writers rename its employees."""
+
+    def __init__(self, organization_id):
+        self.organization_id = organization_id
+        self.employee_ids = list(
+            Employee.objects.filter(organization_id=organization_id).values_list("pk", flat=True)
+        )
+        connection.close()
+        self.durations = []
+        self.writes = 0
+        self.locked = 0
+        self.seconds = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def reads_per_second(self):
+        return len(self.durations) / self.seconds
+
+    @property
+    def p99_ms(self):
+        durations = sorted(self.durations)
+        return durations[min(len(durations) - 1, int(len(durations) * 0.99))] if durations else 0
+
+    def run(self, readers, writers, seconds):
+        self.seconds = seconds
+        threads = [threading.Thread(target=self._reader) for _ in range(readers)]
+        threads += [threading.Thread(target=self._writer, args=(i,)) for i in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+
+    def _request(self, func, *args):
+        """Run ``func`` like a request handler would, returning whether it succeeded."""
+        # Mirror the connection handling of Django's request_started/request_finished.
+        connection.close_if_unusable_or_obsolete()
+        try:
+            func(*args)
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+            with self._lock:
+                self.locked += 1
+            return False
+        finally:
+            connection.close_if_unusable_or_obsolete()
+        return True
+
+    def _read(self):
+        Employee.objects.filter(organization_id=self.organization_id).count()
+        get_charter_json(self.organization_id)
+
+    def _write(self, pk):
+        with transaction.atomic():
+            employee = Employee.objects.get(pk=pk)
+            Employee.objects.filter(pk=pk).update(name=f"{employee.name[:150]}.")
+
+    def _reader(self):
+        durations = []
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            if self._request(self._read):
+                durations.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with self._lock:
+            self.durations.extend(durations)
+
+    def _writer(self, offset):
+        index = offset
+        while not self._stop.is_set():
+            if self._request(self._write, self.employee_ids[index % len(self.employee_ids)]):
+                with self._lock:
+                    self.writes += 1
+            index += 1
+            time.sleep(0.001)
+        connection.close()
@@ -0,0 +1,132 @@
+"""This module contains the keyset (cursor) pagination used by the GraphQL connections."""
+
+from typing import Optional
+
+import strawberry
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from strawberry import relay
+from strawberry.relay.types import NodeType
+from strawberry.relay.utils import from_base64, to_base64
+from strawberry.types import Info
+from strawberry.utils.inspect import in_async_context
+from strawberry_django.optimizer import optimize
+
+from .loaders import get_loaders
+
+CURSOR_PREFIX = "keyset"
+
+
+def encode_cursor(pk):
+    """Encode a primary key into an opaque cursor."""
+    return to_base64(CURSOR_PREFIX, pk)
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by ``encode_cursor`` back into a primary key."""
+    try:
+        prefix, pk = from_base64(cursor)
+        pk = int(pk)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+    if prefix != CURSOR_PREFIX:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return pk
+
+
+def cap_list(queryset, info):
+    """
+    Return the rows of a list field in primary key order, failing instead of truncating when
+    there are more than ``GRAPHQL_MAX_LIST_SIZE`` of them.
+    """
+    if in_async_context():
+        return sync_to_async(_capped_rows)(queryset, info)
+    return _capped_rows(queryset, info)
+
+
+def _capped_rows(queryset, info):
+    limit = settings.GRAPHQL_MAX_LIST_SIZE
+    rows = list(optimize(queryset.order_by("pk"), info)[: limit + 1])
+    if len(rows) > limit:
+        raise ValueError(
+            f"The list has more than {limit} items; page through the connection instead."
+        )
+    return rows
+
+
+@strawberry.type(name="Connection", description="A keyset paginated connection.")
+class KeysetConnection(relay.Connection[NodeType]):
+    """
+    Relay connection paginated on the primary key instead of an offset, so every page is a
+    single indexed range scan no matter how deep the client has paged.
+    """
+
+    queryset: strawberry.Private[Optional[QuerySet]] = None
+
+    @strawberry.field(description="Total number of items, counted only when requested.")
+    def total_count(self) -> int:
+        if in_async_context():
+            return self.queryset.acount()
+        return self.queryset.count()
+
+    @classmethod
+    def resolve_connection(
+        cls,
+        nodes,
+        *,
+        info: Info,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        first: Optional[int] = None,
+        last: Optional[int] = None,
+        max_results: Optional[int] = None,
+        **kwargs,
+    ):
+        if in_async_context():
+            return sync_to_async(cls._resolve_page)(
+                nodes, info, before, after, first, last, max_results
+            )
+        return cls._resolve_page(nodes, info, before, after, first, last, max_results)
+
+    @classmethod
+    def _resolve_page(cls, nodes, info, before, after, first, last, max_results):
+        max_results = max_results or settings.GRAPHQL_MAX_PAGE_SIZE
+        if first is not None and last is not None:
+            raise ValueError("Passing both `first` and `last` is not supported.")
+        for name, value in (("first", first), ("last", last)):
+            if value is not None and not 0 <= value <= max_results:
+                raise ValueError(f"Argument `{name}` must be between 0 and {max_results}.")
+
+        queryset = nodes.order_by()
+        page = optimize(queryset, info)
+        if after is not None:
+            page = page.filter(pk__gt=decode_cursor(after))
+        if before is not None:
+            page = page.filter(pk__lt=decode_cursor(before))
+
+        if last is not None:
+            rows = list(page.order_by("-pk")[: last + 1])
+            has_more = len(rows) > last
+            rows = rows[:last][::-1]
+        else:
+            limit = max_results if first is None else first
+            rows = list(page.order_by("pk")[: limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+        get_loaders().observe(rows)
+        edges = [
+            relay.Edge(cursor=encode_cursor(row.pk), node=cls.resolve_node(row, info=info))
+            for row in rows
+        ]
+        return cls(
+            edges=edges,
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_more if last is not None else after is not None,
+                has_next_page=has_more if last is None else before is not None,
+            ),
+            queryset=queryset,
+        )
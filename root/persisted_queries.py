@@ -0,0 +1,76 @@
+"""This module contains the automatic persisted queries (APQ) store of the GraphQL endpoint."""
+
+import dataclasses
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import GraphQLError
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+
+
+class PersistedQueryNotFoundError(GraphQLError):
+    """Error returned for a hash the server has no document for."""
+
+    def __init__(self):
+        super().__init__(
+            PERSISTED_QUERY_NOT_FOUND, extensions={"code": "PERSISTED_QUERY_NOT_FOUND"}
+        )
+
+
+class InvalidPersistedQueryError(GraphQLError):
+    """Error returned, with a 400 status, for a malformed ``persistedQuery`` extension."""
+
+    def __init__(self, message):
+        super().__init__(message, extensions={"code": "INVALID_PERSISTED_QUERY"})
+
+
+def _cache():
+    # Must be shared by every worker, or a document registered with one worker is unknown to
+    # the others and their clients keep being asked to register it again.
+    return caches[settings.GRAPHQL_PERSISTED_QUERIES_CACHE]
+
+
+def _cache_key(sha256_hash):
+    return f"graphql:apq:{sha256_hash}"
+
+
+def persisted_query_hash(extensions):
+    """
+    Return the SHA-256 hash of the ``persistedQuery`` extension of a request, or ``None``
+    if the request does not use persisted queries.
+    """
+    persisted_query = (extensions or {}).get("persistedQuery")
+    if persisted_query is None:
+        return None
+    if not isinstance(persisted_query, dict) or persisted_query.get("version") != 1:
+        raise InvalidPersistedQueryError("Unsupported persisted query version.")
+    sha256_hash = persisted_query.get("sha256Hash")
+    if not isinstance(sha256_hash, str) or len(sha256_hash) != 64:
+        raise InvalidPersistedQueryError("Invalid persisted query hash.")
+    return sha256_hash.lower()
+
+
+def resolve_persisted_query(request_data):
+    """
+    Return the request data with its document resolved through the APQ protocol.
+
+    A request carrying both the document and its hash registers the document; a request
+    carrying only the hash gets the stored document, or ``PersistedQueryNotFoundError``
+    if the hash is unknown and the client has to register it.
+    """
+    sha256_hash = persisted_query_hash(request_data.extensions)
+    if sha256_hash is None:
+        return request_data
+
+    if request_data.query:
+        if hashlib.sha256(request_data.query.encode()).hexdigest() != sha256_hash:
+            raise InvalidPersistedQueryError("Provided sha does not match query.")
+        _cache().set(_cache_key(sha256_hash), request_data.query, None)
+        return request_data
+
+    query = _cache().get(_cache_key(sha256_hash))
+    if query is None:
+        raise PersistedQueryNotFoundError()
+    return dataclasses.replace(request_data, query=query)
@@ -0,0 +1,239 @@
+"""This module contains the static depth and cost analysis of GraphQL operations."""
+
+from django.conf import settings
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLNonNull,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    get_named_type,
+    is_composite_type,
+    value_from_ast_untyped,
+)
+from strawberry.extensions import SchemaExtension
+
+# Cost of a single resolution of a field, keyed by "Type.field". Fields returning objects
+# cost 1 (a row to load), scalars and connection wrappers cost nothing unless listed here.
+FIELD_WEIGHTS = {
+    "Query.charter": 2,
+    "OrganizationTypeConnection.totalCount": 1,
+    "DepartmentTypeConnection.totalCount": 1,
+    "DesignationTypeConnection.totalCount": 1,
+    "EmployeeTypeConnection.totalCount": 1,
+}
+
+# Expected number of items of list fields that are not paginated, keyed by "Type.field",
+# sized after the largest municipalities rather than the average one.
+LIST_SIZES = {
+    "Query.getDepartmentsByOrganization": 30,
+    "Query.getDesignationsByOrganization": 150,
+    "Query.getDesignationsByDepartment": 15,
+    "Query.getEmployeesByOrganization": 300,
+    "Query.getEmployeesByDepartment": 30,
+    "Query.getServicesByOrganization": 50,
+    "ServiceDetailType.responsibleEmployees": 5,
+    "ServiceDetailType.sampleDocuments": 3,
+}
+
+# List fields returning a single row when given their id argument. Without it they return
+# the whole table, which the other lists not sized above are assumed to do as well: at most
+# ``GRAPHQL_MAX_LIST_SIZE`` rows.
+LOOKUP_ARGUMENTS = {
+    "Query.getOrganizationsById": "organizationId",
+    "Query.getDepartmentsById": "departmentId",
+    "Query.getDesignationsById": "designationId",
+    "Query.getEmployeesById": "employeeId",
+    "Query.getServicesById": "serviceId",
+    "Query.getServiceDetailsById": "serviceDetailId",
+}
+
+# Arguments bounding the number of items of a list field.
+LIMIT_ARGUMENTS = ("first", "last", "limit")
+
+# Types served from precomputed data, whose fields cost nothing to resolve.
+PRECOMPUTED_TYPES = frozenset(
+    {
+        "CharterType",
+        "CharterOrganizationType",
+        "CharterDepartmentType",
+        "CharterDesignationType",
+        "CharterEmployeeType",
+        "CharterServiceType",
+        "CharterDocumentType",
+    }
+)
+
+
+class QueryCostAnalyzer:
+    """
+    Computes the depth and the cost of an operation without executing it.
+
+    A field costs its weight plus the cost of its selections, multiplied by the number of
+    items for list fields: their ``first``, ``last`` or ``limit`` argument when given, else
+    their expected size. The edges of a connection are multiplied by the ``first`` or
+    ``last`` argument of the connection field, or by the largest page without one.
+    """
+
+    def __init__(self, schema, document, variables=None):
+        self.schema = schema
+        self.variables = variables or {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+
+    def analyze(self, operation):
+        """Return the ``(cost, depth)`` of the operation."""
+        root_type = self.schema.get_root_type(operation.operation)
+        return self._selection_set(operation.selection_set, root_type, page_size=None)
+
+    def _fields(self, selection_set, parent_type, visited=frozenset()):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    self.schema.get_type(selection.type_condition.name.value)
+                    if selection.type_condition
+                    else parent_type
+                )
+                yield from self._fields(selection.selection_set, fragment_type, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                yield from self._fields(fragment.selection_set, fragment_type, visited | {name})
+
+    def _selection_set(self, selection_set, parent_type, page_size):
+        cost = depth = 0
+        for field, field_parent in self._fields(selection_set, parent_type):
+            field_cost, field_depth = self._field(field, field_parent, page_size)
+            cost += field_cost
+            depth = max(depth, field_depth)
+        return cost, depth
+
+    def _field(self, field, parent_type, page_size):
+        name = field.name.value
+        definition = getattr(parent_type, "fields", {}).get(name)
+        if definition is None:
+            return 0, 1
+
+        key = f"{parent_type.name}.{name}"
+        field_type = get_named_type(definition.type)
+        precomputed = parent_type.name in PRECOMPUTED_TYPES
+        # The edges and page info of a connection are wrappers around the rows.
+        wrapper = _is_connection(parent_type)
+        weight = FIELD_WEIGHTS.get(
+            key, 0 if precomputed or wrapper or not is_composite_type(field_type) else 1
+        )
+
+        multiplier = 1
+        if _is_list(definition.type) and not precomputed:
+            if name == "edges" and page_size is not None:
+                multiplier = page_size
+            else:
+                multiplier = self._list_size(field, key)
+
+        if field.selection_set is None:
+            return multiplier * weight, 1
+
+        child_page_size = self._page_size(field) if _is_connection(field_type) else None
+        child_cost, child_depth = self._selection_set(
+            field.selection_set, field_type, child_page_size
+        )
+        return multiplier * (weight + child_cost), child_depth + 1
+
+    def _list_size(self, field, key):
+        limit = self._argument(field, LIMIT_ARGUMENTS)
+        if isinstance(limit, int):
+            return max(0, min(limit, settings.GRAPHQL_MAX_LIST_SIZE))
+        if key in LOOKUP_ARGUMENTS and self._argument(field, [LOOKUP_ARGUMENTS[key]]):
+            return 1
+        return LIST_SIZES.get(key, settings.GRAPHQL_MAX_LIST_SIZE)
+
+    def _page_size(self, field):
+        value = self._argument(field, ("first", "last"))
+        if isinstance(value, int):
+            return max(0, min(value, settings.GRAPHQL_MAX_PAGE_SIZE))
+        return settings.GRAPHQL_MAX_PAGE_SIZE
+
+    def _argument(self, field, names):
+        for argument in field.arguments:
+            if argument.name.value in names:
+                return value_from_ast_untyped(argument.value, self.variables)
+        return None
+
+
+def _is_connection(graphql_type):
+    return "edges" in getattr(graphql_type, "fields", {})
+
+
+def _is_list(field_type):
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
+
+
+class QueryCostExtension(SchemaExtension):
+    """
+    Rejects operations deeper than ``GRAPHQL_MAX_QUERY_DEPTH`` or costlier than
+    ``GRAPHQL_MAX_QUERY_COST`` before they are executed, and reports the computed cost in
+    the ``cost`` entry of the response extensions.
+    """
+
+    def on_execute(self):
+        execution_context = self.execution_context
+        operation = _get_operation(
+            execution_context.graphql_document, execution_context.operation_name
+        )
+        if operation is not None:
+            cost, depth = QueryCostAnalyzer(
+                execution_context.schema._schema,
+                execution_context.graphql_document,
+                execution_context.variables,
+            ).analyze(operation)
+            max_cost = settings.GRAPHQL_MAX_QUERY_COST
+            max_depth = settings.GRAPHQL_MAX_QUERY_DEPTH
+            execution_context.extensions_results["cost"] = {
+                "requestedQueryCost": cost,
+                "maximumAvailable": max_cost,
+                "depth": depth,
+                "maximumDepth": max_depth,
+            }
+            if depth > max_depth:
+                raise GraphQLError(
+                    f"Query depth of {depth} exceeds the maximum depth of {max_depth}.",
+                    extensions={"code": "QUERY_TOO_DEEP"},
+                )
+            if cost > max_cost:
+                raise GraphQLError(
+                    f"Query cost of {cost} exceeds the maximum cost of {max_cost}. "
+                    "Request fewer items with `first`/`last` or select fewer nested fields.",
+                    extensions={"code": "QUERY_TOO_COSTLY"},
+                )
+        yield
+
+    def get_results(self):
+        cost = self.execution_context.extensions_results.get("cost")
+        return {"cost": cost} if cost is not None else {}
+
+
+def _get_operation(document, operation_name):
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+    ]
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+    for operation in operations:
+        if operation.name and operation.name.value == operation_name:
+            return operation
+    return None
@@ -0,0 +1,271 @@
+"""This module contains the tag-invalidated response cache of the GraphQL endpoint."""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from graphql import FieldNode, GraphQLError, IntValueNode, OperationType, VariableNode
+
+from .document_cache import get_document_cache
+
+# Tag of responses that are not scoped to a single organization (e.g. the organization
+# list); every write invalidates it.
+UNSCOPED_TAG = "*"
+
+
+class LRUBackend:
+    """
+    In-process backend that keeps the most recently used entries, evicting the least
+    recently used one once ``max_entries`` is reached.
+
+    Every worker process has its own copy, so only writes made in the same process
+    invalidate it; use ``DjangoCacheBackend`` with a shared cache for several workers.
+    """
+
+    def __init__(self, max_entries=1000, timeout=300):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, tags, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags):
+        expires_at = time.monotonic() + self.timeout if self.timeout else None
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, tags, expires_at)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._keys_by_tag.pop(tag, set()):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class DjangoCacheBackend:
+    """
+    Backend storing the entries in one of Django's ``CACHES``.
+
+    Tags are versioned: every entry records the version of each of its tags when it was
+    stored, and invalidating a tag gives it a new version, so stale entries are never
+    served again without having to find and delete them. Every entry also carries the
+    ``ALL_TAG`` generation, which ``clear`` bumps.
+    """
+
+    ALL_TAG = "__all__"
+
+    def __init__(self, alias="default", timeout=300, key_prefix="graphql"):
+        self.cache = caches[alias]
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    def _entry_key(self, key):
+        return f"{self.key_prefix}:response:{key}"
+
+    def _tag_key(self, tag):
+        return f"{self.key_prefix}:tag:{tag}"
+
+    def _tag_versions(self, tags):
+        tag_keys = {self._tag_key(tag): tag for tag in tags}
+        versions = self.cache.get_many(list(tag_keys))
+        return {tag: versions.get(tag_key) for tag_key, tag in tag_keys.items()}
+
+    def get(self, key):
+        entry = self.cache.get(self._entry_key(key))
+        if entry is None:
+            return None
+        value, versions = entry
+        if self._tag_versions(versions) != versions:
+            return None
+        return value
+
+    def set(self, key, value, tags):
+        tags = {*tags, self.ALL_TAG}
+        for tag in tags:
+            self.cache.add(self._tag_key(tag), uuid.uuid4().hex, None)
+        versions = self._tag_versions(tags)
+        if None not in versions.values():
+            self.cache.set(self._entry_key(key), (value, versions), self.timeout)
+
+    def invalidate(self, tags):
+        self.cache.set_many({self._tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+    def clear(self):
+        self.invalidate([self.ALL_TAG])
+
+
+class ResponseCache:
+    """
+    Caches successful query results keyed by the normalized document, the variables and
+    the operation name, and counts hits and misses.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, tags):
+        self.backend.set(key, value, tags)
+
+    def invalidate(self, tags):
+        self.backend.invalidate(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Return the hit and miss counters of this process."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """
+    Return the response cache configured by ``GRAPHQL_RESPONSE_CACHE``, or ``None`` if
+    response caching is disabled.
+    """
+    global _response_cache
+    config = settings.GRAPHQL_RESPONSE_CACHE
+    if not config.get("BACKEND"):
+        return None
+    if _response_cache is None:
+        backend = import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+        _response_cache = ResponseCache(backend)
+    return _response_cache
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _response_cache
+    if setting == "GRAPHQL_RESPONSE_CACHE":
+        _response_cache = None
+
+
+def cache_key_and_tags(query, variables=None, operation_name=None):
+    """
+    Return the cache key and the organization tags of a request, or ``None`` if the
+    request cannot be cached (unparsable document or not a query).
+
+    Root fields called with an ``organizationId`` are tagged with that organization;
+    any other root field is tagged ``UNSCOPED_TAG``.
+    """
+    try:
+        cached = get_document_cache().get(query)
+    except GraphQLError:
+        return None
+    document = cached.document
+    operations = [
+        definition
+        for definition in document.definitions
+        if getattr(definition, "operation", None) is not None
+        and (operation_name is None or definition.name and definition.name.value == operation_name)
+    ]
+    if len(operations) != 1 or operations[0].operation != OperationType.QUERY:
+        return None
+
+    variables = variables or {}
+    tags = set()
+    for selection in operations[0].selection_set.selections:
+        if isinstance(selection, FieldNode) and selection.name.value.startswith("__"):
+            continue
+        organization_id = _organization_argument(selection, variables)
+        tags.add(UNSCOPED_TAG if organization_id is None else str(organization_id))
+
+    payload = json.dumps(
+        [cached.normalized, variables, operation_name], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest(), tags
+
+
+def _organization_argument(selection, variables):
+    if not isinstance(selection, FieldNode):
+        return None
+    for argument in selection.arguments:
+        if argument.name.value != "organizationId":
+            continue
+        if isinstance(argument.value, IntValueNode):
+            return int(argument.value.value)
+        if isinstance(argument.value, VariableNode):
+            return variables.get(argument.value.name.value)
+    return None
+
+
+def invalidate_organizations(*organization_ids):
+    """
+    Invalidate the cached responses of the organizations, together with every unscoped
+    response, once the current transaction commits.
+    """
+    response_cache = get_response_cache()
+    if response_cache is None:
+        return
+    tags = {str(organization_id) for organization_id in organization_ids if organization_id}
+    tags.add(UNSCOPED_TAG)
+    transaction.on_commit(partial(response_cache.invalidate, tags), robust=True)
+
+
+def invalidate_all():
+    """Drop every cached response once the current transaction commits."""
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        transaction.on_commit(response_cache.clear, robust=True)
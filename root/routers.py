@@ -0,0 +1,63 @@
+"""This module contains the database router sending GraphQL reads to the read-only alias."""
+
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+_read_alias = contextvars.ContextVar("read_alias", default=None)
+
+
+@contextmanager
+def read_from_replica():
+    """Send the reads of the block to the ``DATABASE_READ_ALIAS`` database."""
+    token = _read_alias.set(settings.DATABASE_READ_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Routes reads made inside ``read_from_replica`` to the read-only alias, and every write
+    to the primary database. Outside of such a block, reads stay on the primary, so admin
+    and form requests always read their own writes.
+
+    An alias opened on the primary's own database, like the test mirror of the replica, is
+    skipped: its separate connection would not see the writes of an open transaction.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or _same_database(alias, DEFAULT_DB_ALIAS):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _same_database(alias, other):
+    return connections[alias].settings_dict["NAME"] == connections[other].settings_dict["NAME"]
+
+
+class ReadReplicaExtension(SchemaExtension):
+    """Resolves query operations against the read-only alias."""
+
+    def on_execute(self):
+        if self.execution_context.operation_type != OperationType.QUERY:
+            yield
+            return
+        with read_from_replica():
+            yield
@@ -1,14 +1,31 @@
 """This module contains the schema for the root app."""
 
 import strawberry
+from strawberry_django.optimizer import DjangoOptimizerExtension
 
+from charter.schema import Query as CharterQuery
 from employee.schema import Query as EmployeeQuery
 from organization.schema import Query as OrganizationQuery
+from service.schema import Query as ServiceQuery
+
+from .document_cache import DocumentCacheExtension
+from .loaders import DataLoaderExtension
+from .query_cost import QueryCostExtension
+from .routers import ReadReplicaExtension
 
 
 @strawberry.type
-class Query(OrganizationQuery, EmployeeQuery):
+class Query(OrganizationQuery, EmployeeQuery, ServiceQuery, CharterQuery):
     """Query type for the root app."""
 
 
-schema = strawberry.Schema(query=Query)
+schema = strawberry.Schema(
+    query=Query,
+    extensions=[
+        DocumentCacheExtension,
+        QueryCostExtension,
+        ReadReplicaExtension,
+        DjangoOptimizerExtension,
+        DataLoaderExtension,
+    ],
+)
@@ -50,6 +50,10 @@ INSTALLED_APPS = [
     "organization",
     "employee",
     "service",
+    "charter",
+    "media",
+    # Project wide management commands, such as the benchmarks.
+    "root",
 ]
 
 MIDDLEWARE = [
@@ -88,10 +92,70 @@ WSGI_APPLICATION = "root.wsgi.application"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 DATABASE_PATH = os.getenv("DATABASE_PATH", str(BASE_DIR / "db.sqlite3"))
 
+# Pragmas applied to every new SQLite connection. WAL lets readers run while a write is in
+# progress, and the busy timeout makes a writer wait for the lock instead of failing with
+# "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    # Negative sizes are in KiB.
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-20000")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": DATABASE_PATH,
+        # Seconds a connection is reused across requests, 0 to close it after each request.
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": ";".join(
+                f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+            ),
+            # Take the write lock when the transaction starts, so a transaction that reads
+            # before writing waits on busy_timeout instead of failing to upgrade its lock.
+            "transaction_mode": "IMMEDIATE",
+        },
+    },
+    # Read-only connection serving GraphQL queries, so public reads never contend for the
+    # write lock of the primary. Point DATABASE_REPLICA_PATH at a replica file to move
+    # them off the primary database entirely.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": Path(os.getenv("DATABASE_REPLICA_PATH", DATABASE_PATH)).resolve().as_uri()
+        + "?mode=ro",
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": ";".join(
+                f"PRAGMA {name}={value}"
+                for name, value in SQLITE_PRAGMAS.items()
+                if name not in ("journal_mode", "synchronous")
+            )
+            + ";PRAGMA query_only=1",
+        },
+        "TEST": {"MIRROR": "default"},
+    },
+}
+
+DATABASE_ROUTERS = ["root.routers.ReadReplicaRouter"]
+
+# Database alias the read-only GraphQL queries are resolved against.
+DATABASE_READ_ALIAS = os.getenv("DATABASE_READ_ALIAS", "replica")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/ref/settings/#caches
+# The default local memory cache is private to each worker process; point it at a cache
+# shared by every worker (e.g. Redis or Memcached) before relying on it across processes.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
@@ -143,6 +207,10 @@ STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
+    # Uploaded logos, profile pictures and sample documents, named after their content.
+    "uploads": {
+        "BACKEND": "media.storage.ContentAddressedStorage",
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
@@ -153,6 +221,71 @@ STORAGES = {
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(BASE_DIR, "public", "media"))
+# Header handing media transfers to the reverse proxy: "X-Accel-Redirect" for nginx, with
+# an internal location at MEDIA_SENDFILE_PREFIX aliased to MEDIA_ROOT, or "X-Sendfile" for
+# Apache and lighttpd. Empty to stream them from Django.
+MEDIA_SENDFILE_HEADER = os.getenv("MEDIA_SENDFILE_HEADER", "")
+MEDIA_SENDFILE_PREFIX = os.getenv("MEDIA_SENDFILE_PREFIX", "/protected-media/")
+# Seconds media files not named after their content may be cached.
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", "3600"))
+# Seconds an uploaded file is kept after it was last saved, even when no row references it,
+# as the row saving it may not be committed yet. prune_uploads deletes it afterwards.
+MEDIA_RELEASE_GRACE_PERIOD = int(os.getenv("MEDIA_RELEASE_GRACE_PERIOD", "3600"))
+
+# Images given by URL in the admin are downloaded by the process_image_downloads worker.
+# A failed download is retried after IMAGE_DOWNLOAD_RETRY_DELAY seconds, doubling with every
+# attempt up to IMAGE_DOWNLOAD_MAX_RETRY_DELAY, and given up after IMAGE_DOWNLOAD_MAX_ATTEMPTS.
+# A download still running after IMAGE_DOWNLOAD_LEASE seconds is taken over by another worker.
+IMAGE_DOWNLOAD_MAX_ATTEMPTS = int(os.getenv("IMAGE_DOWNLOAD_MAX_ATTEMPTS", "5"))
+IMAGE_DOWNLOAD_RETRY_DELAY = int(os.getenv("IMAGE_DOWNLOAD_RETRY_DELAY", "30"))
+IMAGE_DOWNLOAD_MAX_RETRY_DELAY = int(os.getenv("IMAGE_DOWNLOAD_MAX_RETRY_DELAY", "3600"))
+IMAGE_DOWNLOAD_LEASE = int(os.getenv("IMAGE_DOWNLOAD_LEASE", "300"))
+
+# Downloaded images larger than IMAGE_DOWNLOAD_MAX_BYTES or IMAGE_MAX_PIXELS are rejected,
+# and the others are shrunk to fit IMAGE_MAX_DIMENSION pixels square.
+IMAGE_DOWNLOAD_MAX_BYTES = int(os.getenv("IMAGE_DOWNLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1024"))
+
+
+# GraphQL
+
+# Serve GraphQL with the async view, executing operations on the event loop. Enabled by
+# root/asgi.py, so the ASGI application gets it without further configuration.
+GRAPHQL_ASYNC = os.getenv("GRAPHQL_ASYNC", "False").lower() in ("true", "1", "yes")
+
+# Upper bound for connection page sizes.
+GRAPHQL_MAX_PAGE_SIZE = int(os.getenv("GRAPHQL_MAX_PAGE_SIZE", "100"))
+# The legacy list fields fail rather than return more rows than this.
+GRAPHQL_MAX_LIST_SIZE = int(os.getenv("GRAPHQL_MAX_LIST_SIZE", "1000"))
+
+# Operations nested deeper or estimated costlier than this are rejected before execution.
+GRAPHQL_MAX_QUERY_DEPTH = int(os.getenv("GRAPHQL_MAX_QUERY_DEPTH", "10"))
+GRAPHQL_MAX_QUERY_COST = int(os.getenv("GRAPHQL_MAX_QUERY_COST", "5000"))
+
+# Number of parsed and validated GraphQL documents kept per process.
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", "256"))
+
+# Response cache of the GraphQL endpoint, disabled by default. Cached responses are only
+# invalidated by the writes of the processes sharing the cache, so enable it with
+# "root.response_cache.DjangoCacheBackend" on a CACHE_BACKEND shared by every worker, or
+# with "root.response_cache.LRUBackend" when a single process serves and writes.
+GRAPHQL_RESPONSE_CACHE = {
+    "BACKEND": os.getenv("GRAPHQL_RESPONSE_CACHE_BACKEND", ""),
+    "OPTIONS": {
+        "timeout": int(os.getenv("GRAPHQL_RESPONSE_CACHE_TIMEOUT", "300")),
+    },
+}
+if GRAPHQL_RESPONSE_CACHE["BACKEND"].endswith(".LRUBackend"):
+    GRAPHQL_RESPONSE_CACHE["OPTIONS"]["max_entries"] = int(
+        os.getenv("GRAPHQL_RESPONSE_CACHE_SIZE", "1000")
+    )
+
+# Django cache storing the automatic persisted query documents, which must be shared by every
+# worker (see CACHE_BACKEND), and how long shared caches may keep the responses of persisted
+# queries sent over GET.
+GRAPHQL_PERSISTED_QUERIES_CACHE = os.getenv("GRAPHQL_PERSISTED_QUERIES_CACHE", "default")
+GRAPHQL_PERSISTED_QUERY_MAX_AGE = int(os.getenv("GRAPHQL_PERSISTED_QUERY_MAX_AGE", "60"))
 
 
 # Default primary key field type
@@ -194,6 +327,8 @@ JAZZMIN_SETTINGS = {
         "service.service": "fas fa-server",
         "service.sampledocments": "fas fa-file-alt",
         "service.servicedetail": "fas fa-info",
+        # Media icons
+        "media.imagedownload": "fas fa-download",
     },
     "default_icon_parents": "fas fa-chevron-circle-right",
     "default_icon_children": "fas fa-circle",
@@ -0,0 +1,93 @@
+"""This module contains the fixtures and the test case shared by the tests of the apps."""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+
+from employee.models import Employee
+from organization.choices import PROVINCE_CHOICES
+from organization.models import Department, Designation, Organization
+
+from .schema import schema
+
+User = get_user_model()
+fake = Faker()
+
+
+def create_organization(**fields):
+    """Create an organization, with its own user, filling the fields not given with fakes."""
+    if "user" not in fields:
+        fields["user"] = User.objects.create_user(username=fake.unique.user_name())
+    return Organization.objects.create(
+        **{
+            "name": fake.company(),
+            "tag_line": fake.catch_phrase(),
+            "description": fake.text(max_nb_chars=200),
+            "province": fake.random_element(elements=[choice[0] for choice in PROVINCE_CHOICES]),
+            "district": fake.city(),
+            "municipality": fake.city(),
+            "ward_no": str(fake.random_int(min=1, max=32)),
+            "contact_no": fake.phone_number()[:15],
+            "website": fake.url(),
+            **fields,
+        }
+    )
+
+
+def create_department(organization, **fields):
+    """Create a department of ``organization``, filling the fields not given with fakes."""
+    return Department.objects.create(
+        organization=organization,
+        **{
+            "name": f"{fake.word().title()} Department",
+            "description": fake.text(max_nb_chars=100),
+            "contact_no": fake.phone_number()[:20],
+            "email": fake.company_email(),
+            **fields,
+        },
+    )
+
+
+def create_designation(department, **fields):
+    """Create a designation in ``department``, filling the fields not given with fakes."""
+    return Designation.objects.create(
+        organization=department.organization,
+        department=department,
+        **{
+            "title": fake.job(),
+            "description": fake.text(max_nb_chars=50),
+            "priority": 1,
+            **fields,
+        },
+    )
+
+
+def create_employee(designation, **fields):
+    """Create an employee holding ``designation``, filling the fields not given with fakes."""
+    return Employee.objects.create(
+        designation=designation,
+        **{
+            "name": fake.name(),
+            "description": fake.text(max_nb_chars=50),
+            "contact_no": fake.phone_number()[:15],
+            **fields,
+        },
+    )
+
+
+class GraphQLTestCase(TestCase):
+    """Test case executing GraphQL operations against the schema."""
+
+    def execute(self, query, **variables):
+        """Execute ``query`` and return its result with the SQL queries it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute_sync(query, variable_values=variables)
+        return result, queries
+
+    def execute_data(self, query, **variables):
+        """Execute ``query``, check that it succeeded and return its data and SQL queries."""
+        result, queries = self.execute(query, **variables)
+        self.assertIsNone(result.errors)
+        return result.data, queries
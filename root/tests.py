@@ -0,0 +1,614 @@
+"""Tests for the GraphQL serving layer shared by the apps."""
+
+import hashlib
+import json
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import OperationalError, connection, connections
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+from graphql import build_schema, parse
+from strawberry.utils.inspect import in_async_context
+
+from organization.models import Organization
+from root.document_cache import DocumentCache, get_document_cache
+from root.query_cost import QueryCostAnalyzer
+from root.response_cache import DjangoCacheBackend, LRUBackend, get_response_cache
+from root.routers import ReadReplicaRouter, read_from_replica
+from root.schema import schema
+from root.testing import (
+    GraphQLTestCase,
+    create_department,
+    create_designation,
+    create_organization,
+)
+from root.views import AsyncRootGraphQLView
+
+User = get_user_model()
+fake = Faker()
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={"BACKEND": "root.response_cache.DjangoCacheBackend"})
+class GraphQLResponseCacheTests(TestCase):
+    """Test cases for the tag-invalidated GraphQL response cache."""
+
+    query = """
+        query ($organizationId: Int!) {
+            getDepartmentsByOrganization(organizationId: $organizationId) { name }
+        }
+    """
+
+    def setUp(self):
+        """Set up two organizations with a department each and an empty response cache."""
+        self.response_cache = get_response_cache()
+        self.response_cache.clear()
+        self.organizations = []
+        self.departments = []
+        for _ in range(2):
+            organization = create_organization()
+            self.organizations.append(organization)
+            self.departments.append(create_department(organization))
+
+    def _post(self, query, **variables):
+        return self.client.post(
+            "/", json.dumps({"query": query, "variables": variables}), "application/json"
+        )
+
+    def _departments(self, organization):
+        response = self._post(self.query, organizationId=organization.id)
+        names = [item["name"] for item in response.json()["data"]["getDepartmentsByOrganization"]]
+        return response["X-Response-Cache"], names
+
+    def test_repeated_query_is_served_from_cache(self):
+        """Test that an equivalent document is a hit and costs no queries."""
+        stats = self.response_cache.stats()
+        self.assertEqual(self._departments(self.organizations[0])[0], "MISS")
+        reformatted = " ".join(self.query.split()).replace("{ name }", "{\n name\n }")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._post(reformatted, organizationId=self.organizations[0].id)
+
+        self.assertEqual(response["X-Response-Cache"], "HIT")
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self.response_cache.stats()["hits"], stats["hits"] + 1)
+        self.assertEqual(self.response_cache.stats()["misses"], stats["misses"] + 1)
+
+    def test_write_invalidates_only_its_organization(self):
+        """Test that saving a department invalidates the responses of its organization."""
+        first, second = self.organizations
+        self._departments(first)
+        self._departments(second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.departments[0].name = "Renamed Department"
+            self.departments[0].save()
+
+        self.assertEqual(self._departments(first), ("MISS", ["Renamed Department"]))
+        self.assertEqual(self._departments(second)[0], "HIT")
+
+    def test_editing_the_user_of_an_organization_invalidates_it(self):
+        """Test that renaming an organization's user invalidates that organization only."""
+        query = """
+            query ($organizationId: Int) {
+                getOrganizationsById(organizationId: $organizationId) { user { username } }
+            }
+        """
+        first, second = self.organizations
+        for organization in self.organizations:
+            self._post(query, organizationId=organization.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.user.username = "renamed-user"
+            first.user.save()
+
+        response = self._post(query, organizationId=first.id)
+        self.assertEqual(response["X-Response-Cache"], "MISS")
+        self.assertEqual(
+            response.json()["data"]["getOrganizationsById"][0]["user"]["username"],
+            "renamed-user",
+        )
+        self.assertEqual(self._post(query, organizationId=second.id)["X-Response-Cache"], "HIT")
+
+    def test_editing_an_unlinked_user_invalidates_nothing(self):
+        """Test that saving a user without an organization keeps every response cached."""
+        self._departments(self.organizations[0])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            User.objects.create_user(username=fake.unique.user_name())
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self._departments(self.organizations[0])[0], "HIT")
+
+    def test_unscoped_queries_are_invalidated_by_any_write(self):
+        """Test that queries not scoped to an organization are invalidated by every write."""
+        query = "query { getOrganizationsById { name } }"
+        self._post(query)
+        self.assertEqual(self._post(query)["X-Response-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organizations[1].name = "Renamed Organization"
+            self.organizations[1].save()
+
+        response = self._post(query)
+        self.assertEqual(response["X-Response-Cache"], "MISS")
+        names = [item["name"] for item in response.json()["data"]["getOrganizationsById"]]
+        self.assertIn("Renamed Organization", names)
+
+    def test_errors_are_not_cached(self):
+        """Test that responses with errors are executed every time."""
+        query = "query { organizations(first: 100000) { edges { node { name } } } }"
+        self._post(query)
+
+        self.assertEqual(self._post(query)["X-Response-Cache"], "MISS")
+
+    def test_lru_backend_evicts_least_recently_used(self):
+        """Test that the LRU backend stays within its size and drops invalidated tags."""
+        backend = LRUBackend(max_entries=2)
+        backend.set("a", 1, {"1"})
+        backend.set("b", 2, {"2"})
+        backend.get("a")
+        backend.set("c", 3, {"1"})
+
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("a"), 1)
+        backend.invalidate({"1"})
+        self.assertIsNone(backend.get("a"))
+        self.assertIsNone(backend.get("c"))
+
+    def test_django_cache_backend_invalidates_by_tag(self):
+        """Test that the Django cache backend stops serving entries of invalidated tags."""
+        backend = DjangoCacheBackend(key_prefix=fake.uuid4())
+        backend.set("a", 1, {"1"})
+        backend.set("b", 2, {"2"})
+
+        backend.invalidate({"1"})
+        self.assertIsNone(backend.get("a"))
+        self.assertEqual(backend.get("b"), 2)
+        backend.clear()
+        self.assertIsNone(backend.get("b"))
+
+
+class GraphQLPersistedQueryTests(TestCase):
+    """Test cases for the automatic persisted queries of the GraphQL endpoint."""
+
+    query = "query { organizations(first: 5) { edges { node { name } } } }"
+
+    def setUp(self):
+        """Set up an organization and an empty persisted query cache."""
+        caches["default"].clear()
+        self.sha256_hash = hashlib.sha256(self.query.encode()).hexdigest()
+        self.organization = create_organization()
+
+    def _extensions(self, sha256_hash=None):
+        return {"persistedQuery": {"version": 1, "sha256Hash": sha256_hash or self.sha256_hash}}
+
+    def _post(self, **body):
+        return self.client.post("/", json.dumps(body), "application/json")
+
+    def _get(self, **params):
+        return self.client.get(
+            "/",
+            {name: json.dumps(value) for name, value in params.items()},
+            HTTP_ACCEPT="application/json",
+        )
+
+    def _names(self, response):
+        edges = response.json()["data"]["organizations"]["edges"]
+        return [edge["node"]["name"] for edge in edges]
+
+    def test_unknown_hash_asks_for_registration(self):
+        """Test that an unknown hash is answered with PersistedQueryNotFound."""
+        response = self._post(extensions=self._extensions())
+
+        self.assertEqual(response.status_code, 200)
+        error = response.json()["errors"][0]
+        self.assertEqual(error["message"], "PersistedQueryNotFound")
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_registered_hash_is_executed(self):
+        """Test that a registered document is executed from its hash alone."""
+        registration = self._post(query=self.query, extensions=self._extensions())
+        response = self._post(extensions=self._extensions())
+
+        self.assertEqual(self._names(registration), [self.organization.name])
+        self.assertEqual(self._names(response), [self.organization.name])
+
+    def test_mismatching_hash_is_rejected(self):
+        """Test that a document is not registered under a hash it does not match."""
+        response = self._post(query=self.query, extensions=self._extensions("0" * 64))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"][0]["extensions"]["code"], "INVALID_PERSISTED_QUERY"
+        )
+        self.assertIn("errors", self._post(extensions=self._extensions("0" * 64)).json())
+
+    def test_unsupported_version_is_rejected(self):
+        """Test that a persisted query of an unknown protocol version is a bad request."""
+        extensions = {"persistedQuery": {"version": 2, "sha256Hash": self.sha256_hash}}
+
+        response = self._post(query=self.query, extensions=extensions)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"][0]["message"], "Unsupported persisted query version."
+        )
+
+    def test_persisted_query_over_get_is_cacheable(self):
+        """Test that a hash only GET request is answered with a public cache header."""
+        self.assertIn("errors", self._get(extensions=self._extensions()).json())
+        self._post(query=self.query, extensions=self._extensions())
+
+        response = self._get(extensions=self._extensions())
+
+        self.assertEqual(self._names(response), [self.organization.name])
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+
+class GraphQLDocumentCacheTests(TestCase):
+    """Test cases for the LRU cache of parsed and validated GraphQL documents."""
+
+    def test_repeated_document_is_parsed_and_validated_once(self):
+        """Test that a document sent again skips parsing and validation."""
+        query = "query { organizations(first: 1) { totalCount } }"
+        get_document_cache().clear()
+        stats = get_document_cache().stats()
+
+        with (
+            mock.patch("strawberry.schema.schema.parse") as parse,
+            mock.patch("strawberry.schema.schema.validate", return_value=[]) as validate,
+        ):
+            for _ in range(3):
+                self.assertIsNone(schema.execute_sync(query).errors)
+
+        parse.assert_not_called()
+        self.assertEqual(validate.call_count, 1)
+        self.assertEqual(get_document_cache().stats()["hits"], stats["hits"] + 2)
+        self.assertEqual(get_document_cache().stats()["misses"], stats["misses"] + 1)
+
+    def test_invalid_document_keeps_its_errors(self):
+        """Test that a cached invalid document is still rejected with its errors."""
+        for _ in range(2):
+            result = schema.execute_sync("query { unknownField }")
+            self.assertIn("unknownField", result.errors[0].message)
+
+    def test_least_recently_used_document_is_evicted(self):
+        """Test that the cache never holds more than its size."""
+        cache = DocumentCache(max_size=2)
+        first = cache.get("{ a }")
+        cache.get("{ b }")
+        cache.get("{ a }")
+        cache.get("{ c }")
+
+        self.assertIs(cache.peek("{ a }"), first)
+        self.assertIsNone(cache.peek("{ b }"))
+        self.assertEqual(cache.stats()["size"], 2)
+
+
+class GraphQLQueryCostTests(GraphQLTestCase):
+    """Test cases for the static depth and cost analysis of GraphQL operations."""
+
+    query = """
+        query ($first: Int) {
+            organizations(first: $first) {
+                totalCount
+                edges { node { name user { username } } }
+            }
+        }
+    """
+
+    def test_cost_is_reported_in_extensions(self):
+        """Test that the cost follows the page size and is reported with the depth."""
+        result, _ = self.execute(self.query, first=5)
+
+        self.assertIsNone(result.errors)
+        cost = result.extensions["cost"]
+        # connection + totalCount + 5 * (node + user)
+        self.assertEqual(cost["requestedQueryCost"], 12)
+        self.assertEqual(cost["depth"], 5)
+        result, _ = self.execute(self.query)
+        self.assertEqual(result.extensions["cost"]["requestedQueryCost"], 202)
+
+    def test_fragments_are_counted(self):
+        """Test that fields selected through fragments are counted like inline ones."""
+        query = """
+            query {
+                organizations(first: 5) { totalCount edges { node { ...Organization } } }
+            }
+            fragment Organization on OrganizationType { name user { username } }
+        """
+
+        result, _ = self.execute(query)
+
+        self.assertEqual(result.extensions["cost"]["requestedQueryCost"], 12)
+
+    def test_too_deep_query_is_rejected_before_execution(self):
+        """Test that an operation over the maximum depth is never executed."""
+        with override_settings(GRAPHQL_MAX_QUERY_DEPTH=4):
+            result, queries = self.execute(self.query, first=5)
+
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].extensions["code"], "QUERY_TOO_DEEP")
+        self.assertIn("maximum depth of 4", result.errors[0].message)
+        self.assertEqual(len(queries), 0)
+
+    def test_too_costly_query_is_rejected_before_execution(self):
+        """Test that an operation over the maximum cost is never executed."""
+        query = """
+            query {
+                getEmployeesById {
+                    organization { name }
+                    designation { department { organization { user { username } } } }
+                }
+            }
+        """
+
+        result, queries = self.execute(query)
+
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].extensions["code"], "QUERY_TOO_COSTLY")
+        # GRAPHQL_MAX_LIST_SIZE * (employee + organization + 4 nested rows)
+        self.assertEqual(result.extensions["cost"]["requestedQueryCost"], 6000)
+        self.assertEqual(len(queries), 0)
+
+    def test_known_relations_use_their_expected_size(self):
+        """Test that lists are sized by their lookup argument or their expected size."""
+        query = """
+            query ($id: Int) {
+                getDepartmentsById(departmentId: $id) { name }
+                getServicesByOrganization(organizationId: 1) {
+                    responsibleEmployees { name }
+                    sampleDocuments { name }
+                }
+            }
+        """
+
+        result, _ = self.execute(query, id=1)
+
+        # 1 department + 50 services * (1 + 5 employees + 3 documents)
+        self.assertEqual(result.extensions["cost"]["requestedQueryCost"], 451)
+        result, _ = self.execute(query)
+        self.assertEqual(result.extensions["cost"]["requestedQueryCost"], 1450)
+
+    def test_limit_argument_sizes_the_list(self):
+        """Test that a list field's first or limit argument overrides its expected size."""
+        test_schema = build_schema(
+            """
+            type Query { items(limit: Int): [Item!]! tags: [Item!]! }
+            type Item { name: String child: Item }
+            """
+        )
+        document = parse("query ($limit: Int) { items(limit: $limit) { child { name } } }")
+        operation = document.definitions[0]
+
+        cost, _ = QueryCostAnalyzer(test_schema, document, {"limit": 7}).analyze(operation)
+        self.assertEqual(cost, 14)
+        cost, _ = QueryCostAnalyzer(test_schema, document).analyze(operation)
+        self.assertEqual(cost, 2 * settings.GRAPHQL_MAX_LIST_SIZE)
+
+
+class GraphQLAsyncExecutionTests(TestCase):
+    """Test cases for executing GraphQL operations on the event loop."""
+
+    queries = [
+        """
+        query {
+            organizations(first: 5) {
+                totalCount
+                edges { node { name user { username } } }
+            }
+        }
+        """,
+        """
+        query {
+            getDesignationsById {
+                title
+                organization { name user { username } }
+                department { name organization { name } }
+            }
+        }
+        """,
+        """
+        query {
+            departments(first: 2) {
+                totalCount
+                pageInfo { hasNextPage }
+                edges { node { name organization { name } } }
+            }
+        }
+        """,
+    ]
+
+    def setUp(self):
+        """Set up two organizations with departments and designations."""
+        for _ in range(2):
+            organization = create_organization()
+            for index in range(3):
+                department = create_department(organization, name=f"Department {index}")
+                create_designation(department, priority=index)
+
+    async def test_async_execution_matches_sync_execution(self):
+        """Test that every query gives the same data on the event loop as in a worker."""
+        for query in self.queries:
+            with self.subTest(query=query):
+                expected = await sync_to_async(schema.execute_sync)(query)
+                result = await schema.execute(query)
+
+                self.assertIsNone(result.errors)
+                self.assertEqual(result.data, expected.data)
+
+    def test_async_execution_batches_relations(self):
+        """Test that relations are batched on the event loop as they are in a worker."""
+        with CaptureQueriesContext(connection) as sync_queries:
+            schema.execute_sync(self.queries[1])
+        with CaptureQueriesContext(connection) as async_queries:
+            async_to_sync(schema.execute)(self.queries[1])
+
+        self.assertEqual(len(async_queries), len(sync_queries))
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE={"BACKEND": "root.response_cache.LRUBackend"})
+    async def test_async_view_serves_the_response_cache(self):
+        """Test that the ASGI view answers repeated queries from the response cache."""
+        get_response_cache().clear()
+        view = AsyncRootGraphQLView.as_view(schema=schema)
+        body = json.dumps({"query": self.queries[0]})
+        responses = [
+            await view(AsyncRequestFactory().post("/", body, content_type="application/json"))
+            for _ in range(2)
+        ]
+
+        self.assertEqual([response["X-Response-Cache"] for response in responses], ["MISS", "HIT"])
+        data = [json.loads(response.content)["data"] for response in responses]
+        self.assertEqual(data[0], data[1])
+        self.assertEqual(data[0]["organizations"]["totalCount"], 2)
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE={"BACKEND": "root.response_cache.LRUBackend"})
+    async def test_async_view_calls_the_caches_off_the_event_loop(self):
+        """Test that the blocking persisted query and response caches run in a worker thread."""
+        on_event_loop = []
+        get_response_cache().clear()
+
+        def record(method):
+            def wrapper(*args, **kwargs):
+                on_event_loop.append(in_async_context())
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        query = self.queries[0]
+        body = json.dumps(
+            {
+                "query": query,
+                "extensions": {
+                    "persistedQuery": {
+                        "version": 1,
+                        "sha256Hash": hashlib.sha256(query.encode()).hexdigest(),
+                    }
+                },
+            }
+        )
+        view = AsyncRootGraphQLView.as_view(schema=schema)
+        cache = caches["default"]
+        with (
+            mock.patch.object(LRUBackend, "get", record(LRUBackend.get)),
+            mock.patch.object(LRUBackend, "set", record(LRUBackend.set)),
+            mock.patch.object(cache, "set", record(cache.set)),
+        ):
+            response = await view(
+                AsyncRequestFactory().post("/", body, content_type="application/json")
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(on_event_loop, [False, False, False])
+
+
+class ReadReplicaRouterTests(TestCase):
+    """Test cases for routing GraphQL reads to the read-only database alias."""
+
+    def _replica_on_its_own_file(self):
+        return mock.patch.dict(
+            connections["replica"].settings_dict, NAME="file:replica.sqlite3?mode=ro"
+        )
+
+    def test_reads_inside_the_block_go_to_the_replica(self):
+        """Test that only reads made inside ``read_from_replica`` use the replica."""
+        router = ReadReplicaRouter()
+        with self._replica_on_its_own_file():
+            self.assertIsNone(router.db_for_read(Organization))
+            with read_from_replica():
+                self.assertEqual(router.db_for_read(Organization), "replica")
+                self.assertEqual(router.db_for_write(Organization), "default")
+            self.assertIsNone(router.db_for_read(Organization))
+
+    def test_replica_on_the_primary_database_is_skipped(self):
+        """Test that a mirror of the primary, as in the test run, is not read from."""
+        with read_from_replica():
+            self.assertIsNone(ReadReplicaRouter().db_for_read(Organization))
+
+    def test_only_the_primary_is_migrated(self):
+        """Test that migrations never run against the read-only alias."""
+        router = ReadReplicaRouter()
+
+        self.assertTrue(router.allow_migrate("default", "organization"))
+        self.assertFalse(router.allow_migrate("replica", "organization"))
+
+    def test_query_operations_read_from_the_replica(self):
+        """Test that the resolvers of a query operation run against the replica."""
+        aliases = []
+        db_for_read = ReadReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            # Record the routing decision but keep reading the test database.
+            aliases.append(db_for_read(router, model, **hints))
+
+        with (
+            self._replica_on_its_own_file(),
+            mock.patch.object(ReadReplicaRouter, "db_for_read", record),
+        ):
+            result = schema.execute_sync("{ organizations(first: 2) { totalCount } }")
+
+        self.assertIsNone(result.errors)
+        self.assertTrue(aliases)
+        self.assertEqual(set(aliases), {"replica"})
+
+
+class ReadReplicaDatabaseTests(SimpleTestCase):
+    """Test cases reading through the real read-only alias, opened on its own SQLite file."""
+
+    databases = {"replica"}
+
+    def setUp(self):
+        """Set up a replica file holding one organization name."""
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.path = Path(directory) / "replica.sqlite3"
+        with closing(sqlite3.connect(self.path)) as database, database:
+            database.execute(
+                "CREATE TABLE organization_organization (id INTEGER PRIMARY KEY, name TEXT)"
+            )
+            database.execute("INSERT INTO organization_organization (name) VALUES ('Replica')")
+
+    def _open_replica(self, query=""):
+        # Open the real alias on the file, with the settings' init command, and close it
+        # before its settings are restored.
+        replica = connections["replica"]
+        replica.close()
+        self.enterContext(mock.patch.dict(replica.settings_dict, NAME=self.path.as_uri() + query))
+        self.addCleanup(replica.close)
+        return replica
+
+    def test_query_reads_come_from_the_replica_file(self):
+        """Test that reads inside ``read_from_replica`` are served by the replica's file."""
+        self._open_replica("?mode=ro")
+
+        with read_from_replica():
+            names = list(Organization.objects.values_list("name", flat=True))
+
+        self.assertEqual(names, ["Replica"])
+
+    def test_writes_through_the_replica_are_rejected(self):
+        """Test that the replica refuses writes, through ``mode=ro`` and ``query_only`` alike."""
+        for query in ("?mode=ro", ""):
+            with self.subTest(query=query):
+                replica = self._open_replica(query)
+                with replica.cursor() as cursor:
+                    cursor.execute("PRAGMA query_only")
+                    self.assertEqual(cursor.fetchone(), (1,))
+                    with self.assertRaisesMessage(OperationalError, "readonly database"):
+                        cursor.execute("UPDATE organization_organization SET name = 'Written'")
+                replica.close()
+
+        with closing(sqlite3.connect(self.path)) as database:
+            self.assertEqual(
+                database.execute("SELECT name FROM organization_organization").fetchall(),
+                [("Replica",)],
+            )
@@ -0,0 +1,71 @@
+"""This module contains the mixin remembering the field values of rows loaded from the database."""
+
+from django.db.models import FileField
+
+
+class TrackedFieldsMixin:
+    """
+    Remembers the values ``tracked_fields`` had when the instance was loaded or last saved, so
+    ``save`` and the signal receivers can compare against the stored row without fetching it
+    again. Mix it in before ``models.Model``.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_stored_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_stored_values()
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        if fields is None:
+            self._remember_stored_values()
+
+    def _remember_stored_values(self):
+        # Deferred fields are left out rather than loaded; they fall back to a query.
+        self._stored_values = {
+            field.attname: self._current_value(field)
+            for field in map(self._meta.get_field, self.tracked_fields)
+            if field.attname in self.__dict__
+        }
+
+    def _current_value(self, field):
+        return _comparable(field, getattr(self, field.attname))
+
+    def stored_value(self, name):
+        """
+        Return the value of the field as stored in the database, ``None`` for unsaved rows.
+        Untracked or deferred fields are read with a query.
+        """
+        field = self._meta.get_field(name)
+        stored_values = getattr(self, "_stored_values", {})
+        if field.attname in stored_values:
+            return stored_values[field.attname]
+        if self.pk is None:
+            return None
+        value = (
+            type(self)
+            ._base_manager.filter(pk=self.pk)
+            .values_list(field.attname, flat=True)
+            .first()
+        )
+        return _comparable(field, value)
+
+    def has_changed(self, name):
+        """Return whether the field differs from the stored row, always true for new rows."""
+        if self._state.adding:
+            return True
+        return self.stored_value(name) != self._current_value(self._meta.get_field(name))
+
+
+def _comparable(field, value):
+    """Return files by name, with ``None`` for an empty file field however it is stored."""
+    if isinstance(field, FileField):
+        return getattr(value, "name", value) or None
+    return value
@@ -19,24 +19,28 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from strawberry.django.views import GraphQLView
+
+from media.views import serve_media
 
 from .schema import schema
-from .views import health_check
+from .views import AsyncRootGraphQLView, RootGraphQLView, health_check
 
 admin.site.site_title = "Digital Citizen Charter (DCC) administration"
 admin.site.site_header = "Digital Citizen Charter (DCC)"
 admin.site.index_title = "Site administration"
 admin.site.description = "Digital Citizen Charter ( डिजिटल नागरिक वडापत्र )"
 
+graphql_view = AsyncRootGraphQLView if settings.GRAPHQL_ASYNC else RootGraphQLView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("helper/", include("organization.urls")),
+    path("charter/", include("charter.urls")),
     path("health/", health_check, name="health_check"),
-    path("", GraphQLView.as_view(schema=schema), name="graphql"),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name="media"),
+    path("", graphql_view.as_view(schema=schema), name="graphql"),
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
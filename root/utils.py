@@ -9,7 +9,10 @@ from django.utils.deconstruct import deconstructible
 
 @deconstructible
 class UploadToPathAndRename:
-    """This class is used to rename the uploaded file to a unique name."""
+    """
+    This class is used to rename the uploaded file to a unique name in ``path``, which the
+    content-addressed storage replaces with the hash of the file's content.
+    """
 
     def __init__(self, path):
         self.path = path
@@ -24,29 +27,119 @@ class UploadToPathAndRename:
 
 
 def download_image_from_url(url, filename):
+    """
+    Download the image at ``url`` and return it as a JPEG ``File`` named ``filename``,
+    raising ``ValidationError`` when it can't be used.
+
+    The response is streamed into a spooled temporary file and abandoned past
+    ``IMAGE_DOWNLOAD_MAX_BYTES``. Images of more than ``IMAGE_MAX_PIXELS`` are rejected from
+    their header, before any pixel is decoded, and the others are decoded at the reduced
+    scale closest to ``IMAGE_MAX_DIMENSION`` and shrunk to fit it.
+    """
+    import tempfile
     from io import BytesIO
 
     import requests
+    from django.conf import settings
     from django.core.exceptions import ValidationError
     from django.core.files import File
-    from PIL import Image
 
-    try:
-        response = requests.get(url, timeout=10)
-    except requests.RequestException as e:
-        raise ValidationError(f"Error occurred while trying to download the image: {str(e)}")
+    # Kept in memory while small, spilled to disk past 1 MiB.
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as source:
+        try:
+            with requests.get(url, stream=True, timeout=10) as response:
+                if response.status_code != 200:
+                    raise ValidationError(
+                        "Unable to download image, server responded with status code: "
+                        f"{response.status_code}"
+                    )
+                copy_capped_response(response, source, settings.IMAGE_DOWNLOAD_MAX_BYTES)
+        except requests.RequestException as e:
+            raise ValidationError(f"Error occurred while trying to download the image: {str(e)}")
+        source.seek(0)
+        image = decode_image(source, settings.IMAGE_MAX_DIMENSION, settings.IMAGE_MAX_PIXELS)
+
+    image_io = BytesIO()
+    image.save(image_io, format="JPEG", quality=85, optimize=True)
+    image_io.seek(0)
+    return File(image_io, name=filename)
+
+
+def copy_capped_response(response, file, max_bytes):
+    """
+    Stream the body of a ``requests`` response into ``file``, raising ``ValidationError``
+    as soon as it is larger than ``max_bytes``.
+    """
+    from django.core.exceptions import ValidationError
+
+    too_large = ValidationError(f"The image is larger than {max_bytes} bytes.")
+    content_length = response.headers.get("Content-Length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        file.write(chunk)
 
-    if response.status_code != 200:
-        raise ValidationError(
-            f"Unable to download image, server responded with status code: {response.status_code}"
-        )
+
+def decode_image(file, max_dimension, max_pixels):
+    """
+    Decode the image in ``file`` into an RGB image fitting in ``max_dimension`` pixels square,
+    raising ``ValidationError`` for unreadable images and images of more than ``max_pixels``.
+
+    JPEGs are decoded with ``draft`` at the smallest scale still larger than the target, so a
+    large photo never needs its full resolution in memory. Other formats are reduced by an
+    integer factor right after decoding, before the final resize.
+    """
+    import warnings
+
+    from django.core.exceptions import ValidationError
+    from PIL import Image
 
     try:
-        image = Image.open(BytesIO(response.content))
-    except OSError as e:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            image = Image.open(file)
+            width, height = image.size
+            if width * height > max_pixels:
+                raise ValidationError(
+                    f"The image is {width}x{height} pixels, more than the {max_pixels} allowed."
+                )
+            image.draft("RGB", (max_dimension, max_dimension))
+            image.load()
+            # Leave twice the target for the final resize, like thumbnail's reducing gap.
+            factor = max(1, max(image.size) // (2 * max_dimension))
+            image = flatten_image(image, factor)
+            image.thumbnail((max_dimension, max_dimension))
+            return image
+    except (
+        OSError,
+        ValueError,
+        Image.DecompressionBombError,
+        Image.DecompressionBombWarning,
+    ) as e:
         raise ValidationError(f"Error occurred while trying to open the image: {str(e)}")
 
-    image_io = BytesIO()
-    image.save(image_io, format="JPEG")
-    image_file = File(image_io, name=filename)
-    return image_file
+
+def flatten_image(image, factor=1):
+    """
+    Convert an image of any mode to RGB reduced by ``factor``, compositing transparent pixels
+    onto white.
+
+    Resampling an RGBA image copies it whole to premultiply its alpha, so transparent images
+    are composited in place and reduced one band at a time instead.
+    """
+    from PIL import Image, ImageChops
+
+    if image.has_transparency_data:
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        image.paste("white", mask=ImageChops.invert(image.getchannel("A")))
+        return Image.merge("RGB", [image.getchannel(band).reduce(factor) for band in "RGB"])
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if factor > 1:
+        image = image.reduce(factor)
+    return image.convert("RGB") if image.mode == "L" else image
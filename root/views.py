@@ -2,10 +2,24 @@
 Health check views for container monitoring.
 """
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.db import connection
 from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from strawberry.django.views import AsyncGraphQLView, GraphQLView
+from strawberry.types import ExecutionResult
+
+from .document_cache import get_document_cache
+from .persisted_queries import (
+    InvalidPersistedQueryError,
+    PersistedQueryNotFoundError,
+    persisted_query_hash,
+    resolve_persisted_query,
+)
+from .response_cache import cache_key_and_tags, get_response_cache
 
 
 @csrf_exempt
@@ -69,6 +83,118 @@ def health_check(request):
             "message": f"Static files check failed: {str(e)}",
         }
 
+    health_status["graphql_document_cache"] = get_document_cache().stats()
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        health_status["graphql_response_cache"] = response_cache.stats()
+
     status_code = 200 if health_status["status"] == "healthy" else 503
 
     return JsonResponse(health_status, status=status_code)
+
+
+class GraphQLViewMixin:
+    """
+    Request handling shared by the sync and async GraphQL views of the public endpoint.
+
+    Documents can be sent as automatic persisted queries (APQ): the client sends the
+    SHA-256 hash of the document and only sends the document itself once the server has
+    answered ``PersistedQueryNotFound``. Hash only queries are also accepted over GET and
+    are then marked as publicly cacheable.
+
+    Repeated queries are answered from the response cache. Only successful queries are
+    stored; the ``X-Response-Cache`` header tells whether a response was a ``HIT`` or a
+    ``MISS``.
+    """
+
+    def should_render_graphql_ide(self, request):
+        return "extensions" not in request.query_params and super().should_render_graphql_ide(
+            request
+        )
+
+    def _before_execution(self, request_adapter, sub_response, request_data):
+        """
+        Resolve persisted queries and look the request up in the response cache.
+
+        Returns the resolved request data, the result if the request is already answered,
+        and the cache entry ``(key, tags)`` to store a successful result under.
+        """
+        try:
+            request_data = resolve_persisted_query(request_data)
+        except PersistedQueryNotFoundError as error:
+            return request_data, ExecutionResult(data=None, errors=[error]), None
+        except InvalidPersistedQueryError as error:
+            sub_response.status_code = 400
+            return request_data, ExecutionResult(data=None, errors=[error]), None
+
+        response_cache = get_response_cache()
+        cacheable = response_cache is not None and isinstance(request_data.query, str)
+        if cacheable and request_adapter.method == "GET":
+            cacheable = self.allow_queries_via_get
+        if not cacheable:
+            return request_data, None, None
+        key_and_tags = cache_key_and_tags(
+            request_data.query, request_data.variables, request_data.operation_name
+        )
+        if key_and_tags is None:
+            return request_data, None, None
+
+        data = response_cache.get(key_and_tags[0])
+        if data is not None:
+            sub_response["X-Response-Cache"] = "HIT"
+            return request_data, ExecutionResult(data=data, errors=None), None
+        sub_response["X-Response-Cache"] = "MISS"
+        return request_data, None, key_and_tags
+
+    def _after_execution(self, request_adapter, sub_response, request_data, result, cache_entry):
+        if result.errors:
+            return
+        if cache_entry is not None and result.data is not None:
+            get_response_cache().set(cache_entry[0], result.data, cache_entry[1])
+        persisted_only = persisted_query_hash(request_data.extensions) and not request_data.query
+        if persisted_only and request_adapter.method == "GET":
+            patch_cache_control(
+                sub_response, public=True, max_age=settings.GRAPHQL_PERSISTED_QUERY_MAX_AGE
+            )
+
+
+class RootGraphQLView(GraphQLViewMixin, GraphQLView):
+    """GraphQL view of the public endpoint under WSGI."""
+
+    def execute_single(
+        self, request, request_adapter, sub_response, context, root_value, request_data
+    ):
+        resolved_data, result, cache_entry = self._before_execution(
+            request_adapter, sub_response, request_data
+        )
+        if result is None:
+            result = super().execute_single(
+                request, request_adapter, sub_response, context, root_value, resolved_data
+            )
+        self._after_execution(request_adapter, sub_response, request_data, result, cache_entry)
+        return result
+
+
+class AsyncRootGraphQLView(GraphQLViewMixin, AsyncGraphQLView):
+    """
+    GraphQL view of the public endpoint under ASGI.
+
+    Operations are executed asynchronously, so a worker keeps serving other clients
+    while one is waiting on the database or on a slow network.
+    """
+
+    async def execute_single(
+        self, request, request_adapter, sub_response, context, root_value, request_data
+    ):
+        # The persisted query store and the response cache use blocking cache clients.
+        resolved_data, result, cache_entry = await sync_to_async(self._before_execution)(
+            request_adapter, sub_response, request_data
+        )
+        if result is None:
+            result = await super().execute_single(
+                request, request_adapter, sub_response, context, root_value, resolved_data
+            )
+        await sync_to_async(self._after_execution)(
+            request_adapter, sub_response, request_data, result, cache_entry
+        )
+        return result
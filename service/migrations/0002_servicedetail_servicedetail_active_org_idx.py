@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0005_alter_employee_designation_and_more'),
+        ('organization', '0002_alter_designation_department_and_more'),
+        ('service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicedetail',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['organization'], name='servicedetail_active_org_idx'),
+        ),
+    ]
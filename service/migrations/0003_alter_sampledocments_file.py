@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:00
+
+import media.storage
+import root.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0002_servicedetail_servicedetail_active_org_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sampledocments',
+            name='file',
+            field=models.FileField(db_index=True, storage=media.storage.content_addressed_storage, upload_to=root.utils.UploadToPathAndRename('sample_documents')),
+        ),
+    ]
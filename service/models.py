@@ -1,6 +1,8 @@
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from media.storage import content_addressed_storage
+from root.tracking import TrackedFieldsMixin
 from root.utils import UploadToPathAndRename
 
 
@@ -28,11 +30,13 @@ class Service(models.Model):
         ordering = ["name"]
 
 
-class ServiceDetail(models.Model):
+class ServiceDetail(TrackedFieldsMixin, models.Model):
     """
     Stores the specific details of a service as offered by a particular organization.
     """
 
+    tracked_fields = ("organization",)
+
     organization = models.ForeignKey(
         "organization.Organization", on_delete=models.CASCADE, related_name="service_details"
     )
@@ -68,6 +72,13 @@ class ServiceDetail(models.Model):
 
     class Meta:
         unique_together = ("organization", "service")
+        indexes = [
+            models.Index(
+                fields=["organization"],
+                condition=models.Q(is_active=True),
+                name="servicedetail_active_org_idx",
+            ),
+        ]
         verbose_name = "Detail"
         verbose_name_plural = "Details"
 
@@ -84,7 +95,11 @@ class SampleDocments(models.Model):
         help_text="The service this document is associated with.",
     )
     name = models.CharField(max_length=255, help_text="e.g., 'Application Form'")
-    file = models.FileField(upload_to=UploadToPathAndRename("sample_documents"))
+    file = models.FileField(
+        upload_to=UploadToPathAndRename("sample_documents"),
+        storage=content_addressed_storage,
+        db_index=True,
+    )
     is_active = models.BooleanField(
         default=True, help_text="Is this sample document still releavent?"
     )
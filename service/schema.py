@@ -0,0 +1,50 @@
+"""This module contains the schema for the service app."""
+
+from typing import List, Optional
+
+import strawberry
+from strawberry.types import Info
+
+from root.pagination import cap_list
+
+from .models import Service, ServiceDetail
+from .types import ServiceDetailType, ServiceType
+
+
+@strawberry.type
+class Query:
+    """Query type for the Service app."""
+
+    @strawberry.field
+    def get_services_by_id(
+        self, info: Info, service_id: Optional[int] = None
+    ) -> List[ServiceType]:
+        """
+        Fetches all the active services, at most GRAPHQL_MAX_LIST_SIZE of them.
+        """
+        if service_id:
+            return Service.objects.filter(id=service_id, is_active=True)
+        return cap_list(Service.objects.filter(is_active=True), info)
+
+    @strawberry.field
+    def get_service_details_by_id(
+        self, info: Info, service_detail_id: Optional[int] = None
+    ) -> List[ServiceDetailType]:
+        """
+        Fetches all the active service details, at most GRAPHQL_MAX_LIST_SIZE of them.
+        """
+        if service_detail_id:
+            return ServiceDetail.objects.filter(id=service_detail_id, is_active=True)
+        return cap_list(ServiceDetail.objects.filter(is_active=True), info)
+
+    @strawberry.field
+    def get_services_by_organization(self, organization_id: int) -> List[ServiceDetailType]:
+        """
+        Fetches all the services offered by an organization.
+        """
+        return ServiceDetail.objects.filter(
+            organization_id=organization_id, is_active=True, service__is_active=True
+        ).order_by("service__name")
+
+
+schema = strawberry.Schema(query=Query)
@@ -0,0 +1,50 @@
+# service/signals.py
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from root.response_cache import invalidate_all, invalidate_organizations
+
+from .models import SampleDocments, Service, ServiceDetail
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(m2m_changed, sender=Service.organizations.through)
+def invalidate_responses_of_service(sender, **kwargs):
+    # Services are shared by every organization offering them.
+    invalidate_all()
+
+
+@receiver(post_save, sender=ServiceDetail)
+@receiver(post_delete, sender=ServiceDetail)
+def invalidate_responses_of_service_detail(sender, instance, **kwargs):
+    # A detail moved to another organization is also gone from the previous one's responses.
+    invalidate_organizations(instance.organization_id, instance.stored_value("organization"))
+
+
+@receiver(m2m_changed, sender=ServiceDetail.responsible_employees.through)
+def invalidate_responses_of_responsible_employees(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_organizations(instance.organization_id)
+    elif pk_set:
+        # The instance is an employee and pk_set holds the service details it was added to
+        # or removed from.
+        invalidate_organizations(
+            *ServiceDetail.objects.filter(pk__in=pk_set)
+            .values_list("organization_id", flat=True)
+            .distinct()
+        )
+    else:
+        # Clearing an employee's services gives no pk_set; they are offered by its organization.
+        invalidate_organizations(instance.organization_id)
+
+
+@receiver(post_save, sender=SampleDocments)
+@receiver(post_delete, sender=SampleDocments)
+def invalidate_responses_of_sample_document(sender, instance, **kwargs):
+    invalidate_organizations(instance.service_detail.organization_id)
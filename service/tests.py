@@ -1,3 +1,201 @@
-from django.test import TestCase
+"""Tests for the Service app."""
 
-# Create your tests here.
+import json
+
+from django.test import TestCase, override_settings
+from faker import Faker
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+from root.response_cache import get_response_cache
+from root.testing import (
+    GraphQLTestCase,
+    create_department,
+    create_designation,
+    create_employee,
+    create_organization,
+)
+
+from .models import SampleDocments, Service, ServiceDetail
+
+fake = Faker()
+
+SERVICES_QUERY = """
+    query ($organizationId: Int!) {
+        getServicesByOrganization(organizationId: $organizationId) {
+            fees
+            service { name }
+            organization { name }
+            responsibleEmployees { name designation { title } }
+            sampleDocuments { name file }
+        }
+    }
+"""
+
+
+class ServiceGraphQLTest(GraphQLTestCase):
+    """Test the service queries of the GraphQL schema."""
+
+    def setUp(self):
+        """Set up an organization with employees to assign to services."""
+        self.organization = create_organization()
+        designation = create_designation(
+            create_department(self.organization), allow_multiple_employees=True
+        )
+        self.employees = [create_employee(designation) for _ in range(3)]
+
+    def _create_services(self, count):
+        for _ in range(count):
+            detail = ServiceDetail.objects.create(
+                organization=self.organization,
+                service=Service.objects.create(name=fake.unique.catch_phrase()),
+                required_documents="Citizenship",
+                process_flow="Apply",
+                timeline="1 day",
+            )
+            detail.responsible_employees.set(self.employees[:2])
+            SampleDocments.objects.create(
+                service_detail=detail, name="Application Form", file="sample_documents/form.pdf"
+            )
+
+    def _services(self):
+        data, queries = self.execute_data(SERVICES_QUERY, organizationId=self.organization.id)
+        return data["getServicesByOrganization"], len(queries)
+
+    def test_services_of_organization_are_listed(self):
+        """Test that services come with their employees and sample documents."""
+        self._create_services(2)
+
+        services, _ = self._services()
+
+        self.assertEqual(len(services), 2)
+        for service in services:
+            self.assertEqual(service["organization"]["name"], self.organization.name)
+            self.assertEqual(len(service["responsibleEmployees"]), 2)
+            self.assertEqual(service["sampleDocuments"][0]["name"], "Application Form")
+            self.assertTrue(service["sampleDocuments"][0]["file"].endswith("form.pdf"))
+
+    def test_service_listing_query_count_is_constant(self):
+        """Test that listing many services stays at a handful of queries."""
+        self._create_services(2)
+        _, small_count = self._services()
+
+        self._create_services(40)
+        services, large_count = self._services()
+
+        self.assertEqual(len(services), 42)
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 4)
+
+    def test_inactive_services_are_hidden(self):
+        """Test that inactive service details are not listed."""
+        self._create_services(2)
+        ServiceDetail.objects.filter(pk=ServiceDetail.objects.first().pk).update(is_active=False)
+
+        services, _ = self._services()
+
+        self.assertEqual(len(services), 1)
+
+    def test_inactive_sample_documents_are_hidden(self):
+        """Test that inactive sample documents are not listed, with or without the optimizer."""
+        self._create_services(2)
+        SampleDocments.objects.create(
+            service_detail=ServiceDetail.objects.first(),
+            name="Withdrawn Form",
+            file="sample_documents/withdrawn.pdf",
+            is_active=False,
+        )
+
+        services, _ = self._services()
+        with DjangoOptimizerExtension.disabled():
+            unoptimized, _ = self._services()
+
+        for listing in (services, unoptimized):
+            names = [
+                document["name"] for service in listing for document in service["sampleDocuments"]
+            ]
+            self.assertEqual(names, ["Application Form", "Application Form"])
+
+    def test_loaders_batch_relations_without_the_optimizer(self):
+        """Test that the DataLoaders alone keep the query count constant."""
+        self._create_services(2)
+        with DjangoOptimizerExtension.disabled():
+            _, small_count = self._services()
+
+        self._create_services(20)
+        with DjangoOptimizerExtension.disabled():
+            services, large_count = self._services()
+
+        self.assertEqual(len(services), 22)
+        self.assertEqual(small_count, large_count)
+        for service in services:
+            self.assertEqual(len(service["responsibleEmployees"]), 2)
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={"BACKEND": "root.response_cache.DjangoCacheBackend"})
+class ServiceResponseCacheTest(TestCase):
+    """Test that changing the service details invalidates the cached services."""
+
+    def setUp(self):
+        """Set up a service detail, an employee of its organization and an empty cache."""
+        get_response_cache().clear()
+        self.organization = create_organization()
+        self.detail = ServiceDetail.objects.create(
+            organization=self.organization,
+            service=Service.objects.create(name=fake.unique.catch_phrase()),
+            required_documents="Citizenship",
+            process_flow="Apply",
+            timeline="1 day",
+        )
+        self.employee = create_employee(create_designation(create_department(self.organization)))
+
+    def _services(self):
+        response = self.client.post(
+            "/",
+            json.dumps(
+                {"query": SERVICES_QUERY, "variables": {"organizationId": self.organization.id}}
+            ),
+            "application/json",
+        )
+        return response["X-Response-Cache"], response.json()["data"]["getServicesByOrganization"]
+
+    def _responsible(self):
+        cache, services = self._services()
+        return cache, [item["name"] for item in services[0]["responsibleEmployees"]]
+
+    def test_changes_from_either_side_invalidate_the_organization(self):
+        """Test that adding, removing and clearing through the employee are all seen."""
+        self.assertEqual(self._responsible(), ("MISS", []))
+        self.assertEqual(self._responsible(), ("HIT", []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.servicedetail_set.add(self.detail)
+        self.assertEqual(self._responsible(), ("MISS", [self.employee.name]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.servicedetail_set.clear()
+        self.assertEqual(self._responsible(), ("MISS", []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.detail.responsible_employees.add(self.employee)
+        self.assertEqual(self._responsible(), ("MISS", [self.employee.name]))
+
+    def test_moving_a_detail_invalidates_its_previous_organization(self):
+        """Test that the organization a service detail is moved away from stops listing it."""
+        self.assertEqual(self._responsible(), ("MISS", []))
+        self.assertEqual(self._responsible(), ("HIT", []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.detail.organization = create_organization()
+            self.detail.save()
+
+        self.assertEqual(self._services(), ("MISS", []))
+
+
+class ServiceDetailIndexTest(TestCase):
+    """Test that the active service details of an organization are served by an index."""
+
+    def test_active_service_details_use_the_partial_index(self):
+        """Test that the public service detail lookup reads the partial index."""
+        plan = ServiceDetail.objects.filter(organization_id=1, is_active=True).explain()
+
+        self.assertIn("USING INDEX servicedetail_active_org_idx", plan)
@@ -0,0 +1,67 @@
+"""This module contains the types for the service app."""
+
+from typing import List
+
+import strawberry
+import strawberry_django
+
+from employee.types import EmployeeType
+from organization.types import OrganizationType
+from root.loaders import LoaderField
+
+from .models import SampleDocments, Service, ServiceDetail
+
+
+@strawberry.django.type(Service)
+class ServiceType:
+    """
+    ServiceType represents the master service model.
+    """
+
+    id: int
+    name: str
+    description: str
+    is_active: bool
+
+
+@strawberry.django.type(SampleDocments)
+class SampleDocumentType:
+    """
+    SampleDocumentType represents a sample document of a service detail.
+    """
+
+    id: int
+    name: str
+    is_active: bool
+
+    @classmethod
+    def get_queryset(cls, queryset, info, **kwargs):
+        """
+        Only exposes the active sample documents.
+        """
+        return queryset.filter(is_active=True)
+
+    @strawberry_django.field(only=["file"])
+    def file(self) -> str:
+        """
+        Returns the URL of the sample document.
+        """
+        return self.file.url
+
+
+@strawberry.django.type(ServiceDetail)
+class ServiceDetailType:
+    """
+    ServiceDetailType represents a service as offered by a particular organization.
+    """
+
+    id: int
+    organization: OrganizationType = strawberry_django.field(field_cls=LoaderField)
+    service: ServiceType = strawberry_django.field(field_cls=LoaderField)
+    required_documents: str
+    process_flow: str
+    fees: str
+    timeline: str
+    is_active: bool
+    responsible_employees: List[EmployeeType] = strawberry_django.field(field_cls=LoaderField)
+    sample_documents: List[SampleDocumentType] = strawberry_django.field(field_cls=LoaderField)